@@ -0,0 +1,143 @@
+# analysis_batcher.py
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from any thread (any call session) for up to
+    ``max_wait_sec`` after the first one arrives, or until ``max_batch`` are
+    waiting, and sends them with one ``request_batch(items)`` call.
+
+    ``request_batch`` returns a list aligned with ``items``; entries it could
+    not produce are None. Those items, and every item of a batch whose
+    request raised, are retried with concurrent ``request_one`` calls, each
+    resolving its own future as it completes.
+
+    Each item may carry a deadline (anything with ``expires_at``, such as
+    call_policy.Deadline). The batch request gets the earliest deadline in
+    the batch, so it gives up no later than its most urgent item would have
+    on its own; single retries get the item's own deadline.
+    """
+
+    def __init__(self, request_batch, request_one, max_batch=8, max_wait_sec=0.1, max_in_flight=4):
+        self.request_batch = request_batch
+        self.request_one = request_one
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait_sec = float(max_wait_sec)
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="batch")
+        self._thread = None
+        self._batches_in_flight = set()
+        self._closed = False
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.batched_items = 0
+        self.batch_failures = 0
+        self.single_requests = 0
+
+    def submit(self, item, deadline=None):
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._collect_loop, daemon=True)
+                self._thread.start()
+            self._queue.put((item, future, deadline))
+        return future
+
+    def stats(self):
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "batched_items": self.batched_items,
+                "mean_batch_size": self.batched_items / self.batches if self.batches else 0.0,
+                "batch_failures": self.batch_failures,
+                "single_requests": self.single_requests,
+            }
+
+    def close(self):
+        """Send what was submitted, wait for every answer, then refuse new items."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join()
+        # Batches queue their single-request fallbacks on the executor, so
+        # they must all have run before it stops taking work
+        with self._lock:
+            batches = list(self._batches_in_flight)
+        wait(batches)
+        self._executor.shutdown(wait=True)
+
+    def _collect_loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait_sec
+            closing = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+
+            running = self._executor.submit(self._run, batch)
+            with self._lock:
+                self._batches_in_flight.add(running)
+            running.add_done_callback(self._batch_done)
+            if closing:
+                return
+
+    def _run(self, batch):
+        items = [item for item, _, _ in batch]
+        results = [None] * len(items)
+        if len(items) > 1:
+            with self._lock:
+                self.batches += 1
+                self.batched_items += len(items)
+            deadlines = [deadline for _, _, deadline in batch if deadline is not None]
+            earliest = min(deadlines, key=lambda deadline: deadline.expires_at) if deadlines else None
+            try:
+                results = list(self.request_batch(items, deadline=earliest))
+                if len(results) != len(items):
+                    raise ValueError(f"expected {len(items)} results, got {len(results)}")
+            except Exception as e:
+                print(f"[Batch] Batch of {len(items)} failed, falling back to single requests: {e}")
+                with self._lock:
+                    self.batch_failures += 1
+                results = [None] * len(items)
+
+        for (item, future, deadline), result in zip(batch, results):
+            if result is None:
+                with self._lock:
+                    self.single_requests += 1
+                self._executor.submit(self._run_one, item, future, deadline)
+            else:
+                future.set_result(result)
+
+    def _run_one(self, item, future, deadline):
+        try:
+            future.set_result(self.request_one(item, deadline=deadline))
+        except Exception as e:
+            future.set_exception(e)
+
+    def _batch_done(self, running):
+        with self._lock:
+            self._batches_in_flight.discard(running)
@@ -0,0 +1,219 @@
+# analysis_cache.py
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from runtime_config import get_setting
+
+# Dropped before keying, so "um, okay go on" and "Okay... go on!" share an entry
+FILLER_PHRASES = ("you know", "i mean")
+FILLER_WORDS = frozenset({"um", "umm", "uh", "uhh", "er", "erm", "ah", "hmm", "hm", "mm"})
+
+_APOSTROPHES = re.compile(r"['’]")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_FILLER_PHRASES = re.compile(r"\b(?:" + "|".join(FILLER_PHRASES) + r")\b")
+
+
+def normalize_utterance(text):
+    """Lower-case, strip punctuation and filler words, collapse whitespace."""
+    text = _APOSTROPHES.sub("", str(text).lower())
+    text = _FILLER_PHRASES.sub(" ", _PUNCTUATION.sub(" ", text))
+    return " ".join(word for word in text.split() if word not in FILLER_WORDS)
+
+
+class AnalysisCache:
+    """
+    Bounded LRU/TTL cache of utterance analyses keyed on normalized text.
+
+    Only short utterances are cached (``max_words``); longer ones rarely
+    repeat. With ``path`` set, entries are also stored in a SQLite file so
+    worker processes on the same host share them.
+    """
+
+    def __init__(self, max_entries=1000, ttl_sec=3600.0, max_words=12, path=None, namespace=""):
+        self.max_entries = int(max_entries)
+        self.ttl_sec = float(ttl_sec)
+        self.max_words = int(max_words)
+        self.namespace = namespace
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._puts = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.uncacheable = 0
+        self.latency_saved_sec = 0.0
+
+        if path:
+            self._open_store(path)
+
+    def key_for(self, text):
+        """Cache key for ``text``, or None when it should not be cached."""
+        normalized = normalize_utterance(text)
+        if not normalized or len(normalized.split()) > self.max_words:
+            return None
+        return f"{self.namespace}:{normalized}"
+
+    def get(self, text):
+        key = self.key_for(text)
+        if key is None:
+            # Too long or empty once normalized: neither a hit nor a miss
+            with self._lock:
+                self.uncacheable += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] > self.ttl_sec:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                entry = self._load(key, now)
+                if entry is not None:
+                    self.disk_hits += 1
+                    self._remember(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.latency_saved_sec += entry[2]
+            return dict(entry[0])
+
+    def put(self, text, value, cost_sec=0.0):
+        """Store ``value``; ``cost_sec`` is what a hit on it will save."""
+        key = self.key_for(text)
+        if key is None:
+            return
+        entry = (dict(value), time.time(), float(cost_sec))
+        with self._lock:
+            self._remember(key, entry)
+            self._store(key, entry)
+
+    def note_bypass(self):
+        """Count a lookup the caller skipped (``use_cache=False``)."""
+        with self._lock:
+            self.bypassed += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._execute("DELETE FROM analysis_cache")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "uncacheable": self.uncacheable,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "latency_saved_sec": round(self.latency_saved_sec, 3),
+            }
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ------------------- Shared on-disk store -------------------
+    def _open_store(self, path):
+        try:
+            self._db = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, cost REAL NOT NULL)"
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"[Cache] Could not open {path}, using memory only: {e}")
+            self._db = None
+
+    def _execute(self, sql, params=()):
+        try:
+            rows = self._db.execute(sql, params).fetchall()
+            self._db.commit()
+            return rows
+        except sqlite3.Error as e:
+            print(f"[Cache] Store error: {e}")
+            return None
+
+    def _load(self, key, now):
+        if self._db is None:
+            return None
+        rows = self._execute(
+            "SELECT value, created, cost FROM analysis_cache WHERE key = ? AND created >= ?",
+            (key, now - self.ttl_sec),
+        )
+        if not rows:
+            return None
+        value, created, cost = rows[0]
+        return json.loads(value), created, cost
+
+    def _store(self, key, entry):
+        if self._db is None:
+            return
+        value, created, cost = entry
+        self._execute(
+            "INSERT OR REPLACE INTO analysis_cache (key, value, created, cost) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), created, cost),
+        )
+        self._puts += 1
+        if self._puts % 256 == 0:
+            # Expire old rows and keep the file to a bounded size
+            self._execute("DELETE FROM analysis_cache WHERE created < ?", (created - self.ttl_sec,))
+            self._execute(
+                "DELETE FROM analysis_cache WHERE key NOT IN "
+                "(SELECT key FROM analysis_cache ORDER BY created DESC LIMIT ?)",
+                (self.max_entries * 10,),
+            )
+
+
+_caches = {}
+_cache_lock = threading.Lock()
+
+
+def get_analysis_cache(namespace=""):
+    """
+    Process-wide cache for ``namespace`` (e.g. model and prompt version), or
+    None when ANALYSIS_CACHE_SIZE is 0. Configured with ANALYSIS_CACHE_SIZE,
+    ANALYSIS_CACHE_TTL_SEC, ANALYSIS_CACHE_MAX_WORDS and ANALYSIS_CACHE_PATH
+    (SQLite file shared across processes; unset = memory only).
+    """
+    with _cache_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            size = get_setting("ANALYSIS_CACHE_SIZE", 1000, int)
+            if size <= 0:
+                return None
+            cache = AnalysisCache(
+                max_entries=size,
+                ttl_sec=get_setting("ANALYSIS_CACHE_TTL_SEC", 3600.0, float),
+                max_words=get_setting("ANALYSIS_CACHE_MAX_WORDS", 12, int),
+                path=get_setting("ANALYSIS_CACHE_PATH"),
+                namespace=namespace,
+            )
+            _caches[namespace] = cache
+        return cache
+
+
+def get_cache_stats():
+    """Stats of every cache created so far, keyed by namespace."""
+    with _cache_lock:
+        caches = dict(_caches)
+    return {namespace: cache.stats() for namespace, cache in caches.items()}
@@ -1,20 +1,53 @@
 import json
 import os
+import weakref
 
 import streamlit as st
-from streamlit_autorefresh import st_autorefresh
 from streamlit_webrtc import WebRtcMode, webrtc_streamer
 
-from main import LIVE_FILE, POST_SUMMARY_FILE, STATUS_FILE, SalesCallPipeline
+from live_view import SENTIMENT_CLASS, SENTIMENT_EMOJI, poll_live, read_live, sentiment_panel, transcript_panel
+from prewarm import start_prewarm
+from runtime_config import get_setting
+from sessions import registry
+from stage_metrics import start_metrics_server
 from webrtc_audio import build_audio_processor_factory
 
 st.set_page_config(page_title="AI Sales Call Assistant", layout="wide")
+start_metrics_server(sessions=registry.stage_metrics, capture=registry.capture_stats)
+
+
+class _SessionHandle:
+    """Held only by one browser session's state; collected when Streamlit drops that session."""
 
 
 def get_backend():
-    if "call_backend" not in st.session_state or st.session_state.call_backend is None:
-        st.session_state.call_backend = SalesCallPipeline()
-    return st.session_state.call_backend
+    backend = st.session_state.get("call_backend")
+    # Sessions are closed on End Call and idle ones are evicted by the registry;
+    # a backend that is no longer registered is replaced
+    if backend is None or not registry.touch(backend.session_id):
+        if backend is not None and not st.session_state.post_summary_path:
+            # Keep showing the last call's summary after its session was evicted
+            st.session_state.post_summary_path = backend.post_summary_file
+        backend = registry.create(
+            streaming=get_setting("STREAMING_TRANSCRIPTS", False, bool),
+            partial_interval_sec=get_setting("PARTIAL_INTERVAL_SEC", 1.0, float),
+            summary_update_every=get_setting("SUMMARY_UPDATE_EVERY", 20, int),
+            utterance_budget_sec=get_setting("LIVE_UTTERANCE_BUDGET_SEC", 8.0, float),
+            transcription_budget_sec=get_setting("TRANSCRIPTION_BUDGET_SEC", 5.0, float),
+            pre_roll_sec=get_setting("PRE_ROLL_MS", 300, float) / 1000.0,
+            max_utterance_sec=get_setting("MAX_UTTERANCE_SEC", 30.0, float),
+            max_audio_memory_mb=get_setting("SESSION_AUDIO_MEMORY_MB", 16.0, float),
+            vad=get_setting("VAD", "energy"),
+        )
+        st.session_state.call_backend = backend
+        st.session_state.live_seq = 0
+        st.session_state.live_markup = {}
+        # Streamlit has no session-end callback: close the registry session
+        # when this browser session's state is garbage collected
+        handle = _SessionHandle()
+        weakref.finalize(handle, registry.close, backend.session_id, wait_for_finalize=False)
+        st.session_state.session_handle = handle
+    return backend
 
 
 def ensure_session_state():
@@ -28,6 +61,20 @@ def ensure_session_state():
         st.session_state.customer_data = None
     if "product_recommendations" not in st.session_state:
         st.session_state.product_recommendations = ""
+    if "live_seq" not in st.session_state:
+        st.session_state.live_seq = 0
+    if "live_segments" not in st.session_state:
+        st.session_state.live_segments = []
+    if "live_status" not in st.session_state:
+        st.session_state.live_status = {}
+    if "live_partial" not in st.session_state:
+        st.session_state.live_partial = None
+    if "live_rendered" not in st.session_state:
+        st.session_state.live_rendered = []
+    if "live_page_end" not in st.session_state:
+        st.session_state.live_page_end = None
+    if "post_summary_path" not in st.session_state:
+        st.session_state.post_summary_path = None
 
 
 ensure_session_state()
@@ -80,56 +127,84 @@ h4 {margin-top:0;}
 st.title("🎙 Real-Time AI Sales Call Assistant")
 
 
-def read_live():
-    if os.path.exists(LIVE_FILE):
-        with open(LIVE_FILE, "r", encoding="utf-8") as file_handle:
-            return file_handle.read()
-    return "Waiting for speech..."
-
-
-def read_status():
-    if os.path.exists(STATUS_FILE):
-        with open(STATUS_FILE, "r", encoding="utf-8") as file_handle:
-            try:
-                return json.load(file_handle)
-            except json.JSONDecodeError:
-                return {}
-    return {}
-
-
 def start_backend():
     if backend.is_running():
         st.warning("Backend already running.")
         return
 
+    # Connections, CRM index and Sheets auth warm up while the call connects
+    start_prewarm()
     backend.start()
     st.session_state.listening = True
     st.session_state.post_summary = ""
+    st.session_state.post_summary_path = None
+    st.session_state.live_segments = []
+    st.session_state.live_status = {}
+    st.session_state.live_partial = None
+    st.session_state.live_rendered = []
+    st.session_state.live_page_end = None
+    st.session_state.live_markup = {}
+    # Rerun so the live fragments are set up with their refresh interval
+    st.rerun()
+
+
+def release_backend():
+    """Free the call's registry slot; its summary stays readable from disk."""
+    st.session_state.post_summary_path = backend.post_summary_file
+    registry.close(backend.session_id, wait_for_finalize=False)
 
 
 def stop_backend():
     if not backend.is_running():
         st.session_state.listening = False
-        if os.path.exists(POST_SUMMARY_FILE):
-            with open(POST_SUMMARY_FILE, "r", encoding="utf-8") as file_handle:
+        if os.path.exists(backend.post_summary_file):
+            with open(backend.post_summary_file, "r", encoding="utf-8") as file_handle:
                 st.session_state.post_summary = file_handle.read()
+        release_backend()
         st.rerun()
         return
 
     backend.stop(wait_for_finalize=True, timeout=30)
     st.session_state.listening = False
+    poll_live(backend.channel)
 
-    if os.path.exists(POST_SUMMARY_FILE):
-        with open(POST_SUMMARY_FILE, "r", encoding="utf-8") as file_handle:
-            st.session_state.post_summary = file_handle.read()
-    elif os.path.exists(LIVE_FILE):
-        with open(LIVE_FILE, "r", encoding="utf-8") as file_handle:
+    if os.path.exists(backend.post_summary_file):
+        with open(backend.post_summary_file, "r", encoding="utf-8") as file_handle:
             st.session_state.post_summary = file_handle.read()
+    elif st.session_state.live_segments:
+        st.session_state.post_summary = read_live()
 
+    release_backend()
     st.rerun()
 
 
-status = read_status()
+def load_post_summary(path):
+    """Parsed post_summary.json, re-read only when the file changes."""
+    key = (path, os.path.getmtime(path))
+    cached = st.session_state.get("post_summary_data")
+    if cached is None or cached[0] != key:
+        with open(path, "r", encoding="utf-8") as file_handle:
+            cached = (key, json.load(file_handle))
+        st.session_state.post_summary_data = cached
+    return cached[1]
+
+
+# While a call is live, only these fragments rerun (every LIVE_REFRESH_SEC);
+# the rest of the page renders once per interaction.
+live_refresh_sec = get_setting("LIVE_REFRESH_SEC", 1.0, float) if st.session_state.listening else None
+
+
+@st.fragment(run_every=live_refresh_sec)
+def live_sentiment_fragment():
+    sentiment_panel(backend.channel)
+
+
+@st.fragment(run_every=live_refresh_sec)
+def live_transcript_fragment():
+    transcript_panel(backend.channel)
+
+
+poll_live(backend.channel)
 
 # ------------------- Layout -------------------
 left_col, right_col = st.columns([1, 1], gap="large")
@@ -170,43 +245,11 @@ with left_col:
     )
 
     st.subheader("Sentiment Analysis")
-    sentiment_label = status.get("sentiment", "Neutral")
-    sentiment_key = sentiment_label.lower()
-    emoji = {"positive": "🙂", "neutral": "😐", "negative": "🙁"}.get(sentiment_key, "😐")
-    sent_class = {
-        "positive": "sentiment-positive",
-        "neutral": "sentiment-neutral",
-        "negative": "sentiment-negative",
-    }.get(sentiment_key, "sentiment-neutral")
-    summary_text = status.get("summary", "")
-
-    st.markdown(
-        f"<div class='big-box {sent_class}'><h4>Sentiment {emoji}</h4><p style='margin:0'>{sentiment_label}</p></div>",
-        unsafe_allow_html=True,
-    )
-    st.markdown(
-        f"<div class='big-box'><h4>Customer Summary</h4><p style='margin:0'>{summary_text}</p></div>",
-        unsafe_allow_html=True,
-    )
+    live_sentiment_fragment()
 
 # --- Right Column ---
 with right_col:
-    st.subheader("Live Transcript")
-    if st.session_state.listening:
-        live_text = read_live()
-        st.markdown(
-            f"<div class='big-box transcript-box'>{live_text}</div>",
-            unsafe_allow_html=True,
-        )
-    else:
-        st.info("No live transcription (start a call to see it).")
-
-    st.subheader("AI Suggestions for Customer")
-    suggestion_text = status.get("suggestion", "Waiting for customer input...")
-    st.markdown(
-        f"<div class='big-box suggestion-box'><p style='margin:0'><strong>{suggestion_text}</strong></p></div>",
-        unsafe_allow_html=True,
-    )
+    live_transcript_fragment()
 
     if st.session_state.product_recommendations:
         st.subheader("Product Recommendations")
@@ -215,10 +258,6 @@ with right_col:
             unsafe_allow_html=True,
         )
 
-# --- Auto-refresh every 2 seconds
-if st.session_state.listening:
-    st_autorefresh(interval=2000, key="auto_refresh_key")
-
 # ------------------- Post-Call Summary -------------------
 st.subheader("Post-Call Summary")
 col1, col2 = st.columns([3, 1])
@@ -226,23 +265,17 @@ with col2:
     if st.button("🔄 Refresh Summary"):
         st.rerun()
 
-if os.path.exists(POST_SUMMARY_FILE):
+post_summary_path = st.session_state.post_summary_path or backend.post_summary_file
+if os.path.exists(post_summary_path):
     try:
-        with open(POST_SUMMARY_FILE, "r", encoding="utf-8") as file_handle:
-            data = json.load(file_handle)
+        data = load_post_summary(post_summary_path)
 
         overall_sentiment = data.get("sentiment", "Unknown")
         overall_summary = data.get("summary", "Not yet available")
         full_transcript = data.get("transcript", "")
 
-        sent_class = {
-            "positive": "sentiment-positive",
-            "neutral": "sentiment-neutral",
-            "negative": "sentiment-negative",
-        }.get(overall_sentiment.lower(), "sentiment-neutral")
-        emoji = {"positive": "🙂", "neutral": "😐", "negative": "🙁"}.get(
-            overall_sentiment.lower(), "😐"
-        )
+        sent_class = SENTIMENT_CLASS.get(overall_sentiment.lower(), "sentiment-neutral")
+        emoji = SENTIMENT_EMOJI.get(overall_sentiment.lower(), "😐")
 
         st.markdown(
             f"<div class='big-box {sent_class}'><h4>Overall Sentiment {emoji}</h4><p>{overall_sentiment}</p></div>",
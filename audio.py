@@ -1,19 +1,258 @@
 # audio.py
+import abc
+
 import numpy as np
 
+# RMS values are kept as fixed-point integers so the running sum never drifts
+# and the streaming and batch paths produce bit-identical thresholds.
+_RMS_SCALE = float(1 << 40)
+
+
+class VoiceActivityDetector(abc.ABC):
+    """
+    Speech/silence decision for the capture loop. ``is_silent`` is called
+    once per block, in order; ``silence_blocks_required`` consecutive silent
+    blocks end an utterance.
+    """
 
-class SilenceDetector:
-    def __init__(self, block_duration=0.05, target_silence_sec=1.2, buffer_blocks=20, multiplier=1.5):
+    def __init__(self, block_duration=0.05, target_silence_sec=1.2, buffer_blocks=20, sample_rate=16000):
         self.block_duration = block_duration
         self.silence_blocks_required = int(target_silence_sec / block_duration)
         self.buffer_blocks = buffer_blocks
+        self.sample_rate = sample_rate
+
+    def reset(self):
+        pass
+
+    @abc.abstractmethod
+    def is_silent(self, block):
+        """True when ``block`` (a 1-D float array) holds no speech."""
+
+    def is_silent_many(self, blocks):
+        """Equivalent of calling is_silent on each row of a 2-D array of blocks in order."""
+        return np.array([self.is_silent(block) for block in np.atleast_2d(blocks)], dtype=bool)
+
+
+class SilenceDetector(VoiceActivityDetector):
+    """Energy VAD: a block is silent when its RMS is below the recent mean times ``multiplier`` (floor 0.01)."""
+
+    def __init__(self, block_duration=0.05, target_silence_sec=1.2, buffer_blocks=20, multiplier=1.5, sample_rate=16000):
+        super().__init__(block_duration, target_silence_sec, buffer_blocks, sample_rate)
         self.multiplier = multiplier
-        self.recent_rms = []
+        self._ring = np.zeros(buffer_blocks, dtype=np.int64)
+        self._next = 0
+        self._count = 0
+        self._sum = 0
+
+    @property
+    def recent_rms(self):
+        """RMS values currently in the window, oldest first."""
+        return list(self._history() / _RMS_SCALE)
+
+    def reset(self):
+        self._ring[:] = 0
+        self._next = 0
+        self._count = 0
+        self._sum = 0
+
+    def _history(self):
+        if self._count < self.buffer_blocks:
+            return self._ring[: self._count].copy()
+        return np.roll(self._ring, -self._next)
+
+    def _threshold(self, window_sum, window_count):
+        return np.maximum(0.01, window_sum / window_count / _RMS_SCALE * self.multiplier)
 
     def is_silent(self, block):
         rms = np.sqrt(np.mean(block**2))
-        self.recent_rms.append(rms)
-        if len(self.recent_rms) > self.buffer_blocks:
-            self.recent_rms.pop(0)
-        dynamic_threshold = max(0.01, np.mean(self.recent_rms) * self.multiplier)
-        return rms < dynamic_threshold
+        quantized = int(np.rint(rms * _RMS_SCALE))
+
+        if self._count == self.buffer_blocks:
+            self._sum -= int(self._ring[self._next])
+        else:
+            self._count += 1
+        self._ring[self._next] = quantized
+        self._sum += quantized
+        self._next = (self._next + 1) % self.buffer_blocks
+
+        dynamic_threshold = self._threshold(np.int64(self._sum), np.int64(self._count))
+        return bool(rms < dynamic_threshold)
+
+    def is_silent_many(self, blocks):
+        """
+        Vectorized equivalent of calling is_silent on each row of a 2-D array
+        of blocks in order. Returns a boolean array and advances the window.
+        """
+        blocks = np.asarray(blocks)
+        if blocks.ndim == 1:
+            blocks = blocks.reshape(1, -1)
+        if blocks.shape[0] == 0:
+            return np.zeros(0, dtype=bool)
+
+        rms = np.sqrt(np.mean(blocks**2, axis=1))
+        quantized = np.rint(rms * _RMS_SCALE).astype(np.int64)
+
+        history = self._history()
+        sequence = np.concatenate([history, quantized])
+        cumulative = np.concatenate([[0], np.cumsum(sequence)])
+
+        positions = np.arange(history.size, sequence.size)
+        starts = np.maximum(0, positions + 1 - self.buffer_blocks)
+        window_sums = cumulative[positions + 1] - cumulative[starts]
+        window_counts = positions + 1 - starts
+        decisions = rms < self._threshold(window_sums, window_counts)
+
+        tail = sequence[-self.buffer_blocks :]
+        self._ring[:] = 0
+        self._ring[: tail.size] = tail
+        self._count = tail.size
+        self._next = tail.size % self.buffer_blocks
+        self._sum = int(tail.sum())
+        return decisions
+
+
+class SpectralVAD(VoiceActivityDetector):
+    """
+    Decides from the shape of each block's spectrum, not only its level, so
+    steady fans, line hum and keyboard clicks do not open utterances. A
+    block is speech-like when all of these hold:
+
+    - its RMS is above ``multiplier`` times the noise floor, the quietest
+      of the last ``buffer_blocks`` blocks (and at least ``min_rms``);
+    - at least ``min_band_ratio`` of its energy is in ``band_hz``;
+    - its spectral flatness in that band is at most ``max_flatness``
+      (voiced speech is harmonic; fans and clicks are close to flat);
+    - its zero-crossing rate is at most ``max_zero_crossing_rate``.
+
+    Speech starts after ``onset_blocks`` consecutive speech-like blocks and
+    is held for ``hangover_blocks`` after the last one. The hangover counts
+    toward the silence that ends an utterance, so utterances end as soon as
+    with the energy detector.
+    """
+
+    def __init__(
+        self,
+        block_duration=0.05,
+        target_silence_sec=1.2,
+        buffer_blocks=20,
+        multiplier=1.5,
+        sample_rate=16000,
+        band_hz=(300.0, 3400.0),
+        min_rms=0.01,
+        min_band_ratio=0.5,
+        max_flatness=0.3,
+        max_zero_crossing_rate=0.25,
+        onset_blocks=2,
+        hangover_blocks=3,
+    ):
+        super().__init__(block_duration, target_silence_sec, buffer_blocks, sample_rate)
+        self.silence_blocks_required = max(1, self.silence_blocks_required - hangover_blocks)
+        self.multiplier = multiplier
+        self.band_hz = band_hz
+        self.min_rms = min_rms
+        self.min_band_ratio = min_band_ratio
+        self.max_flatness = max_flatness
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.onset_blocks = onset_blocks
+        self.hangover_blocks = hangover_blocks
+        self._spectral_setup = {}
+        self._recent_rms = np.zeros(buffer_blocks)
+        self.reset()
+
+    def reset(self):
+        self._recent_rms[:] = np.inf
+        self._recent_next = 0
+        self._speech_run = 0
+        self._speaking = False
+        self._hold = 0
+
+    def _setup(self, length):
+        """Window and voice-band bins for blocks of ``length`` samples, built once per length."""
+        setup = self._spectral_setup.get(length)
+        if setup is None:
+            frequencies = np.fft.rfftfreq(length, 1.0 / self.sample_rate)
+            band = slice(*np.searchsorted(frequencies, self.band_hz))
+            setup = self._spectral_setup[length] = (np.hanning(length).astype(np.float32), band)
+        return setup
+
+    def features(self, blocks):
+        """
+        Per-block RMS, voice-band energy ratio, spectral flatness and
+        zero-crossing rate for each row of a 2-D array of blocks.
+        """
+        blocks = np.atleast_2d(np.asarray(blocks, dtype=np.float32))
+        length = blocks.shape[1]
+        window, band = self._setup(length)
+        spectrum = np.fft.rfft(blocks * window, axis=1)
+        power = spectrum.real**2 + spectrum.imag**2 + 1e-12
+        band_power = power[:, band]
+        band_mean = band_power.mean(axis=1)
+        crossings = np.count_nonzero((blocks[:, 1:] * blocks[:, :-1]) < 0, axis=1)
+        return {
+            "rms": np.sqrt(np.einsum("ij,ij->i", blocks, blocks) / length),
+            "band_ratio": band_mean * band_power.shape[1] / power.sum(axis=1),
+            "flatness": np.exp(np.log(band_power).mean(axis=1)) / band_mean,
+            "zero_crossing_rate": crossings / max(1, length - 1),
+        }
+
+    def _decide(self, features):
+        shaped = (
+            (features["band_ratio"] >= self.min_band_ratio)
+            & (features["flatness"] <= self.max_flatness)
+            & (features["zero_crossing_rate"] <= self.max_zero_crossing_rate)
+        )
+        decisions = np.zeros(shaped.size, dtype=bool)
+        for index, rms in enumerate(features["rms"]):
+            self._recent_rms[self._recent_next] = rms
+            self._recent_next = (self._recent_next + 1) % self.buffer_blocks
+            # Gaps between syllables keep the floor at the noise level during speech
+            noise_floor = self._recent_rms.min()
+            if shaped[index] and rms >= max(self.min_rms, noise_floor * self.multiplier):
+                self._speech_run += 1
+            else:
+                self._speech_run = 0
+
+            # Once speaking, any speech-like block continues it; starting needs onset_blocks
+            if self._speech_run >= self.onset_blocks or (self._speech_run and self._speaking):
+                self._speaking = True
+                self._hold = self.hangover_blocks
+            elif self._hold:
+                self._hold -= 1
+            else:
+                self._speaking = False
+            decisions[index] = not self._speaking
+        return decisions
+
+    def is_silent(self, block):
+        return bool(self._decide(self.features(block))[0])
+
+    def is_silent_many(self, blocks):
+        blocks = np.asarray(blocks)
+        if blocks.ndim == 1:
+            blocks = blocks.reshape(1, -1)
+        if blocks.shape[0] == 0:
+            return np.zeros(0, dtype=bool)
+        return self._decide(self.features(blocks))
+
+
+# VAD name -> detector class, selected with SalesCallPipeline(vad=...) / VAD
+VAD_BACKENDS = {
+    "energy": SilenceDetector,
+    "spectral": SpectralVAD,
+}
+DEFAULT_VAD = "energy"
+
+
+def create_vad(vad=DEFAULT_VAD, **kwargs):
+    """
+    Build the detector named by ``vad`` (a key of VAD_BACKENDS) with the
+    shared block/silence settings in ``kwargs``; an existing detector is
+    returned as is.
+    """
+    if isinstance(vad, VoiceActivityDetector):
+        return vad
+    name = (vad or DEFAULT_VAD).lower()
+    if name not in VAD_BACKENDS:
+        print(f"[Capture] Unknown VAD '{name}', using {DEFAULT_VAD}")
+        name = DEFAULT_VAD
+    return VAD_BACKENDS[name](**kwargs)
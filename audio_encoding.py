@@ -0,0 +1,46 @@
+# audio_encoding.py
+import io
+
+import numpy as np
+import soundfile as sf
+
+from runtime_config import get_setting
+
+# upload format -> (container, subtype, file extension)
+UPLOAD_FORMATS = {
+    "wav_float": ("WAV", "FLOAT", "wav"),
+    "wav_pcm16": ("WAV", "PCM_16", "wav"),
+    "flac": ("FLAC", "PCM_16", "flac"),
+}
+DEFAULT_UPLOAD_FORMAT = "flac"
+
+
+def get_upload_format():
+    upload_format = get_setting("GROQ_UPLOAD_FORMAT", DEFAULT_UPLOAD_FORMAT).lower()
+    if upload_format not in UPLOAD_FORMATS:
+        print(f"[Audio] Unknown upload format '{upload_format}', using {DEFAULT_UPLOAD_FORMAT}")
+        return DEFAULT_UPLOAD_FORMAT
+    return upload_format
+
+
+def _to_pcm16(audio_data):
+    scaled = np.clip(audio_data, -1.0, 1.0) * 32767.0
+    return scaled.astype(np.int16)
+
+
+def encode_audio(audio_data, sample_rate=16000, upload_format=None):
+    """
+    Encode mono audio into an in-memory file ready for upload.
+
+    Returns a (file_name, bytes) tuple; nothing touches the filesystem.
+    """
+    upload_format = upload_format or get_upload_format()
+    container, subtype, extension = UPLOAD_FORMATS[upload_format]
+
+    audio_data = np.asarray(audio_data, dtype=np.float32).reshape(-1)
+    if subtype == "PCM_16":
+        audio_data = _to_pcm16(audio_data)
+
+    buffer = io.BytesIO()
+    sf.write(buffer, audio_data, sample_rate, format=container, subtype=subtype)
+    return f"utterance.{extension}", buffer.getvalue()
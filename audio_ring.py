@@ -0,0 +1,230 @@
+# audio_ring.py
+import threading
+import time
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Preallocated float32 ring for one producer (the WebRTC audio processor)
+    and one consumer (the pipeline's capture loop).
+
+    Each side only advances its own position, so reads and writes take no
+    lock. When the consumer falls behind, incoming samples that do not fit
+    are dropped and counted; unread audio is never overwritten.
+
+    ``put``/``empty`` keep the queue-style interface the pipeline used
+    before: ``put(None)`` wakes the consumer so it can drain a partial block.
+
+    With ``allocate=False`` the storage is only allocated by ``allocate()``;
+    until then, and after ``release()``, writes are ignored: there is no
+    call to drop audio from, so they do not count as dropped.
+    """
+
+    def __init__(self, capacity_samples, allocate=True):
+        self.capacity = int(capacity_samples)
+        self._data = np.zeros(self.capacity, dtype=np.float32) if allocate else None
+        self._write_pos = 0
+        self._read_pos = 0
+        self._flush_requested = False
+        self._data_ready = threading.Event()
+        self.written_samples = 0
+        self.dropped_samples = 0
+        self.overflow_events = 0
+        self.high_water = 0
+
+    def available(self):
+        return self._write_pos - self._read_pos
+
+    def empty(self):
+        return self.available() == 0
+
+    @property
+    def allocated(self):
+        return self._data is not None
+
+    @property
+    def nbytes(self):
+        return 0 if self._data is None else self._data.nbytes
+
+    def allocate(self):
+        if self._data is None:
+            self._data = np.zeros(self.capacity, dtype=np.float32)
+
+    def release(self):
+        """Free the storage and discard unread audio (consumer side)."""
+        self.clear()
+        self._data = None
+
+    # ------------------- Producer side -------------------
+    def write(self, samples):
+        """Copy samples into the ring; returns how many were accepted."""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        # Local reference: release() may run on the consumer side meanwhile
+        data = self._data
+        if data is None:
+            return 0
+        free = self.capacity - (self._write_pos - self._read_pos)
+        count = min(samples.size, free)
+        if count < samples.size:
+            self.overflow_events += 1
+            self.dropped_samples += samples.size - count
+
+        if count:
+            start = self._write_pos % self.capacity
+            first = min(count, self.capacity - start)
+            data[start : start + first] = samples[:first]
+            if count > first:
+                data[: count - first] = samples[first:count]
+            self._write_pos += count
+            self.written_samples += count
+            self.high_water = max(self.high_water, self._write_pos - self._read_pos)
+
+        self._data_ready.set()
+        return count
+
+    def put(self, item, block=True, timeout=None):
+        if item is None:
+            self._flush_requested = True
+            self._data_ready.set()
+            return
+        self.write(item)
+
+    # ------------------- Consumer side -------------------
+    def read_into(self, out, count=None):
+        """Copy up to ``count`` samples (default ``out.size``) into ``out``."""
+        count = min(out.size if count is None else count, self.available())
+        if count:
+            start = self._read_pos % self.capacity
+            first = min(count, self.capacity - start)
+            out[:first] = self._data[start : start + first]
+            if count > first:
+                out[first:count] = self._data[: count - first]
+            self._read_pos += count
+        return count
+
+    def read_block(self, out, timeout=None):
+        """
+        Wait until ``out`` can be filled and read into it. Returns the sample
+        count: ``out.size`` normally, fewer after ``put(None)`` asks for a
+        flush, and 0 on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._data_ready.clear()
+            if self.available() >= out.size:
+                return self.read_into(out)
+            if self._flush_requested:
+                self._flush_requested = False
+                return self.read_into(out)
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return 0
+            self._data_ready.wait(remaining)
+
+    def clear(self):
+        """Discard unread audio (consumer side)."""
+        self._read_pos = self._write_pos
+        self._flush_requested = False
+
+    def stats(self):
+        return {
+            "capacity_samples": self.capacity,
+            "buffered_samples": self.available(),
+            "written_samples": self.written_samples,
+            "dropped_samples": self.dropped_samples,
+            "overflow_events": self.overflow_events,
+            "high_water_samples": self.high_water,
+        }
+
+
+class UtteranceBuffer:
+    """
+    Growable contiguous float32 buffer that collects one utterance block by
+    block without allocating per block.
+
+    With ``max_samples`` set the buffer never grows past it: appending at the
+    ceiling discards the oldest samples, counted in ``dropped_samples``.
+
+    With ``allocate=False`` the initial storage is only allocated by
+    ``allocate()``; ``release()`` frees it again.
+    """
+
+    def __init__(self, initial_samples, max_samples=None, allocate=True):
+        self.max_samples = None if max_samples is None else max(1, int(max_samples))
+        initial = int(initial_samples)
+        if self.max_samples is not None:
+            initial = min(initial, self.max_samples)
+        self.initial_samples = max(1, initial)
+        self._data = np.zeros(self.initial_samples if allocate else 0, dtype=np.float32)
+        self._size = 0
+        self.dropped_samples = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+    def append(self, samples):
+        if self.max_samples is not None and self._size + samples.size > self.max_samples:
+            if samples.size >= self.max_samples:
+                self.dropped_samples += self._size + samples.size - self.max_samples
+                samples = samples[-self.max_samples :]
+                self._size = 0
+            else:
+                self.dropped_samples += self.keep_last(self.max_samples - samples.size)
+        end = self._size + samples.size
+        if end > self._data.size:
+            capacity = max(end, self._data.size * 2)
+            if self.max_samples is not None:
+                capacity = min(capacity, self.max_samples)
+            grown = np.zeros(capacity, dtype=np.float32)
+            grown[: self._size] = self._data[: self._size]
+            self._data = grown
+        self._data[self._size : end] = samples
+        self._size = end
+
+    def view(self):
+        """Contiguous view of the utterance so far (valid until the next append/clear)."""
+        return self._data[: self._size]
+
+    def tail(self, samples):
+        return self._data[max(0, self._size - samples) : self._size]
+
+    def keep_last(self, samples):
+        """Discard all but the newest ``samples``; returns how many were discarded."""
+        dropped = self._size - max(0, int(samples))
+        if dropped <= 0:
+            return 0
+        self._data[: self._size - dropped] = self._data[dropped : self._size]
+        self._size -= dropped
+        return dropped
+
+    def split(self, at):
+        """Copy out the first ``at`` samples and keep the rest at the start of the buffer."""
+        head = self._data[:at].copy()
+        self.keep_last(self._size - at)
+        return head
+
+    def take(self):
+        """Copy the utterance out for another thread and reset the buffer."""
+        audio_data = self._data[: self._size].copy()
+        self._size = 0
+        return audio_data
+
+    def clear(self):
+        self._size = 0
+
+    def allocate(self):
+        if self._data.size < self.initial_samples:
+            grown = np.zeros(self.initial_samples, dtype=np.float32)
+            grown[: self._size] = self._data[: self._size]
+            self._data = grown
+
+    def release(self):
+        self._size = 0
+        self._data = np.zeros(0, dtype=np.float32)
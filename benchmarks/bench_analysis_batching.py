@@ -0,0 +1,98 @@
+"""
+Utterance analysis latency and chat requests with many concurrent calls,
+sending one request per utterance versus micro-batching across sessions.
+
+The local stub API serves at most --chat-concurrency completions at a time,
+standing in for a provider rate limit.
+
+    python benchmarks/bench_analysis_batching.py --sessions 20 --waits-ms 50 100 150
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_groq_server import CHAT_PATH, StubGroqServer  # noqa: E402
+
+
+def run_sessions(sessions, utterances, gap_sec, time_scale):
+    from sentiment import analyze_customer_utterance
+
+    latencies = []
+    lock = threading.Lock()
+
+    def session(index):
+        rng = np.random.default_rng(index)
+        for number in range(utterances):
+            time.sleep(rng.exponential(gap_sec) * time_scale)
+            started = time.perf_counter()
+            analyze_customer_utterance(f"Call {index} question {number}: what does the premium plan cost?")
+            with lock:
+                latencies.append((time.perf_counter() - started) / time_scale)
+
+    threads = [threading.Thread(target=session, args=(index,)) for index in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--utterances", type=int, default=10)
+    parser.add_argument("--gap-sec", type=float, default=3.0, help="mean pause between a call's utterances")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--waits-ms", type=float, nargs="+", default=[50.0, 100.0, 150.0])
+    parser.add_argument("--chat-latency", default="lognormal:0.5:0.3")
+    parser.add_argument("--chat-concurrency", type=int, default=2)
+    parser.add_argument("--time-scale", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = StubGroqServer(
+        chat_latency=args.chat_latency, time_scale=args.time_scale, chat_concurrency=args.chat_concurrency
+    ).start()
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ.setdefault("GROQ_API_KEY", "stub-key")
+    os.environ["ANALYSIS_CACHE_SIZE"] = "0"
+
+    import sentiment
+    from analysis_batcher import MicroBatcher
+
+    print(
+        f"{args.sessions} calls x {args.utterances} utterances, chat latency {args.chat_latency}, "
+        f"at most {args.chat_concurrency} concurrent completions"
+    )
+    print(f"{'mode':<16}{'requests':>10}{'batch':>7}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}")
+    for wait_ms in [None] + args.waits_ms:
+        batcher = None
+        if wait_ms is not None:
+            batcher = MicroBatcher(
+                sentiment._request_batch_analysis,
+                sentiment._request_utterance_analysis,
+                max_batch=args.batch_size,
+                max_wait_sec=wait_ms / 1000.0 * args.time_scale,
+            )
+        sentiment._batcher = batcher
+        server.requests.clear()
+        latencies = run_sessions(args.sessions, args.utterances, args.gap_sec, args.time_scale)
+        requests = server.requests.get(CHAT_PATH, 0)
+
+        mode = "single" if batcher is None else f"batched {wait_ms:g}ms"
+        mean_batch = len(latencies) / max(1, requests)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"{mode:<16}{requests:>10}{mean_batch:>7.1f}{p50:>8.2f}{p95:>8.2f}{p99:>8.2f}")
+        if batcher is not None:
+            batcher.close()
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
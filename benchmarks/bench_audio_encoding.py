@@ -0,0 +1,74 @@
+"""
+Compare per-utterance encode time and upload size for each upload format
+against the original temp-file WAV path.
+
+    python benchmarks/bench_audio_encoding.py --seconds 4 --repeat 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_encoding import UPLOAD_FORMATS, encode_audio  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def synthetic_utterance(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    # Voiced-like signal: harmonics with a slow amplitude envelope plus noise
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    voice = sum(np.sin(2 * np.pi * f0 * t) / (k + 1) for k, f0 in enumerate((140, 280, 420, 860)))
+    audio = 0.2 * envelope * voice + 0.01 * rng.standard_normal(t.size)
+    return audio.astype(np.float32)
+
+
+def legacy_temp_file(audio_data):
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_wav:
+        sf.write(tmp_wav.name, audio_data, SAMPLE_RATE)
+        tmp_wav_path = tmp_wav.name
+    try:
+        with open(tmp_wav_path, "rb") as audio_file:
+            return tmp_wav_path, audio_file.read()
+    finally:
+        os.remove(tmp_wav_path)
+
+
+def measure(encoder, audio_data, repeat):
+    timings = []
+    payload = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _, payload = encoder(audio_data)
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1000, len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=4.0, help="utterance length")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    audio_data = synthetic_utterance(args.seconds)
+    rows = [("temp-file wav (legacy)",) + measure(legacy_temp_file, audio_data, args.repeat)]
+    for upload_format in UPLOAD_FORMATS:
+        encoder = lambda data, fmt=upload_format: encode_audio(data, SAMPLE_RATE, fmt)
+        rows.append((f"in-memory {upload_format}",) + measure(encoder, audio_data, args.repeat))
+
+    baseline_bytes = rows[0][2]
+    print(f"{args.seconds:.1f}s utterance, median of {args.repeat} runs")
+    print(f"{'path':<26}{'encode ms':>12}{'bytes':>12}{'vs legacy':>12}")
+    for name, encode_ms, size in rows:
+        print(f"{name:<26}{encode_ms:>12.3f}{size:>12d}{size / baseline_bytes:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+What the capture loop uploads and holds in memory, with and without the
+pre-roll, maximum-utterance and memory limits:
+
+- a long silence followed by one short sentence (how much silence is uploaded)
+- background noise that never falls below the VAD threshold (how large the
+  utterance buffer grows and how the audio is cut)
+
+Transcription is replaced by a pool that records what it was given, so no
+API key is needed.
+
+    python benchmarks/bench_capture_bounds.py --silence-sec 120 --noise-sec 600
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import SalesCallPipeline  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+class RecordingPool:
+    """Stands in for the transcription pool: records each upload, returns no text."""
+
+    def __init__(self):
+        self.uploads = []
+
+    def submit(self, fn, audio_data, *args):
+        self.uploads.append(audio_data.size / SAMPLE_RATE)
+        future = Future()
+        future.set_result("")
+        return future
+
+
+def quiet(seconds, rng):
+    return 0.002 * rng.standard_normal(int(seconds * SAMPLE_RATE))
+
+
+def speech(seconds, rng):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return 0.2 * (np.sin(2 * np.pi * 140 * t) * (1.2 + np.sin(2 * np.pi * 3 * t)) + 0.3 * rng.standard_normal(t.size))
+
+
+def run(audio, bounded, never_silent=False):
+    pool = RecordingPool()
+    limits = {} if bounded else {"pre_roll_sec": None, "max_utterance_sec": None, "max_audio_memory_mb": None}
+    pipeline = SalesCallPipeline(output_dir=tempfile.mkdtemp(prefix="capture_"), transcription_pool=pool, **limits)
+    if never_silent:
+        pipeline.silence_detector.is_silent = lambda block: False
+    peak_bytes = 0
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline.start()
+        ring = pipeline.audio_queue
+        step = SAMPLE_RATE // 2
+        for offset in range(0, audio.size, step):
+            while ring.capacity - ring.available() < step:
+                time.sleep(0.001)
+            ring.write(audio[offset : offset + step])
+            peak_bytes = max(peak_bytes, pipeline.audio_buffer.nbytes)
+        while not ring.empty():
+            time.sleep(0.001)
+        peak_bytes = max(peak_bytes, pipeline.audio_buffer.nbytes)
+        stats = pipeline.capture_stats()
+        pipeline.stop(wait_for_finalize=True)
+    stats["uploads"] = pool.uploads
+    stats["peak_buffer_mb"] = peak_bytes / 2**20
+    stats["wall_sec"] = time.perf_counter() - started
+    return stats
+
+
+def describe(name, stats):
+    uploads = stats["uploads"]
+    longest = max(uploads, default=0.0)
+    print(
+        f"  {name:<9} {len(uploads):3d} uploads, {sum(uploads):7.1f}s uploaded, longest {longest:6.1f}s, "
+        f"peak buffer {stats['peak_buffer_mb']:6.2f} MB, trimmed {stats['trimmed_sec']:6.1f}s, "
+        f"forced cuts {stats['forced_cuts']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--silence-sec", type=float, default=120.0)
+    parser.add_argument("--noise-sec", type=float, default=600.0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    audio = np.concatenate([quiet(args.silence_sec, rng), speech(2.0, rng), quiet(2.0, rng)]).astype(np.float32)
+    print(f"{args.silence_sec:.0f}s of silence, then a 2s sentence:")
+    for name, bounded in (("unbounded", False), ("bounded", True)):
+        describe(name, run(audio, bounded))
+
+    audio = (0.05 * rng.standard_normal(int(args.noise_sec * SAMPLE_RATE))).astype(np.float32)
+    print(f"\n{args.noise_sec:.0f}s of noise the VAD never treats as silence:")
+    for name, bounded in (("unbounded", False), ("bounded", True)):
+        describe(name, run(audio, bounded, never_silent=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Cold-start costs: how long ``import main`` takes and which heavy modules it
+pulls in, the cost of a configuration lookup, and first-utterance and
+first-CRM-lookup latency in a fresh process with and without the Start Call
+prewarm. The stub API delays each new connection by --connect-latency to
+stand in for TCP/TLS setup to the real endpoint.
+
+    python benchmarks/bench_cold_start.py --connect-latency 0.15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+HEAVY_MODULES = ["gspread", "oauth2client", "pandas", "groq", "httpx", "streamlit"]
+
+IMPORT_SNIPPET = f"""
+import json, sys, time
+started = time.perf_counter()
+import main
+print(json.dumps({{"seconds": time.perf_counter() - started,
+                  "loaded": [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+
+def measure_imports(runs):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return statistics.median(result["seconds"] for result in results), results[-1]["loaded"]
+
+
+def speech_then_silence(sample_rate=16000):
+    rng = np.random.default_rng(0)
+    t = np.arange(int(1.5 * sample_rate)) / sample_rate
+    speech = 0.2 * (np.sin(2 * np.pi * 140 * t) + 0.5 * rng.standard_normal(t.size))
+    quiet = lambda seconds: 0.002 * rng.standard_normal(int(seconds * sample_rate))  # noqa: E731
+    return np.concatenate([quiet(1.0), speech, quiet(2.0)]).astype(np.float32)
+
+
+def child(mode, connect_latency):
+    """One fresh process: optionally prewarm, then time the first utterance and CRM lookup."""
+    from stub_groq_server import StubGroqServer
+
+    server = StubGroqServer(transcribe_latency="0.2", chat_latency="0.3", connect_latency=connect_latency).start()
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ.setdefault("GROQ_API_KEY", "stub-key")
+    os.environ["ANALYSIS_CACHE_SIZE"] = "0"
+
+    import groq_client
+    from main import SalesCallPipeline
+
+    result = {"mode": mode}
+    if mode == "warm":
+        from prewarm import prewarm
+
+        result["prewarm"] = prewarm(["connections", "crm", "analysis_cache"])
+
+    connections_before = groq_client.get_connection_stats()["new_connections"]
+    pipeline = SalesCallPipeline(output_dir=tempfile.mkdtemp(prefix="cold_start_"))
+    pipeline._save_post_call_summary = lambda: None
+    pipeline.start()
+    pipeline.audio_queue.write(speech_then_silence(pipeline.sample_rate))
+    waited = time.perf_counter()
+    while not pipeline.suggestion_latencies and time.perf_counter() - waited < 30:
+        time.sleep(0.005)
+    pipeline.stop(wait_for_finalize=True)
+    result["first_transcript_ms"] = round(pipeline.transcript_latencies[0] * 1000, 1)
+    result["first_suggestion_ms"] = round(pipeline.suggestion_latencies[0] * 1000, 1)
+    result["connections_opened_during_call"] = (
+        groq_client.get_connection_stats()["new_connections"] - connections_before
+    )
+
+    from crm_functions import get_client_data_from_csv
+
+    started = time.perf_counter()
+    get_client_data_from_csv("9876543210")
+    result["first_crm_lookup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    server.stop()
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connect-latency", type=float, default=0.15)
+    parser.add_argument("--import-runs", type=int, default=3)
+    parser.add_argument("--child", choices=["cold", "warm"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        import contextlib
+        import io
+
+        with contextlib.redirect_stdout(io.StringIO()) as captured:
+            child(args.child, args.connect_latency)
+        print(captured.getvalue().strip().splitlines()[-1])
+        return
+
+    seconds, loaded = measure_imports(args.import_runs)
+    print(f"import main: {seconds * 1000:.0f} ms (median of {args.import_runs}), heavy modules loaded: {loaded}")
+
+    from runtime_config import get_groq_api_key
+
+    get_groq_api_key()
+    started = time.perf_counter()
+    for _ in range(10000):
+        get_groq_api_key()
+    print(f"get_groq_api_key: {(time.perf_counter() - started) / 10000 * 1e6:.2f} us per call")
+
+    print(f"\nfirst utterance in a fresh process, {args.connect_latency * 1000:.0f} ms per new connection:")
+    for mode in ("cold", "warm"):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", mode, "--connect-latency", str(args.connect_latency)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"  {mode:<4}  transcript {result['first_transcript_ms']:7.1f} ms  "
+            f"suggestion {result['first_suggestion_ms']:7.1f} ms  "
+            f"CRM lookup {result['first_crm_lookup_ms']:7.1f} ms  "
+            f"new connections during call {result['connections_opened_during_call']}"
+            + (f"  prewarm {result['prewarm']}" if "prewarm" in result else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
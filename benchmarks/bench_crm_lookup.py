@@ -0,0 +1,99 @@
+"""
+Phone lookup latency for the CRM phone index on a synthetic export.
+
+    python benchmarks/bench_crm_lookup.py --rows 5000000 --queries 2000
+
+The original iterrows() scan is timed on --legacy-rows rows only (it is O(rows)
+per lookup), and index results are checked against it on that subset.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crm_index import PhoneIndex, normalize_phone  # noqa: E402
+
+
+def synthetic_phones(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    numbers = rng.integers(6_000_000_000, 9_999_999_999, size=rows, dtype=np.int64).astype(str)
+    prefixes = np.array(["+91-", "+91 ", "91", ""])[rng.integers(0, 4, size=rows)]
+    return np.char.add(prefixes, numbers).tolist()
+
+
+def sample_queries(phones, count, seed=1):
+    rng = np.random.default_rng(seed)
+    queries = []
+    for row in rng.integers(0, len(phones), size=count):
+        digits = normalize_phone(phones[row])[-10:]
+        kind = len(queries) % 4
+        if kind == 0:
+            queries.append("+91 " + digits)  # full number, different formatting
+        elif kind == 1:
+            queries.append(digits)  # missing country code
+        elif kind == 2:
+            queries.append(digits[-6:])  # last-N digits
+        else:
+            queries.append(str(rng.integers(1_000_000_000, 5_999_999_999)))  # miss
+    return queries
+
+
+def legacy_lookup(df, phone_number):
+    clean_phone = normalize_phone(phone_number)
+    for row, (_, record) in enumerate(df.iterrows()):
+        csv_phone = normalize_phone(record["Phone"])
+        if clean_phone in csv_phone or csv_phone in clean_phone:
+            return row
+    return None
+
+
+def percentile_us(samples, q):
+    return np.percentile(samples, q) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--legacy-rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    phones = synthetic_phones(args.rows)
+    start = time.perf_counter()
+    index = PhoneIndex(phones)
+    build_sec = time.perf_counter() - start
+    print(f"index build for {args.rows:,} rows: {build_sec:.2f}s ({index.suffix_pointers.size:,} distinct suffixes)")
+
+    timings = []
+    for query in sample_queries(phones, args.queries):
+        start = time.perf_counter()
+        index.lookup(query)
+        timings.append(time.perf_counter() - start)
+    print(
+        f"indexed lookup: p50 {percentile_us(timings, 50):.1f}us  p99 {percentile_us(timings, 99):.1f}us  "
+        f"max {max(timings) * 1e6:.1f}us"
+    )
+
+    subset = phones[: args.legacy_rows]
+    df = pd.DataFrame({"Phone": subset})
+    subset_index = PhoneIndex(subset)
+    legacy_timings = []
+    mismatches = 0
+    for query in sample_queries(subset, 50):
+        start = time.perf_counter()
+        expected = legacy_lookup(df, query)
+        legacy_timings.append(time.perf_counter() - start)
+        mismatches += expected != subset_index.lookup(query)
+    print(
+        f"legacy iterrows scan on {args.legacy_rows:,} rows: p50 {np.percentile(legacy_timings, 50) * 1e3:.1f}ms "
+        f"(scales linearly with rows); mismatches vs index: {mismatches}"
+    )
+
+
+if __name__ == "__main__":
+    main()
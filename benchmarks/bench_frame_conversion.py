@@ -0,0 +1,133 @@
+"""
+Frames per second and heap allocation per frame of the WebRTC frame
+conversion (``webrtc_audio._to_float_mono``) against the previous
+``to_ndarray`` / ``np.mean`` / ``astype`` version, for 20 ms frames at
+48 kHz in the formats browsers send: interleaved s16 and planar fltp, mono
+and stereo. Allocation is the tracemalloc peak above the steady state while
+converting one frame.
+
+Each output is also checked against a float64 downmix of the same samples.
+If streamlit_webrtc is not installed, its processor base class is replaced
+by a stand-in so the module imports; the conversion does not use it.
+
+    python benchmarks/bench_frame_conversion.py --frames 20000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import types
+
+import av
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_RATE = 48000
+FRAME_SAMPLES = 960
+
+
+def import_webrtc_audio():
+    try:
+        import streamlit_webrtc  # noqa: F401
+        real_component = True
+    except ImportError:
+        module = types.ModuleType("streamlit_webrtc")
+        module.AudioProcessorBase = object
+        sys.modules["streamlit_webrtc"] = module
+        real_component = False
+    import webrtc_audio
+
+    return webrtc_audio, real_component
+
+
+def legacy_to_float_mono(audio_frame):
+    """The conversion used before the per-format path."""
+    audio = audio_frame.to_ndarray()
+    original_dtype = audio.dtype
+
+    if audio.ndim == 2:
+        audio = np.mean(audio, axis=0)
+    else:
+        audio = audio.reshape(-1)
+
+    audio = audio.astype(np.float32, copy=False)
+
+    if np.issubdtype(original_dtype, np.integer):
+        max_value = np.iinfo(original_dtype).max
+        if max_value:
+            audio = audio / float(max_value)
+
+    return audio.astype(np.float32, copy=False)
+
+
+def make_frame(sample_format, layout, rng):
+    channels = 2 if layout == "stereo" else 1
+    signal = 0.5 * rng.uniform(-1.0, 1.0, size=(channels, FRAME_SAMPLES))
+    reference = signal.mean(axis=0)
+    if sample_format == "s16":
+        samples = np.round(signal * np.iinfo(np.int16).max).astype(np.int16)
+        reference = samples.astype(np.float64).mean(axis=0) / np.iinfo(np.int16).max
+        # Packed: one plane of interleaved samples
+        array = samples.T.reshape(1, -1)
+    else:
+        array = signal.astype(np.float32)
+    frame = av.AudioFrame.from_ndarray(array, format=sample_format, layout=layout)
+    frame.sample_rate = SAMPLE_RATE
+    return frame, reference
+
+
+def frames_per_second(convert, frame, count):
+    convert(frame)
+    started = time.perf_counter()
+    for _ in range(count):
+        convert(frame)
+    return count / (time.perf_counter() - started)
+
+
+def bytes_per_frame(convert, frame, count=200):
+    convert(frame)
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(count):
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            convert(frame)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return int(np.median(peaks))
+
+
+def describe_error(output, reference):
+    if output.size != reference.size:
+        return f"{output.size} samples, expected {reference.size}"
+    return f"max error {np.max(np.abs(output.astype(np.float64) - reference)):.1e}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=20000)
+    args = parser.parse_args()
+
+    webrtc_audio, real_component = import_webrtc_audio()
+    buffer = np.empty(3 * FRAME_SAMPLES, dtype=np.float32)
+    current = lambda frame: webrtc_audio._to_float_mono(frame, out=buffer)  # noqa: E731
+    rng = np.random.default_rng(0)
+
+    print(f"{FRAME_SAMPLES}-sample frames at {SAMPLE_RATE} Hz"
+          + ("" if real_component else "; streamlit_webrtc not installed, base class replaced by a stand-in"))
+    for sample_format, layout in (("s16", "mono"), ("s16", "stereo"), ("fltp", "mono"), ("fltp", "stereo")):
+        frame, reference = make_frame(sample_format, layout, rng)
+        print(f"\n{sample_format} {layout}:")
+        for name, convert in (("previous", legacy_to_float_mono), ("current", current)):
+            rate = frames_per_second(convert, frame, args.frames)
+            allocated = bytes_per_frame(convert, frame)
+            print(f"  {name:<9} {rate:>9,.0f} frames/s  {allocated:>6,d} B allocated/frame  "
+                  f"{describe_error(convert(frame), reference)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+End-of-speech -> suggestion latency when the customer speaks several short
+sentences back to back, comparing the staged pipeline with the old inline
+(transcribe -> analyze -> publish on the capture thread) behaviour.
+
+Transcription and analysis are replaced by sleeps so no API key is needed.
+
+    python benchmarks/bench_pipeline_latency.py --sentences 8 --time-scale 0.25
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from main import SalesCallPipeline  # noqa: E402
+
+
+class InlinePipeline(SalesCallPipeline):
+    """Reproduces the pre-pipelining behaviour: every stage runs on the capture thread."""
+
+    def _submit_utterance(self):
+        if not self.audio_buffer:
+            return
+        utterance_id = self._open_utterance or self._begin_utterance()
+        self._open_utterance = None
+        audio_data = self.audio_buffer.take()
+        ended_at = time.perf_counter()
+        full_transcript = self._transcribe_stage(audio_data)
+        if full_transcript:
+            analysis = main.analyze_customer_utterance(full_transcript)
+            self._publish(utterance_id, ended_at, full_transcript, analysis)
+
+
+def install_stubs(transcribe_sec, analyze_sec):
+    def transcribe_audio(model, audio_data, **kwargs):
+        time.sleep(transcribe_sec)
+        return [f"utterance of {audio_data.size} samples"]
+
+    def analyze_customer_utterance(text, **kwargs):
+        time.sleep(analyze_sec)
+        return {"sentiment": "neutral", "intent": "unknown", "summary": text, "suggestion": "ok"}
+
+    main.transcribe_audio = transcribe_audio
+    main.analyze_customer_utterance = analyze_customer_utterance
+    main.analyze_post_call_summary = lambda text: {"sentiment": "neutral", "summary": ""}
+    main.queue_post_call_summary = lambda *args: None
+    main.print = lambda *args, **kwargs: None
+
+
+def feed_sentences(pipeline, sentences, speech_sec, pause_sec, block_sleep):
+    """
+    Feed audio in real time (scaled) and return the wall-clock moment each
+    sentence's end-of-speech was detectable, i.e. when the block that completes
+    the required silence was delivered.
+    """
+    rng = np.random.default_rng(0)
+    block = pipeline.frames_per_block
+    speech_blocks = int(speech_sec / pipeline.block_duration)
+    pause_blocks = int(pause_sec / pipeline.block_duration)
+    required = pipeline.silence_detector.silence_blocks_required
+    speech_ends = []
+    # Leading silence so the dynamic threshold has a noise floor to compare against
+    for _ in range(pipeline.silence_detector.buffer_blocks):
+        pipeline.enqueue_audio(np.zeros(block, dtype=np.float32))
+        time.sleep(block_sleep)
+    for _ in range(sentences):
+        for _ in range(speech_blocks):
+            pipeline.enqueue_audio((0.3 * rng.standard_normal(block)).astype(np.float32))
+            time.sleep(block_sleep)
+        for index in range(pause_blocks):
+            pipeline.enqueue_audio(np.zeros(block, dtype=np.float32))
+            if index == required - 1:
+                speech_ends.append(time.perf_counter())
+            time.sleep(block_sleep)
+    return speech_ends
+
+
+def run(pipeline_cls, args):
+    pipeline = pipeline_cls()
+    published = []
+    publish = pipeline._publish
+
+    def timed_publish(*publish_args):
+        publish(*publish_args)
+        published.append(time.perf_counter())
+
+    pipeline._publish = timed_publish
+    pipeline._save_post_call_summary = lambda: None
+    pipeline.start()
+    block_sleep = pipeline.block_duration * args.time_scale
+    speech_ends = feed_sentences(pipeline, args.sentences, args.speech_sec, args.pause_sec, block_sleep)
+    pipeline.stop(wait_for_finalize=True, timeout=600)
+
+    count = min(len(speech_ends), len(published))
+    latencies = np.array(published[:count]) - np.array(speech_ends[:count])
+    return latencies / args.time_scale
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sentences", type=int, default=8)
+    parser.add_argument("--speech-sec", type=float, default=0.6)
+    parser.add_argument("--pause-sec", type=float, default=1.3)
+    parser.add_argument("--transcribe-sec", type=float, default=1.2)
+    parser.add_argument("--analyze-sec", type=float, default=1.0)
+    parser.add_argument(
+        "--time-scale", type=float, default=0.25, help="run faster than real time; results are rescaled"
+    )
+    args = parser.parse_args()
+
+    install_stubs(args.transcribe_sec * args.time_scale, args.analyze_sec * args.time_scale)
+    os.chdir(tempfile.mkdtemp(prefix="bench_pipeline_"))
+
+    print(
+        f"{args.sentences} sentences of {args.speech_sec}s with {args.pause_sec}s pauses; "
+        f"transcription {args.transcribe_sec}s, analysis {args.analyze_sec}s"
+    )
+    print(f"{'pipeline':<12}{'p50 s':>8}{'p95 s':>8}{'max s':>8}  per-utterance")
+    for name, pipeline_cls in (("inline", InlinePipeline), ("staged", SalesCallPipeline)):
+        latencies = run(pipeline_cls, args)
+        per_utterance = " ".join(f"{value:.2f}" for value in latencies)
+        print(
+            f"{name:<12}{np.percentile(latencies, 50):>8.2f}{np.percentile(latencies, 95):>8.2f}"
+            f"{latencies.max():>8.2f}  {per_utterance}"
+        )
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,143 @@
+"""
+Related-product query latency with the category/price index against the
+original full-table scan, on synthetic catalogues of --rows rows (repeated
+product names, categories in mixed case, integer prices).
+
+Reported separately: finding the rows (index binary search vs boolean scan),
+the full get_related_products result (rows + to_dict records), and top-k
+distinct products by price proximity. Results are checked against the
+original scan and a pandas top-k on every timed legacy query.
+
+    python benchmarks/bench_related_products.py --rows 1000000 10000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crm_functions import RELATED_COLUMNS, _build_product_index, _related_records  # noqa: E402
+
+CATEGORIES = [
+    "Laptop", "Headset", "Monitor", "Ergonomic Accessory", "Keyboard", "Mouse", "Webcam", "Docking Station",
+    "Printer", "Router", "Tablet", "Smartphone", "Speaker", "Storage", "Software License", "Projector",
+]
+
+
+def synthetic_catalogue(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    products = 20_000
+    product_category = rng.integers(0, len(CATEGORIES), size=products)
+    product_price = np.round(np.exp(rng.uniform(np.log(500), np.log(200_000), size=products)), -1)
+    names = pd.Categorical.from_codes(np.arange(products), [f"Product {index:05d}" for index in range(products)])
+
+    picks = rng.integers(0, products, size=rows)
+    spellings = [[name, name.lower(), name.upper()] for name in CATEGORIES]
+    categories = [spelling for spelling_set in spellings for spelling in spelling_set]
+    category_codes = product_category[picks] * 3 + rng.choice(3, size=rows, p=[0.8, 0.15, 0.05])
+    # Object columns sharing string objects, as read_csv gives for repeated values
+    return pd.DataFrame({
+        "Product Name": pd.Series(names.take(picks)).astype(object),
+        "Category": pd.Series(pd.Categorical.from_codes(category_codes, categories)).astype(object),
+        "Price (INR)": (product_price[picks] * rng.uniform(0.9, 1.1, size=rows)).round().astype(np.int64),
+    })
+
+
+def sample_queries(count, seed=1):
+    rng = np.random.default_rng(seed)
+    queries = []
+    for index in range(count):
+        category = CATEGORIES[rng.integers(0, len(CATEGORIES))]
+        category = category.lower() if index % 2 else category
+        if index % 10 == 9:
+            category = "Garden Furniture"  # no such category
+        center = float(np.exp(rng.uniform(np.log(1000), np.log(150_000))))
+        spread = rng.uniform(0.02, 0.2)
+        queries.append((category, (int(center * (1 - spread)), int(center * (1 + spread)))))
+    return queries
+
+
+def legacy_related_products(df, category, price_range):
+    """The original get_related_products body."""
+    min_price, max_price = price_range
+    related = df[
+        (df['Category'].astype(str).str.lower() == str(category).lower()) &
+        (df['Price (INR)'] >= min_price) &
+        (df['Price (INR)'] <= max_price)
+    ]
+    return related[['Product Name', 'Price (INR)', 'Category']].to_dict('records')
+
+
+def legacy_top_k(df, category, price_range, top_k):
+    """Top-k by proximity to the middle of the range on the scan result, distinct names."""
+    min_price, max_price = price_range
+    related = df[
+        (df['Category'].astype(str).str.lower() == str(category).lower()) &
+        (df['Price (INR)'] >= min_price) &
+        (df['Price (INR)'] <= max_price)
+    ][RELATED_COLUMNS]
+    distance = (related['Price (INR)'] - (min_price + max_price) / 2).abs()
+    related = related.assign(distance=distance).sort_values(['distance', 'Price (INR)'], kind='stable')
+    related = related[~related['Product Name'].astype(str).str.lower().duplicated()]
+    return related.head(top_k)[RELATED_COLUMNS].to_dict('records')
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def describe(timings):
+    return f"p50 {np.percentile(timings, 50) * 1e3:8.3f} ms  p99 {np.percentile(timings, 99) * 1e3:8.3f} ms"
+
+
+def bench(rows, queries, legacy_queries, top_k):
+    df = synthetic_catalogue(rows)
+    index, build_sec = timed(_build_product_index, df)
+    index_mb = (index.rows.nbytes + index.prices.nbytes + index.name_codes.nbytes) / 2**20
+    print(f"\n{rows:,} rows: index build {build_sec:.2f}s (keys, codes and sort), {index_mb:.0f} MB")
+
+    search, records, nearest, sizes = [], [], [], []
+    for category, (low, high) in sample_queries(queries):
+        category = category.lower()
+        found, seconds = timed(index.range_rows, category, low, high)
+        search.append(seconds)
+        sizes.append(found.size)
+        records.append(seconds + timed(_related_records, df, found)[1])
+        picked, seconds = timed(index.nearest_rows, category, low, high, top_k)
+        nearest.append(seconds + timed(_related_records, df, picked)[1])
+    print(f"  index, rows only        {describe(search)}  (median {int(np.median(sizes)):,} rows per query)")
+    print(f"  index, with records     {describe(records)}")
+    print(f"  index, top-{top_k:<2} distinct   {describe(nearest)}")
+
+    scan, mismatches = [], 0
+    for category, price_range in sample_queries(legacy_queries, seed=2):
+        expected, seconds = timed(legacy_related_products, df, category, price_range)
+        scan.append(seconds)
+        key = category.lower()
+        mismatches += expected != _related_records(df, index.range_rows(key, *price_range))
+        expected = legacy_top_k(df, category, price_range, top_k)
+        mismatches += expected != _related_records(df, index.nearest_rows(key, *price_range, top_k))
+    print(f"  original scan           {describe(scan)}  ({legacy_queries} queries)")
+    print(f"  mismatches vs scan and pandas top-{top_k}: {mismatches}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--legacy-queries", type=int, default=10)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        bench(rows, args.queries, args.legacy_queries, args.top_k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Throughput and signal quality of the streaming polyphase resampler versus the
+old per-frame linear interpolation (``_resample_audio``).
+
+Quality is measured against an FFT band-limited reference resampling of the
+whole signal: SNR on in-band tones, and how much of an out-of-band tone
+(above 8 kHz) aliases into the 16 kHz output.
+
+    python benchmarks/bench_resampler.py --frame-ms 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resampler import PolyphaseResampler  # noqa: E402
+
+TARGET_RATE = 16000
+
+
+def legacy_resample(audio, source_rate, target_rate):
+    """The per-frame function used before the polyphase resampler."""
+    if audio.size == 0 or source_rate <= 0 or source_rate == target_rate:
+        return audio.astype(np.float32, copy=False)
+
+    target_length = max(1, int(round(audio.size * target_rate / source_rate)))
+    if target_length == audio.size:
+        return audio.astype(np.float32, copy=False)
+
+    source_positions = np.arange(audio.size, dtype=np.float32)
+    target_positions = np.linspace(0.0, audio.size - 1, num=target_length, dtype=np.float32)
+    return np.interp(target_positions, source_positions, audio).astype(np.float32, copy=False)
+
+
+def reference_resample(signal, source_rate, delay_samples=0.0):
+    """Ideal band-limited resampling via the FFT, optionally delayed (in output samples)."""
+    spectrum = np.fft.rfft(signal)
+    output_length = signal.size * TARGET_RATE // source_rate
+    bins = output_length // 2 + 1
+    spectrum = spectrum[:bins] * (output_length / signal.size)
+    frequencies = np.arange(bins) / output_length
+    spectrum = spectrum * np.exp(-2j * np.pi * frequencies * delay_samples)
+    return np.fft.irfft(spectrum, n=output_length)
+
+
+def stream(process, signal, frame_size):
+    chunks = []
+    for start in range(0, signal.size, frame_size):
+        chunks.append(np.array(process(signal[start : start + frame_size]), copy=True))
+    return np.concatenate(chunks)
+
+
+def tones(source_rate, seconds, frequencies):
+    t = np.arange(int(source_rate * seconds)) / source_rate
+    return sum(0.2 * np.sin(2 * np.pi * frequency * t) for frequency in frequencies).astype(np.float32)
+
+
+def snr_db(output, reference, skip):
+    size = min(output.size, reference.size) - skip
+    error = output[skip : skip + size] - reference[skip : skip + size]
+    return 10 * np.log10(np.mean(reference[skip : skip + size] ** 2) / np.mean(error**2))
+
+
+def alias_db(output, skip):
+    # Relative level of whatever lands in the output from a full-scale 0.2 tone above 8 kHz
+    residual = np.sqrt(np.mean(output[skip:-skip] ** 2))
+    return 20 * np.log10(max(residual, 1e-12) / (0.2 / np.sqrt(2)))
+
+
+def throughput(process, signal, frame_size, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for offset in range(0, signal.size, frame_size):
+            process(signal[offset : offset + frame_size])
+    return repeat * signal.size / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frame-ms", type=float, default=20.0)
+    parser.add_argument("--seconds", type=float, default=4.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    header = f"{'rate':>7} {'method':<10}{'Msamples/s':>12}{'in-band SNR dB':>16}{'alias dB':>10}"
+    print(f"{args.frame_ms:g} ms frames; SNR vs FFT reference, alias = 10-12 kHz tones leaking into output")
+    print(header)
+    for source_rate in (48000, 44100):
+        frame_size = int(source_rate * args.frame_ms / 1000)
+        in_band = tones(source_rate, args.seconds, (300, 1200, 3400, 6000))
+        out_of_band = tones(source_rate, args.seconds, (10000, 12000))
+        skip = TARGET_RATE // 10
+
+        methods = {
+            "linear": lambda: (lambda frame: legacy_resample(frame, source_rate, TARGET_RATE)),
+            "polyphase": lambda: PolyphaseResampler(source_rate, TARGET_RATE).process,
+        }
+        for name, make in methods.items():
+            delay = PolyphaseResampler(source_rate, TARGET_RATE).delay_samples if name == "polyphase" else 0.0
+            reference = reference_resample(in_band.astype(np.float64), source_rate, delay)
+            quality = snr_db(stream(make(), in_band, frame_size), reference, skip)
+            aliasing = alias_db(stream(make(), out_of_band, frame_size), skip)
+            rate = throughput(make(), in_band, frame_size, args.repeat) / 1e6
+            print(f"{source_rate:>7} {name:<10}{rate:>12.2f}{quality:>16.1f}{aliasing:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
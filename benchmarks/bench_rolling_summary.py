@@ -0,0 +1,99 @@
+"""
+Stop-to-summary latency for a long call: one post-call request over the full
+transcript versus the rolling summarizer, which folds chunks in during the
+call and only the tail at the end.
+
+Runs against the local stub API, whose chat latency grows with prompt size
+(--chat-sec-per-kb). The call itself is replayed faster than real time
+(--time-scale); the stop is measured in real time.
+
+    python benchmarks/bench_rolling_summary.py --minutes 60 --update-every 20
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_groq_server import CHAT_PATH, StubGroqServer  # noqa: E402
+
+PRODUCTS = ["premium plan", "starter plan", "analytics add-on", "support package", "team licence"]
+TEMPLATES = [
+    "How much does the {product} cost per month if we sign up for a year?",
+    "We are currently using a competitor and the {product} looks like it could replace it.",
+    "Honestly the {product} feels a bit expensive compared to what we pay now.",
+    "Can you send me a written quote for the {product} by Friday?",
+    "My manager needs to approve anything over five thousand dollars, including the {product}.",
+    "Does the {product} integrate with our existing CRM and billing system?",
+    "That sounds good, we would like a trial of the {product} for two weeks.",
+    "I am worried about the onboarding time for the {product} with our small team.",
+]
+
+
+def synthetic_transcript(minutes, gap_sec, seed=0):
+    rng = np.random.default_rng(seed)
+    count = int(minutes * 60 / gap_sec)
+    return [
+        TEMPLATES[rng.integers(len(TEMPLATES))].format(product=PRODUCTS[rng.integers(len(PRODUCTS))])
+        for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--minutes", type=float, default=60.0)
+    parser.add_argument("--gap-sec", type=float, default=8.0, help="seconds between customer utterances")
+    parser.add_argument("--update-every", type=int, default=20)
+    parser.add_argument("--chat-latency", default="0.6")
+    parser.add_argument("--chat-sec-per-kb", type=float, default=0.03)
+    parser.add_argument("--time-scale", type=float, default=0.005)
+    args = parser.parse_args()
+
+    server = StubGroqServer(chat_latency=args.chat_latency, chat_sec_per_kb=args.chat_sec_per_kb).start()
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ.setdefault("GROQ_API_KEY", "stub-key")
+
+    from rolling_summary import RollingSummarizer
+    from sentiment import analyze_post_call_summary
+
+    utterances = synthetic_transcript(args.minutes, args.gap_sec)
+    full_text = " ".join(utterances)
+    print(f"{args.minutes:g} minute call, {len(utterances)} utterances, {len(full_text) / 1024:.0f} KB transcript")
+
+    server.largest_request.clear()
+    started = time.perf_counter()
+    analyze_post_call_summary(full_text)
+    legacy_sec = time.perf_counter() - started
+    legacy_prompt = server.largest_request.get(CHAT_PATH, 0)
+
+    # Replay the call quickly, then stop it in real time
+    server.time_scale = args.time_scale
+    server.largest_request.clear()
+    pool = ThreadPoolExecutor(max_workers=2)
+    summarizer = RollingSummarizer(pool, update_every=args.update_every)
+    for text in utterances:
+        summarizer.add(text)
+        time.sleep(args.gap_sec * args.time_scale)
+    server.time_scale = 1.0
+    tail = summarizer.pending
+    started = time.perf_counter()
+    summarizer.finalize()
+    rolling_sec = time.perf_counter() - started
+    rolling_prompt = server.largest_request.get(CHAT_PATH, 0)
+    pool.shutdown()
+
+    print(f"{'mode':<12}{'stop->summary s':>17}{'largest prompt KB':>19}{'requests':>10}")
+    print(f"{'full':<12}{legacy_sec:>17.2f}{legacy_prompt / 1024:>19.1f}{1:>10}")
+    print(
+        f"{'rolling':<12}{rolling_sec:>17.2f}{rolling_prompt / 1024:>19.1f}{summarizer.updates + 1:>10}"
+        f"   ({tail} utterances folded at stop)"
+    )
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Measure what stage timing costs per span and check the metrics endpoint:
+record a few spans, then fetch /metrics (Prometheus text) and /metrics.json.
+
+    python benchmarks/bench_stage_metrics.py --spans 200000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stage_metrics  # noqa: E402
+from stage_metrics import StageMetrics, record, session_scope, span  # noqa: E402
+
+
+def per_call_ns(fn, count):
+    started = time.perf_counter_ns()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter_ns() - started) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--spans", type=int, default=200000)
+    parser.add_argument("--port", type=int, default=9464)
+    args = parser.parse_args()
+
+    session = StageMetrics()
+
+    def bare():
+        started = time.perf_counter()
+        time.perf_counter() - started
+
+    def recorded():
+        started = time.perf_counter()
+        record("bench_record", time.perf_counter() - started, session)
+
+    def spanned():
+        with span("bench_span", session):
+            pass
+
+    def scoped():
+        with session_scope(session), span("bench_scoped"):
+            pass
+
+    baseline = per_call_ns(bare, args.spans)
+    print(f"two perf_counter calls      {baseline:7.0f} ns")
+    for name, fn in (("record()", recorded), ("with span()", spanned), ("session_scope + span", scoped)):
+        print(f"{name:<27} {per_call_ns(fn, args.spans) - baseline:7.0f} ns on top")
+
+    for stage, seconds in (("transcription", 0.42), ("analysis", 0.61), ("vad", 0.00004)):
+        record(stage, seconds, session)
+    server = stage_metrics.start_metrics_server(args.port, sessions=lambda: {"bench": session})
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    text = urllib.request.urlopen(f"{base_url}/metrics").read().decode("utf-8")
+    snapshot = json.loads(urllib.request.urlopen(f"{base_url}/metrics.json").read())
+    print()
+    print(f"/metrics: {len(text.splitlines())} lines, e.g.")
+    for line in text.splitlines():
+        if line.startswith(f"{stage_metrics.METRIC_NAME}_count"):
+            print(f"  {line}")
+    print(f"/metrics.json session 'bench' transcription: {snapshot['sessions']['bench']['transcription']}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Time-to-first-text vs time-to-final-text (from speech onset) and transcription
+requests per utterance, with streaming partials off and at several cadences.
+
+Runs the real pipeline against the local stub API.
+
+    python benchmarks/bench_streaming_partials.py --utterance-sec 12 --intervals 0.5 1 2
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_groq_server import StubGroqServer  # noqa: E402
+
+
+def feed(pipeline, utterances, utterance_sec, pause_sec, time_scale):
+    rng = np.random.default_rng(0)
+    block = pipeline.frames_per_block
+    silence = np.zeros(block, dtype=np.float32)
+    plan = [False] * pipeline.silence_detector.buffer_blocks
+    for _ in range(utterances):
+        plan += [True] * int(utterance_sec / pipeline.block_duration)
+        plan += [False] * int(pause_sec / pipeline.block_duration)
+
+    # Speech with a slowly varying level so the dynamic threshold keeps it voiced
+    started = time.perf_counter()
+    for index, is_speech in enumerate(plan):
+        level = 0.3 * (1.5 + np.sin(index / 3.0)) if is_speech else 0.0
+        audio = (level * rng.standard_normal(block)).astype(np.float32) if is_speech else silence
+        pipeline.enqueue_audio(audio)
+        delay = started + (index + 1) * pipeline.block_duration * time_scale - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def run(args, streaming, interval):
+    from main import SalesCallPipeline
+
+    pipeline = SalesCallPipeline(
+        session_id=f"bench-{streaming}-{interval}",
+        output_dir=tempfile.mkdtemp(prefix="bench_streaming_"),
+        streaming=streaming,
+        partial_interval_sec=interval or 1.0,
+        partial_window_sec=args.window_sec,
+    )
+    pipeline._save_post_call_summary = lambda: None
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline.start()
+        feed(pipeline, args.utterances, args.utterance_sec, args.pause_sec, args.time_scale)
+        pipeline.stop(wait_for_finalize=True, timeout=300)
+
+    first = np.array([item["time_to_first_text"] for item in pipeline.text_latencies]) / args.time_scale
+    final = np.array([item["time_to_final_text"] for item in pipeline.text_latencies]) / args.time_scale
+    finals = len(pipeline.text_latencies)
+    requests_per_utterance = (finals + pipeline.partial_requests) / max(1, finals)
+    return first, final, requests_per_utterance
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--utterances", type=int, default=3)
+    parser.add_argument("--utterance-sec", type=float, default=12.0)
+    parser.add_argument("--pause-sec", type=float, default=1.5)
+    parser.add_argument("--window-sec", type=float, default=8.0)
+    parser.add_argument("--intervals", type=float, nargs="+", default=[0.5, 1.0, 2.0])
+    parser.add_argument("--transcribe-latency", default="lognormal:0.35:0.3")
+    parser.add_argument("--chat-latency", default="lognormal:0.4:0.3")
+    parser.add_argument("--time-scale", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = StubGroqServer(
+        transcribe_latency=args.transcribe_latency,
+        chat_latency=args.chat_latency,
+        time_scale=args.time_scale,
+    ).start()
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ.setdefault("GROQ_API_KEY", "stub-key")
+
+    print(f"{args.utterances} utterances of {args.utterance_sec}s; latencies measured from speech onset")
+    print(f"{'mode':<18}{'first text p50':>16}{'final text p50':>16}{'API calls/utt':>15}")
+    for streaming, interval in [(False, None)] + [(True, interval) for interval in args.intervals]:
+        first, final, calls = run(args, streaming, interval)
+        mode = f"partials {interval}s" if streaming else "final only"
+        print(f"{mode:<18}{np.median(first):>16.2f}{np.median(final):>16.2f}{calls:>15.1f}")
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
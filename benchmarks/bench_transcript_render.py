@@ -0,0 +1,100 @@
+"""
+Per-refresh payload and render time of the live transcript at 10, 60 and
+180 minutes of call. The old view rendered every utterance on every refresh
+as one HTML blob; the windowed view renders the last LIVE_WINDOW_SEGMENTS
+utterances from segments formatted once on arrival.
+
+Each refresh runs in Streamlit's AppTest; the payload is the markdown
+sent for the transcript.
+
+    python benchmarks/bench_transcript_render.py --minutes 10 60 180 --per-minute 10
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from live_view import format_segment  # noqa: E402
+
+
+def full_transcript_view():
+    import streamlit as st
+
+    from live_view import format_segment
+
+    lines = [format_segment(segment) for segment in st.session_state.live_segments]
+    st.markdown(f"<div class='big-box transcript-box'>{chr(10).join(lines)}</div>", unsafe_allow_html=True)
+
+
+def windowed_transcript_view():
+    from live_view import render_transcript
+
+    render_transcript(True)
+
+
+def segment(index):
+    return {
+        "timestamp": f"2024-01-01T10:{index // 60 % 60:02d}:{index % 60:02d}",
+        "text": f"Customer sentence {index}: what would the premium plan cost for a team of twelve people?",
+        "suggestion": "Quote the team tier and offer a two-week trial.",
+        "utterance_id": index + 1,
+    }
+
+
+def measure(view, count, runs, page_end=None):
+    segments = [segment(index) for index in range(count)]
+    app = AppTest.from_function(view, default_timeout=60)
+    app.session_state["live_segments"] = segments
+    app.session_state["live_rendered"] = [format_segment(item) for item in segments]
+    app.session_state["live_partial"] = None
+    app.session_state["live_page_end"] = page_end
+    app.session_state["live_seq"] = count
+    app.run()
+    total = 0.0
+    for index in range(runs):
+        # One new utterance per refresh, as during a live call
+        new = segment(count + index)
+        app.session_state["live_segments"].append(new)
+        app.session_state["live_rendered"].append(format_segment(new))
+        app.session_state["live_seq"] += 1
+        started = time.process_time()
+        app.run()
+        total += time.process_time() - started
+    if app.exception:
+        raise RuntimeError(app.exception)
+    payload = sum(len(element.value.encode("utf-8")) for element in app.markdown)
+    return payload, total / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, nargs="+", default=[10, 60, 180])
+    parser.add_argument("--per-minute", type=float, default=10.0, help="utterances per minute")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'call':>8} {'utterances':>10}  {'view':<16} {'payload':>10} {'render':>9}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = []
+        for minutes in args.minutes:
+            count = int(minutes * args.per_minute)
+            for name, view, page_end in (
+                ("full blob", full_transcript_view, None),
+                ("window", windowed_transcript_view, None),
+                ("window, paged", windowed_transcript_view, count // 2),
+            ):
+                payload, seconds = measure(view, count, args.runs, page_end)
+                rows.append((minutes, count, name, payload, seconds))
+    for minutes, count, name, payload, seconds in rows:
+        print(f"{minutes:>5} min {count:>10}  {name:<16} {payload / 1024:>7.1f} KB {seconds * 1000:>6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
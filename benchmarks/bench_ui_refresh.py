@@ -0,0 +1,126 @@
+"""
+Server CPU per connected agent while a call is live. Each refresh used to
+rerun the whole script every 2 s. Now only the live fragments rerun, every
+LIVE_REFRESH_SEC, and the full script runs once per interaction.
+
+Both are timed with Streamlit's AppTest against a session with --segments
+transcript segments and a post-call summary on disk. If streamlit_webrtc is
+not installed, its component is replaced by a no-op for the measurement,
+so its own cost is not included.
+
+    python benchmarks/bench_ui_refresh.py --segments 200 --runs 20
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+FULL_RERUN_INTERVAL_SEC = 2.0
+
+
+def ensure_webrtc_component():
+    try:
+        import streamlit_webrtc  # noqa: F401
+        return True
+    except ImportError:
+        module = types.ModuleType("streamlit_webrtc")
+        module.WebRtcMode = types.SimpleNamespace(SENDONLY="sendonly")
+        module.webrtc_streamer = lambda **kwargs: None
+        module.AudioProcessorBase = object
+        sys.modules["streamlit_webrtc"] = module
+        return False
+
+
+def live_fragments():
+    import streamlit as st
+
+    from live_view import sentiment_panel, transcript_panel
+
+    sentiment_panel(st.session_state.call_backend.channel)
+    transcript_panel(st.session_state.call_backend.channel)
+
+
+def make_backend(segments):
+    from main import SalesCallPipeline
+
+    backend = SalesCallPipeline(session_id="bench-ui", output_dir=tempfile.mkdtemp(prefix="ui_refresh_"))
+    for index in range(segments):
+        publish(backend, index)
+    with open(backend.post_summary_file, "w", encoding="utf-8") as file_handle:
+        json.dump({"transcript": "hello " * 5000, "sentiment": "neutral", "summary": "Summary.",
+                   "structured": {"key_topics": ["pricing"], "next_steps": ["Send quote"]}}, file_handle)
+    return backend
+
+
+def publish(backend, index):
+    backend.channel.publish_segment(
+        "2024-01-01T10:00:00", f"Customer sentence number {index} about pricing and delivery times.",
+        "Offer the standard plan.", index + 1,
+    )
+    backend.channel.publish_status("neutral", "Customer asks about pricing.", "Offer the standard plan.")
+
+
+def cpu_per_run(app, runs, before_each=None):
+    app.run()
+    total = 0.0
+    for _ in range(runs):
+        if before_each:
+            before_each()
+        started = time.process_time()
+        app.run()
+        total += time.process_time() - started
+    if app.exception:
+        raise RuntimeError(app.exception)
+    return total / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--live-refresh-sec", type=float, default=1.0)
+    args = parser.parse_args()
+
+    real_component = ensure_webrtc_component()
+    backend = make_backend(args.segments)
+    state = {"call_backend": backend, "listening": True}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        full = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+        for key, value in state.items():
+            full.session_state[key] = value
+        full_sec = cpu_per_run(full, args.runs)
+
+        fragment = AppTest.from_function(live_fragments, default_timeout=60)
+        for key, value in dict(state, live_seq=0, live_segments=[], live_rendered=[], live_page_end=None,
+                                      live_status={}, live_partial=None).items():
+            fragment.session_state[key] = value
+        idle_sec = cpu_per_run(fragment, args.runs)
+        counter = iter(range(args.segments, args.segments + args.runs + 1))
+        busy_sec = cpu_per_run(fragment, args.runs, lambda: publish(backend, next(counter)))
+
+    print(f"{args.segments} transcript segments"
+          + ("" if real_component else "; streamlit_webrtc not installed, component replaced by a no-op"))
+    print(f"  full-script rerun        {full_sec * 1000:7.1f} ms CPU")
+    print(f"  live fragments, no news  {idle_sec * 1000:7.1f} ms CPU")
+    print(f"  live fragments, new seg  {busy_sec * 1000:7.1f} ms CPU")
+    before = full_sec / FULL_RERUN_INTERVAL_SEC
+    after = busy_sec / args.live_refresh_sec
+    print(f"\nCPU per live agent: before {before * 100:.2f}% of a core (full rerun every "
+          f"{FULL_RERUN_INTERVAL_SEC:.0f}s), after {after * 100:.2f}% (fragments every {args.live_refresh_sec:g}s, "
+          f"new segment each time)")
+    print(f"agents per core: before {1 / before:.0f}, after {1 / after:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Exercise the call policy (retries, deadlines, circuit breaker, hedging)
+against the local stub API with injected 503s and slow responses, and print
+the policy metrics.
+
+    python benchmarks/check_call_policy.py --calls 60
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_groq_server import LatencyModel, StubGroqServer  # noqa: E402
+
+PAYLOAD = {"model": "stub", "messages": [{"role": "user", "content": "What does the premium plan cost?"}]}
+
+
+def check(name, passed, detail=""):
+    print(f"{'ok  ' if passed else 'FAIL'} {name}{': ' + detail if detail else ''}")
+    return passed
+
+
+def timed_calls(post, calls, **kwargs):
+    latencies, errors = [], []
+    for _ in range(calls):
+        started = time.perf_counter()
+        try:
+            post(PAYLOAD, **kwargs)
+        except Exception as error:
+            errors.append(error)
+        latencies.append(time.perf_counter() - started)
+    return np.array(latencies), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=60)
+    parser.add_argument("--hedge-calls", type=int, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.3)
+    args = parser.parse_args()
+
+    server = StubGroqServer(chat_latency="0.02").start()
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ.setdefault("GROQ_API_KEY", "stub-key")
+    os.environ["BREAKER_BREAKER_RESET_SEC"] = "0.5"
+    os.environ["HEDGED_HEDGE_PERCENTILE"] = "90"
+
+    from call_policy import CircuitOpenError, Deadline, DeadlineExceeded, get_policy_metrics
+    from groq_client import post_chat_completion
+
+    results = []
+
+    # Transient 503s are retried away
+    server.error_rate = args.error_rate
+    _, errors = timed_calls(post_chat_completion, args.calls, policy="retry")
+    metrics = get_policy_metrics()["retry"]
+    results.append(check(f"{args.error_rate:.0%} 503s retried", len(errors) <= args.calls * args.error_rate ** 3 * 3,
+                         f"{len(errors)} of {args.calls} calls failed after {metrics['retries']} retries"))
+
+    # A budget bounds the whole call, retries included
+    server.error_rate = 0.0
+    server.chat_latency = LatencyModel("1.0")
+    started = time.perf_counter()
+    try:
+        post_chat_completion(PAYLOAD, deadline=Deadline(0.3), policy="deadline")
+        timed_out = False
+    except Exception as error:
+        timed_out = isinstance(error, DeadlineExceeded) or "timed out" in str(error).lower()
+    elapsed = time.perf_counter() - started
+    results.append(check("slow call stops at its deadline", timed_out and elapsed < 0.5, f"{elapsed:.2f}s"))
+
+    # An outage opens the breaker; calls then fail fast until a probe succeeds
+    server.chat_latency = LatencyModel("0.02")
+    server.error_rate = 1.0
+    latencies, errors = timed_calls(post_chat_completion, 20, policy="breaker")
+    # The call that trips the breaker has already waited on the provider; the rest should not
+    fast = [latency for latency, error in zip(latencies, errors) if isinstance(error, CircuitOpenError)][1:]
+    results.append(check("breaker opens during outage", len(fast) > 0 and max(fast) < 0.005,
+                         f"{len(fast)} later calls short-circuited, slowest {max(fast, default=0) * 1000:.2f} ms"))
+    server.error_rate = 0.0
+    time.sleep(0.6)
+    _, errors = timed_calls(post_chat_completion, 5, policy="breaker")
+    state = get_policy_metrics()["breaker"]["breaker_state"]
+    results.append(check("breaker closes after recovery", not errors and state == "closed", state))
+
+    # Hedging trims the tail of a heavy-tailed latency distribution
+    server.chat_latency = LatencyModel("lognormal:0.05:1.0", seed=7)
+    plain, _ = timed_calls(post_chat_completion, args.hedge_calls, policy="plain")
+    hedged, _ = timed_calls(post_chat_completion, args.hedge_calls, policy="hedged")
+    metrics = get_policy_metrics()["hedged"]
+    print(f"     p50/p99 without hedging {np.percentile(plain, 50):.3f}/{np.percentile(plain, 99):.3f}s, "
+          f"with p90 hedging {np.percentile(hedged, 50):.3f}/{np.percentile(hedged, 99):.3f}s "
+          f"({metrics['hedges']} hedges, {metrics['hedge_wins']} won)")
+
+    print()
+    for name, values in get_policy_metrics().items():
+        print(f"     {name:<9} {values}")
+    server.stop()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
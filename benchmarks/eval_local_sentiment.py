@@ -0,0 +1,91 @@
+"""
+Agreement between the local sentiment classifier and LLM labels on a recorded
+corpus, with coverage (share of utterances the local label is used for) at
+several confidence thresholds.
+
+The corpus is JSON lines with "text" and the LLM's "sentiment". Record one
+from a text file of customer utterances (one per line) with --record; this
+calls the real API:
+
+    python benchmarks/eval_local_sentiment.py --record utterances.txt --corpus labels.jsonl
+    python benchmarks/eval_local_sentiment.py --corpus labels.jsonl --thresholds 0.5 0.6 0.7 0.8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment import _request_utterance_analysis, classify_sentiment  # noqa: E402
+
+LABELS = ("positive", "neutral", "negative")
+
+
+def record(utterances_path, corpus_path):
+    with open(utterances_path, "r", encoding="utf-8") as source, open(corpus_path, "w", encoding="utf-8") as corpus:
+        for line in source:
+            text = line.strip()
+            if not text:
+                continue
+            try:
+                label = _request_utterance_analysis(text)["sentiment"].strip().lower()
+            except Exception as error:
+                print(f"skipped {text!r}: {error}")
+                continue
+            corpus.write(json.dumps({"text": text, "sentiment": label}) + "\n")
+
+
+def load_corpus(path):
+    with open(path, "r", encoding="utf-8") as file_handle:
+        rows = [json.loads(line) for line in file_handle if line.strip()]
+    return [row for row in rows if row.get("sentiment", "").lower() in LABELS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", required=True)
+    parser.add_argument("--record", metavar="UTTERANCES_TXT")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.4, 0.5, 0.6, 0.7, 0.8])
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.corpus)
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print("corpus is empty")
+        return
+
+    references = [row["sentiment"].lower() for row in corpus]
+    started = time.perf_counter()
+    predictions = [classify_sentiment(row["text"], threshold=0.0) for row in corpus]
+    per_utterance_us = (time.perf_counter() - started) / len(corpus) * 1e6
+
+    labels = np.array([prediction["sentiment"] for prediction in predictions])
+    confidence = np.array([prediction["confidence"] for prediction in predictions])
+    agree = labels == np.array(references)
+
+    print(f"{len(corpus)} utterances, local classifier {per_utterance_us:.1f} us/utterance")
+    print(f"overall agreement with LLM labels: {agree.mean():.1%}")
+    print(f"{'threshold':>10}{'coverage':>10}{'agreement':>11}{'tiered':>9}")
+    for threshold in args.thresholds:
+        confident = confidence >= threshold
+        coverage = confident.mean()
+        local_agreement = agree[confident].mean() if confident.any() else float("nan")
+        # Tiered: local label when confident, the LLM's own label otherwise
+        tiered = np.where(confident, agree, True).mean()
+        print(f"{threshold:>10.2f}{coverage:>10.1%}{local_agreement:>11.1%}{tiered:>9.1%}")
+
+    print("\nconfusion (rows = LLM, columns = local)")
+    print(f"{'':>10}" + "".join(f"{label:>10}" for label in LABELS))
+    for reference in LABELS:
+        row = [np.sum((np.array(references) == reference) & (labels == label)) for label in LABELS]
+        print(f"{reference:>10}" + "".join(f"{count:>10}" for count in row))
+
+
+if __name__ == "__main__":
+    main()
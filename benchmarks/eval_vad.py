@@ -0,0 +1,265 @@
+"""
+False utterances and API calls per voice activity detector on labelled
+recordings. Each recording runs through the pipeline's capture loop
+unchanged, with transcription replaced by a pool that records what would
+have been uploaded.
+
+An utterance is false when less than --min-overlap seconds of it is
+labelled speech. Every upload is one transcription request and, when the
+transcript is not empty, one analysis request; noise usually transcribes
+to a short hallucinated phrase, so both are counted per false utterance.
+A labelled speech segment is missed when less than half of it was uploaded.
+
+Recordings are WAV files with an Audacity label track next to them
+(``call.wav`` + ``call.txt``, one ``start<TAB>end[<TAB>text]`` line per
+speech segment). Without recordings, a synthetic call is generated: voiced
+speech (harmonics shaped by vowel formants) alternating with a fan, mains
+hum, keyboard typing and microphone hiss, plus speech over the fan. It is
+a stand-in for real labelled calls, not a substitute.
+
+    python benchmarks/eval_vad.py recordings/*.wav
+    python benchmarks/eval_vad.py --synthetic-min 10
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio import VAD_BACKENDS, create_vad  # noqa: E402
+from main import SalesCallPipeline  # noqa: E402
+from resampler import PolyphaseResampler  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+# (F1, F2, F3) in Hz
+VOWELS = ((730, 1090, 2440), (270, 2290, 3010), (300, 870, 2240), (530, 1840, 2480), (570, 840, 2410))
+
+
+class RecordingPool:
+    """Stands in for the transcription pool: records the span of each upload."""
+
+    def __init__(self):
+        self.ring = None
+        self.uploads = []
+
+    def submit(self, fn, audio_data, *args):
+        # Everything read from the ring so far has been seen by the capture loop
+        end = (self.ring.written_samples - self.ring.available()) / SAMPLE_RATE
+        self.uploads.append((end - audio_data.size / SAMPLE_RATE, end))
+        future = Future()
+        future.set_result("")
+        return future
+
+
+# ------------------- Recordings -------------------
+def load_recording(path):
+    audio, rate = sf.read(path, dtype="float32", always_2d=True)
+    audio = audio.mean(axis=1)
+    if rate != SAMPLE_RATE:
+        audio = np.array(PolyphaseResampler(rate, SAMPLE_RATE).process(audio))
+    labels_path = os.path.splitext(path)[0] + ".txt"
+    segments = []
+    with open(labels_path, "r", encoding="utf-8") as file_handle:
+        for line in file_handle:
+            fields = line.strip().split("\t")
+            if len(fields) >= 2:
+                segments.append((float(fields[0]), float(fields[1])))
+    return os.path.basename(path), audio, segments
+
+
+# ------------------- Synthetic call -------------------
+def synthetic_speech(seconds, rng):
+    count = int(seconds * SAMPLE_RATE)
+    t = np.arange(count) / SAMPLE_RATE
+    f0 = rng.uniform(90, 220) * (1 + 0.08 * np.sin(2 * np.pi * rng.uniform(0.3, 1.0) * t + rng.uniform(0, 6)))
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+
+    # Syllables of 150-300 ms, each with its own vowel and a raised-cosine envelope
+    bounds = np.cumsum(rng.uniform(0.15, 0.3, size=int(seconds / 0.15) + 2))
+    syllable = np.minimum(np.searchsorted(bounds, t), bounds.size - 1)
+    starts = np.concatenate([[0.0], bounds[:-1]])[syllable]
+    position = (t - starts) / (bounds[syllable] - starts)
+    envelope = np.sin(np.pi * position) ** 0.5
+    formants = np.array(VOWELS)[rng.integers(0, len(VOWELS), size=bounds.size)][syllable]
+
+    voiced = np.zeros(count)
+    for harmonic in range(1, int(4000 / f0.min()) + 1):
+        frequency = harmonic * f0
+        shape = sum(1.0 / (1.0 + ((frequency - formants[:, index]) / 80.0) ** 2) for index in range(3))
+        voiced += np.where(frequency < 4000, shape / harmonic, 0.0) * np.sin(harmonic * phase)
+    speech = voiced * envelope
+
+    # A fricative at the start of some syllables
+    hiss = np.diff(rng.standard_normal(count + 1))
+    fricative = (position < 0.25) & (rng.random(bounds.size) < 0.3)[syllable]
+    speech += np.where(fricative, 0.15 * hiss, 0.0)
+    return speech / np.sqrt(np.mean(speech**2)) * rng.uniform(0.05, 0.15)
+
+
+def pink_noise(count, rng):
+    spectrum = np.fft.rfft(rng.standard_normal(count))
+    spectrum /= np.sqrt(np.maximum(np.fft.rfftfreq(count, 1.0 / SAMPLE_RATE), 20.0))
+    noise = np.fft.irfft(spectrum, count)
+    return noise / np.sqrt(np.mean(noise**2))
+
+
+def fan(seconds, rng):
+    return rng.uniform(0.03, 0.06) * pink_noise(int(seconds * SAMPLE_RATE), rng)
+
+
+def hum(seconds, rng):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    mains = rng.choice([50.0, 60.0])
+    tone = sum(np.sin(2 * np.pi * mains * harmonic * t) / harmonic for harmonic in range(1, 8))
+    return rng.uniform(0.03, 0.08) * tone / np.sqrt(np.mean(tone**2))
+
+
+def keyboard(seconds, rng):
+    audio = np.zeros(int(seconds * SAMPLE_RATE))
+    click = np.exp(-np.arange(int(0.008 * SAMPLE_RATE)) / (0.0015 * SAMPLE_RATE))
+    at = rng.uniform(0.0, 0.2)
+    while at < seconds - 0.01:
+        start = int(at * SAMPLE_RATE)
+        audio[start : start + click.size] += rng.uniform(0.2, 0.5) * click * rng.standard_normal(click.size)
+        at += rng.uniform(0.08, 0.3)
+    return audio
+
+
+def hiss(seconds, rng):
+    return rng.uniform(0.02, 0.04) * rng.standard_normal(int(seconds * SAMPLE_RATE))
+
+
+NOISES = {"fan": fan, "hum": hum, "keyboard": keyboard, "hiss": hiss}
+
+
+def synthetic_call(minutes, seed):
+    """Speech segments separated by quiet gaps, some of which hold a noise event."""
+    rng = np.random.default_rng(seed)
+    parts, segments, events = [], [], []
+    at = 0.0
+
+    def add(audio):
+        nonlocal at
+        parts.append(audio)
+        at += audio.size / SAMPLE_RATE
+
+    def quiet(seconds):
+        return 0.002 * rng.standard_normal(int(seconds * SAMPLE_RATE))
+
+    add(quiet(2.0))
+    while at < minutes * 60:
+        seconds = rng.uniform(1.5, 5.0)
+        speech = synthetic_speech(seconds, rng)
+        if rng.random() < 0.2:
+            speech += 0.3 * fan(seconds, rng)
+        segments.append((at, at + seconds))
+        add(speech)
+        add(quiet(rng.uniform(2.0, 4.0)))
+        if rng.random() < 0.6:
+            name = rng.choice(sorted(NOISES))
+            events.append(name)
+            add(NOISES[name](rng.uniform(2.0, 8.0), rng))
+            add(quiet(rng.uniform(2.0, 3.0)))
+    audio = np.concatenate(parts).astype(np.float32)
+    return f"synthetic {minutes:g} min ({len(events)} noise events)", audio, segments
+
+
+# ------------------- Evaluation -------------------
+def run(audio, vad):
+    pool = RecordingPool()
+    pipeline = SalesCallPipeline(output_dir=tempfile.mkdtemp(prefix="eval_vad_"), transcription_pool=pool, vad=vad)
+    pool.ring = pipeline.audio_queue
+    # The capture loop reads whole blocks until stopped
+    audio = audio[: audio.size // pipeline.frames_per_block * pipeline.frames_per_block]
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline.start()
+        ring = pipeline.audio_queue
+        step = SAMPLE_RATE // 2
+        for offset in range(0, audio.size, step):
+            while ring.capacity - ring.available() < step:
+                time.sleep(0.001)
+            ring.write(audio[offset : offset + step])
+        while not ring.empty():
+            time.sleep(0.001)
+        pipeline.stop(wait_for_finalize=True)
+    return pool.uploads
+
+
+def overlap(span, segments):
+    return sum(max(0.0, min(span[1], end) - max(span[0], start)) for start, end in segments)
+
+
+def score(uploads, segments, min_overlap):
+    false = sum(1 for span in uploads if overlap(span, segments) < min_overlap)
+    missed = sum(1 for segment in segments if overlap(segment, uploads) < 0.5 * (segment[1] - segment[0]))
+    return {
+        "uploads": len(uploads),
+        "false": false,
+        "missed": missed,
+        "uploaded_sec": sum(end - start for start, end in uploads),
+    }
+
+
+def vad_cost_us(name, audio):
+    detector = create_vad(name)
+    blocks = audio[: audio.size // 800 * 800].reshape(-1, 800)[:2000]
+    started = time.perf_counter()
+    for block in blocks:
+        detector.is_silent(block)
+    return (time.perf_counter() - started) / len(blocks) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", nargs="*", help="WAV files with Audacity label tracks beside them")
+    parser.add_argument("--synthetic-min", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-overlap", type=float, default=0.1, help="labelled speech seconds for a true utterance")
+    parser.add_argument("--vads", nargs="+", default=sorted(VAD_BACKENDS), choices=sorted(VAD_BACKENDS))
+    args = parser.parse_args()
+
+    if args.recordings:
+        recordings = [load_recording(path) for path in args.recordings]
+    else:
+        recordings = [synthetic_call(args.synthetic_min, args.seed)]
+
+    totals = {name: {"uploads": 0, "false": 0, "missed": 0, "uploaded_sec": 0.0} for name in args.vads}
+    speech_segments = 0
+    for title, audio, segments in recordings:
+        speech_segments += len(segments)
+        print(f"{title}: {audio.size / SAMPLE_RATE:.0f}s, {len(segments)} speech segments")
+        for name in args.vads:
+            result = score(run(audio, name), segments, args.min_overlap)
+            for key, value in result.items():
+                totals[name][key] += value
+            print(f"  {name:<9} {result['uploads']:4d} utterances, {result['false']:4d} false, "
+                  f"{result['missed']:3d} speech segments missed, {result['uploaded_sec']:7.1f}s uploaded")
+
+    audio = recordings[0][1]
+    print(f"\nall recordings, {speech_segments} speech segments:")
+    for name in args.vads:
+        total = totals[name]
+        rate = total["false"] / total["uploads"] if total["uploads"] else 0.0
+        print(f"  {name:<9} false-utterance rate {rate:6.1%} ({total['false']}/{total['uploads']}), "
+              f"missed {total['missed']}, {vad_cost_us(name, audio):6.1f} us per 50 ms block")
+    if "energy" in totals:
+        for name in args.vads:
+            if name == "energy":
+                continue
+            uploads = totals["energy"]["uploads"] - totals[name]["uploads"]
+            false = totals["energy"]["false"] - totals[name]["false"]
+            print(f"\n{name} vs energy: {uploads} fewer transcription uploads, {false} fewer false utterances, "
+                  f"~{2 * false} API calls avoided (transcription + analysis)")
+
+
+if __name__ == "__main__":
+    main()
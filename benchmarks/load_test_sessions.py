@@ -0,0 +1,122 @@
+"""
+Per-call suggestion latency as concurrent calls scale, against the local stub API.
+
+Every call is a separate SalesCallPipeline from the session registry; all of
+them share the process-wide transcription and analysis pools and the pooled
+HTTP client.
+
+    python benchmarks/load_test_sessions.py --calls 1 5 10 25 50 --workers 8
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_groq_server import StubGroqServer  # noqa: E402
+
+
+def feed_call(pipeline, sentences, speech_sec, pause_sec, time_scale, seed):
+    rng = np.random.default_rng(seed)
+    block = pipeline.frames_per_block
+    block_sleep = pipeline.block_duration * time_scale
+    silence = np.zeros(block, dtype=np.float32)
+    plan = [False] * pipeline.silence_detector.buffer_blocks
+    for _ in range(sentences):
+        plan += [True] * int(speech_sec / pipeline.block_duration)
+        plan += [False] * int(pause_sec / pipeline.block_duration)
+
+    started = time.perf_counter()
+    for index, is_speech in enumerate(plan):
+        audio = (0.3 * rng.standard_normal(block)).astype(np.float32) if is_speech else silence
+        pipeline.enqueue_audio(audio)
+        # Sleep to the absolute schedule so a slow scheduler does not stretch the call
+        delay = started + (index + 1) * block_sleep - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def run_load(registry, calls, args):
+    pipelines = [registry.create() for _ in range(calls)]
+    for pipeline in pipelines:
+        pipeline._save_post_call_summary = lambda: None
+        pipeline.start()
+
+    feeders = [
+        threading.Thread(
+            target=feed_call,
+            args=(pipeline, args.sentences, args.speech_sec, args.pause_sec, args.time_scale, seed),
+        )
+        for seed, pipeline in enumerate(pipelines)
+    ]
+    started = time.perf_counter()
+    for feeder in feeders:
+        feeder.start()
+    for feeder in feeders:
+        feeder.join()
+
+    latencies = []
+    for pipeline in pipelines:
+        pipeline.stop(wait_for_finalize=True, timeout=300)
+        latencies.extend(pipeline.suggestion_latencies)
+        registry.close(pipeline.session_id)
+    elapsed = time.perf_counter() - started
+    return np.array(latencies) / args.time_scale, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--sentences", type=int, default=3)
+    parser.add_argument("--speech-sec", type=float, default=0.6)
+    parser.add_argument("--pause-sec", type=float, default=1.3)
+    parser.add_argument("--transcribe-latency", default="lognormal:0.3:0.3")
+    parser.add_argument("--chat-latency", default="lognormal:0.4:0.3")
+    parser.add_argument("--workers", type=int, default=8, help="TRANSCRIPTION_WORKERS and ANALYSIS_WORKERS")
+    parser.add_argument("--time-scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = StubGroqServer(
+        transcribe_latency=args.transcribe_latency,
+        chat_latency=args.chat_latency,
+        time_scale=args.time_scale,
+    ).start()
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ.setdefault("GROQ_API_KEY", "stub-key")
+    os.environ["TRANSCRIPTION_WORKERS"] = str(args.workers)
+    os.environ["ANALYSIS_WORKERS"] = str(args.workers)
+    os.environ["LIVE_CHANNEL_BACKEND"] = "memory"
+
+    import groq_client
+    from sessions import SessionRegistry
+
+    registry = SessionRegistry(output_root=tempfile.mkdtemp(prefix="load_test_"), max_sessions=max(args.calls))
+
+    print(
+        f"stub latency: transcribe {args.transcribe_latency}, chat {args.chat_latency}; "
+        f"{args.workers} transcription + {args.workers} analysis workers shared by all calls"
+    )
+    print(f"{'calls':>6}{'utterances':>12}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}{'max s':>8}{'new conns':>11}")
+    for calls in args.calls:
+        before = groq_client.get_connection_stats()["new_connections"]
+        with contextlib.redirect_stdout(io.StringIO()):
+            latencies, _ = run_load(registry, calls, args)
+        new_connections = groq_client.get_connection_stats()["new_connections"] - before
+        print(
+            f"{calls:>6}{latencies.size:>12}{np.percentile(latencies, 50):>8.2f}"
+            f"{np.percentile(latencies, 95):>8.2f}{np.percentile(latencies, 99):>8.2f}"
+            f"{latencies.max():>8.2f}{new_connections:>11}"
+        )
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Replay WAV recordings through SalesCallPipeline against the local stub API
+and write a JSON report that can be compared between commits.
+
+Each WAV is one call. Audio enters through the same path as live calls: 20 ms
+frames go to SalesCallAudioProcessor when streamlit_webrtc is installed,
+otherwise they are resampled and written to the pipeline's audio_queue the
+same way. --pace realtime plays each file at its own speed; --pace fast
+writes as quickly as the audio ring accepts it. Without WAV arguments a
+synthetic call is generated.
+
+The report has end-of-speech -> transcript and -> suggestion percentiles,
+utterances per second, audio ring depth, peak RSS and per-stage timings:
+
+    python benchmarks/replay_calls.py call1.wav call2.wav --pace realtime --output before.json
+    python benchmarks/replay_calls.py --synthetic-sec 120 --calls 4 --pace fast --output after.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_groq_server import StubGroqServer  # noqa: E402
+
+FRAME_SEC = 0.02
+
+
+def synthetic_call(path, seconds, sample_rate=48000, seed=0):
+    """Stereo 16-bit call: bursts of voiced noise separated by pauses."""
+    rng = np.random.default_rng(seed)
+    audio = []
+    while sum(len(chunk) for chunk in audio) < seconds * sample_rate:
+        speech = int(rng.uniform(0.8, 4.0) * sample_rate)
+        pause = int(rng.uniform(1.4, 3.0) * sample_rate)
+        t = np.arange(speech) / sample_rate
+        envelope = 0.5 * (1.5 + np.sin(2 * np.pi * 3.0 * t))
+        voiced = np.sin(2 * np.pi * 140 * t) + 0.5 * np.sin(2 * np.pi * 280 * t)
+        audio.append(0.15 * envelope * (voiced + 0.5 * rng.standard_normal(speech)))
+        audio.append(0.002 * rng.standard_normal(pause))
+    mono = np.concatenate(audio)[: int(seconds * sample_rate)]
+    sf.write(path, np.stack([mono, mono], axis=1), sample_rate, subtype="PCM_16")
+    return path
+
+
+def frame_writer(pipeline, sample_rate, channels):
+    """Return (write, name): write() takes one int16 frame shaped (samples, channels)."""
+    try:
+        import av
+        from webrtc_audio import SalesCallAudioProcessor
+    except ImportError:
+        from resampler import PolyphaseResampler
+
+        resampler = PolyphaseResampler(sample_rate, pipeline.sample_rate)
+
+        def write(frame):
+            mono = frame.mean(axis=1, dtype=np.float32) / np.float32(np.iinfo(np.int16).max)
+            pipeline.audio_queue.write(resampler.process(mono))
+
+        return write, "audio_queue (streamlit_webrtc not installed)"
+
+    processor = SalesCallAudioProcessor(
+        pipeline.audio_queue,
+        pipeline.stop_event,
+        target_sample_rate=pipeline.sample_rate,
+        block_duration=pipeline.block_duration,
+    )
+    layout = "stereo" if channels == 2 else "mono"
+
+    def write(frame):
+        av_frame = av.AudioFrame.from_ndarray(frame.reshape(1, -1), format="s16", layout=layout)
+        av_frame.sample_rate = sample_rate
+        processor._enqueue_audio(av_frame)
+
+    return write, "SalesCallAudioProcessor"
+
+
+def replay(pipeline, path, pace):
+    audio, sample_rate = sf.read(path, dtype="int16", always_2d=True)
+    audio = audio[:, :2]
+    write, route = frame_writer(pipeline, sample_rate, audio.shape[1])
+    frame_size = int(sample_rate * FRAME_SEC)
+    ring = pipeline.audio_queue
+    room = int(pipeline.sample_rate * FRAME_SEC) + 64
+
+    started = time.perf_counter()
+    for index, offset in enumerate(range(0, len(audio), frame_size)):
+        if pace == "realtime":
+            delay = started + index * FRAME_SEC - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        else:
+            # As fast as possible without overflowing the ring
+            while ring.capacity - ring.available() < room:
+                time.sleep(0.001)
+        write(np.ascontiguousarray(audio[offset : offset + frame_size]))
+    return len(audio) / sample_rate, route
+
+
+def percentiles(values, scale=1000.0):
+    if len(values) == 0:
+        return None
+    values = np.asarray(values) * scale
+    return {
+        "count": int(values.size),
+        "p50": round(float(np.percentile(values, 50)), 1),
+        "p90": round(float(np.percentile(values, 90)), 1),
+        "p95": round(float(np.percentile(values, 95)), 1),
+        "p99": round(float(np.percentile(values, 99)), 1),
+        "max": round(float(values.max()), 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wavs", nargs="*")
+    parser.add_argument("--pace", choices=["realtime", "fast"], default="realtime")
+    parser.add_argument("--calls", type=int, default=1, help="replay each WAV this many times concurrently")
+    parser.add_argument("--synthetic-sec", type=float, default=60.0)
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--transcribe-latency", default="lognormal:0.35:0.3")
+    parser.add_argument("--chat-latency", default="lognormal:0.4:0.3")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    server = StubGroqServer(transcribe_latency=args.transcribe_latency, chat_latency=args.chat_latency).start()
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ.setdefault("GROQ_API_KEY", "stub-key")
+
+    import stage_metrics
+    from sessions import SessionRegistry
+
+    wavs = args.wavs or [synthetic_call(os.path.join(tempfile.mkdtemp(), "synthetic.wav"), args.synthetic_sec)]
+    registry = SessionRegistry(output_root=tempfile.mkdtemp(prefix="replay_"))
+    pipelines = []
+    for path in wavs:
+        for _ in range(args.calls):
+            pipeline = registry.create(streaming=args.streaming)
+            pipeline._save_post_call_summary = lambda: None
+            pipelines.append((pipeline, path))
+
+    depths = []
+    monitoring = threading.Event()
+
+    def monitor():
+        while not monitoring.wait(0.05):
+            depths.extend(pipeline.audio_queue.available() / pipeline.sample_rate for pipeline, _ in pipelines)
+
+    audio_seconds, routes = [], set()
+
+    def run_call(pipeline, path):
+        seconds, route = replay(pipeline, path, args.pace)
+        audio_seconds.append(seconds)
+        routes.add(route)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for pipeline, _ in pipelines:
+            pipeline.start()
+        monitor_thread = threading.Thread(target=monitor, daemon=True)
+        monitor_thread.start()
+        started = time.perf_counter()
+        feeders = [threading.Thread(target=run_call, args=item) for item in pipelines]
+        for feeder in feeders:
+            feeder.start()
+        for feeder in feeders:
+            feeder.join()
+        for pipeline, _ in pipelines:
+            pipeline.stop(wait_for_finalize=True, timeout=300)
+        wall = time.perf_counter() - started
+        monitoring.set()
+        monitor_thread.join()
+    rss_peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    transcript, suggestion = [], []
+    for pipeline, _ in pipelines:
+        transcript.extend(pipeline.transcript_latencies)
+        suggestion.extend(pipeline.suggestion_latencies)
+    ring_stats = [pipeline.audio_queue.stats() for pipeline, _ in pipelines]
+
+    report = {
+        "commit": git_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "wavs": [os.path.basename(path) for path in wavs],
+            "calls": len(pipelines),
+            "pace": args.pace,
+            "streaming": args.streaming,
+            "audio_route": sorted(routes),
+            "transcribe_latency": args.transcribe_latency,
+            "chat_latency": args.chat_latency,
+        },
+        "audio_sec": round(sum(audio_seconds), 2),
+        "wall_sec": round(wall, 2),
+        "utterances": len(suggestion),
+        "utterances_per_sec": round(len(suggestion) / wall, 3),
+        "eos_to_transcript_ms": percentiles(transcript),
+        "eos_to_suggestion_ms": percentiles(suggestion),
+        "queue_depth_ms": percentiles(depths),
+        "dropped_samples": sum(stats["dropped_samples"] for stats in ring_stats),
+        "peak_rss_mb": round(rss_peak_kb / 1024, 1),
+        "api_requests": dict(server.requests),
+        "stages": stage_metrics.snapshot()["process"],
+    }
+    server.stop()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file_handle:
+            file_handle.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Local stand-in for the Groq endpoints the app uses, with configurable latency.
+
+    python benchmarks/stub_groq_server.py --port 8765 --transcribe-latency lognormal:0.4:0.3
+
+then run the app or a benchmark with GROQ_BASE_URL=http://127.0.0.1:8765 and
+any GROQ_API_KEY.
+
+Latency specs: "0.3" (fixed seconds), "uniform:LOW:HIGH", "lognormal:MEDIAN:SIGMA".
+--chat-concurrency N serves at most N chat completions at a time, like a
+provider rate limit; --chat-sec-per-kb adds latency in proportion to the
+prompt size; --error-rate answers that share of requests with a 503;
+--connect-latency delays each new connection, standing in for the TCP and
+TLS handshakes of a real endpoint.
+Batched analysis prompts get one JSON array entry per utterance id.
+"""
+import argparse
+import contextlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TRANSCRIPTION_PATH = "/openai/v1/audio/transcriptions"
+CHAT_PATH = "/openai/v1/chat/completions"
+MODELS_PATH = "/openai/v1/models"
+
+STUB_ANALYSIS = {
+    "sentiment": "neutral",
+    "intent": "product inquiry",
+    "summary": "Customer is asking about pricing and delivery.",
+    "suggestion": "Confirm their budget and offer the standard plan.",
+    "customer_intent": "product inquiry",
+    "key_topics": ["pricing", "delivery"],
+    "objections": [],
+    "resolutions": [],
+    "next_steps": ["Send quote"],
+    "recommended_follow_up": "Email the quote tomorrow.",
+    "win_risk": "medium",
+    "call_score": 7,
+}
+
+
+BATCH_UTTERANCES = re.compile(r"Utterances \(JSON\):\s*(\[.*?\])\n", re.DOTALL)
+
+
+class LatencyModel:
+    def __init__(self, spec, seed=None):
+        self.spec = str(spec)
+        kind, _, params = self.spec.partition(":")
+        self._random = random.Random(seed)
+        if not params:
+            self.kind, self.params = "fixed", (float(kind),)
+        else:
+            self.kind, self.params = kind, tuple(float(value) for value in params.split(":"))
+
+    def sample(self):
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self._random.uniform(*self.params)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return self._random.lognormvariate(0.0, sigma) * median
+        raise ValueError(f"Unknown latency spec: {self.spec}")
+
+
+class StubGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "StubGroq/1.0"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        # Runs once per connection, so only requests on fresh sockets pay it
+        if self.server.stub.connect_latency:
+            time.sleep(self.server.stub.connect_latency * self.server.stub.time_scale)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.stub.count(self.path)
+        if self.path.startswith(MODELS_PATH):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        stub = self.server.stub
+        stub.count(self.path, len(body))
+        if stub.error_rate and stub.random.random() < stub.error_rate:
+            self._send_json(503, {"error": {"message": "stub: service unavailable", "type": "service_unavailable"}})
+            return
+
+        if self.path.startswith(TRANSCRIPTION_PATH):
+            time.sleep(stub.transcribe_latency.sample() * stub.time_scale)
+            self._send_json(200, {"text": stub.transcript_text(len(body)), "segments": []})
+        elif self.path.startswith(CHAT_PATH):
+            with stub.chat_slots:
+                latency = stub.chat_latency.sample() + stub.chat_sec_per_kb * len(body) / 1024
+                time.sleep(latency * stub.time_scale)
+            content = json.dumps(batch_reply(body) or STUB_ANALYSIS)
+            self._send_json(
+                200,
+                {
+                    "id": "stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": "stub",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": content},
+                        }
+                    ],
+                },
+            )
+        else:
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+
+
+def batch_reply(body):
+    """One analysis per utterance id for a batched analysis prompt, else None."""
+    try:
+        messages = json.loads(body)["messages"]
+    except (ValueError, KeyError):
+        return None
+    match = BATCH_UTTERANCES.search(messages[-1].get("content", ""))
+    if not match:
+        return None
+    return [dict(STUB_ANALYSIS, id=item["id"]) for item in json.loads(match.group(1))]
+
+
+class StubGroqServer:
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        transcribe_latency="0.3",
+        chat_latency="0.3",
+        time_scale=1.0,
+        chat_concurrency=None,
+        chat_sec_per_kb=0.0,
+        error_rate=0.0,
+        connect_latency=0.0,
+    ):
+        self.transcribe_latency = LatencyModel(transcribe_latency, seed=1)
+        self.chat_latency = LatencyModel(chat_latency, seed=2)
+        self.time_scale = time_scale
+        self.chat_slots = threading.BoundedSemaphore(chat_concurrency) if chat_concurrency else contextlib.nullcontext()
+        self.chat_sec_per_kb = chat_sec_per_kb
+        self.error_rate = error_rate
+        self.connect_latency = connect_latency
+        self.random = random.Random(3)
+        self.requests = {}
+        self.largest_request = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), StubGroqHandler)
+        self._httpd.daemon_threads = True
+        # Clients that give up at their deadline close the socket mid-response
+        self._httpd.handle_error = lambda request, client_address: None
+        self._httpd.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, path, size=0):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            self.largest_request[path] = max(self.largest_request.get(path, 0), size)
+
+    def transcript_text(self, payload_bytes):
+        return f"Customer utterance of {payload_bytes} bytes asking about the price."
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--transcribe-latency", default="0.3")
+    parser.add_argument("--chat-latency", default="0.3")
+    parser.add_argument("--chat-concurrency", type=int, default=None)
+    parser.add_argument("--chat-sec-per-kb", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--connect-latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubGroqServer(
+        args.host,
+        args.port,
+        args.transcribe_latency,
+        args.chat_latency,
+        chat_concurrency=args.chat_concurrency,
+        chat_sec_per_kb=args.chat_sec_per_kb,
+        error_rate=args.error_rate,
+        connect_latency=args.connect_latency,
+    ).start()
+    print(f"Stub Groq API listening on {server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+# call_policy.py
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import httpx
+
+from runtime_config import get_setting
+
+_CONNECTION_ERRORS = (httpx.TransportError, TimeoutError, ConnectionError)
+
+# Below this much budget an attempt is not worth starting
+MIN_ATTEMPT_SEC = 0.05
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """The call's time budget ran out before a successful attempt."""
+
+
+class Deadline:
+    """An absolute time budget shared by every stage working on one request."""
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0.0
+
+    def cap(self, seconds):
+        """A deadline that ends after ``seconds`` or with this one, whichever is first."""
+        capped = Deadline(seconds)
+        capped.expires_at = min(capped.expires_at, self.expires_at)
+        return capped
+
+
+def is_retryable(error):
+    """Timeouts, connection failures, 408/409/429 and 5xx are worth another attempt."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    # The Groq SDK is imported lazily; if it is not loaded, none of its errors exist yet
+    groq = sys.modules.get("groq")
+    if groq is not None and isinstance(error, groq.APIConnectionError):
+        return True
+    return isinstance(error, _CONNECTION_ERRORS)
+
+
+def _retry_after(error):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures and rejects calls
+    for ``reset_timeout_sec``; then lets one probe through (half-open) and
+    closes again if it succeeds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout_sec=30.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout_sec = float(reset_timeout_sec)
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_sec:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+class CallPolicy:
+    """
+    Timeout, retry, hedging and circuit-breaker policy for one kind of remote call.
+
+    ``call(fn, deadline)`` runs ``fn(timeout)``: each attempt gets the smaller
+    of ``timeout`` and the budget left on ``deadline``. Retryable failures are
+    retried with full-jitter exponential backoff while attempts and budget
+    remain. With ``hedge_percentile`` set, a second identical attempt starts
+    if the first has not finished within that percentile of recent latencies;
+    the first to succeed wins.
+    """
+
+    def __init__(
+        self,
+        name,
+        timeout,
+        max_attempts=3,
+        base_backoff_sec=0.2,
+        max_backoff_sec=2.0,
+        hedge_percentile=None,
+        hedge_min_samples=20,
+        breaker=None,
+    ):
+        self.name = name
+        self.timeout = float(timeout)
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_backoff_sec = float(base_backoff_sec)
+        self.max_backoff_sec = float(max_backoff_sec)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = int(hedge_min_samples)
+        self.breaker = breaker or CircuitBreaker()
+        self._latencies = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self._hedge_pool = None
+
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+        self.short_circuited = 0
+
+    def call(self, fn, deadline=None):
+        self._count("calls")
+        last_error = None
+        for attempt in range(self.max_attempts):
+            timeout = self._attempt_timeout(deadline)
+            if timeout is None:
+                self._count("deadline_exceeded")
+                self._count("failures")
+                raise DeadlineExceeded(f"{self.name}: budget exhausted") from last_error
+            if not self.breaker.allow():
+                self._count("short_circuited")
+                self._count("failures")
+                raise CircuitOpenError(f"{self.name}: circuit open, failing fast") from last_error
+
+            try:
+                result = self._attempt(fn, timeout, deadline)
+            except Exception as error:
+                last_error = error
+                if not is_retryable(error):
+                    self.breaker.record_success()  # the provider answered; the request was bad
+                    self._count("failures")
+                    raise
+                self.breaker.record_failure()
+                if attempt + 1 >= self.max_attempts:
+                    break
+                backoff = random.uniform(0.0, min(self.max_backoff_sec, self.base_backoff_sec * 2 ** attempt))
+                backoff = max(backoff, _retry_after(error) or 0.0)
+                if deadline is not None and deadline.remaining() - backoff < MIN_ATTEMPT_SEC:
+                    self._count("deadline_exceeded")
+                    self._count("failures")
+                    raise DeadlineExceeded(f"{self.name}: no budget left to retry") from error
+                self._count("retries")
+                time.sleep(backoff)
+                continue
+
+            self.breaker.record_success()
+            self._count("successes")
+            return result
+
+        self._count("failures")
+        raise last_error
+
+    def metrics(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "calls": self.calls,
+                "successes": self.successes,
+                "failures": self.failures,
+                "retries": self.retries,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "deadline_exceeded": self.deadline_exceeded,
+                "short_circuited": self.short_circuited,
+                "breaker_state": self.breaker.state,
+                "breaker_opened": self.breaker.opened,
+                "hedge_delay_sec": self._hedge_delay(latencies),
+            }
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _attempt_timeout(self, deadline):
+        if deadline is None:
+            return self.timeout
+        remaining = deadline.remaining()
+        if remaining < MIN_ATTEMPT_SEC:
+            return None
+        return min(self.timeout, remaining)
+
+    def _hedge_delay(self, latencies):
+        if self.hedge_percentile is None or len(latencies) < self.hedge_min_samples:
+            return None
+        index = min(len(latencies) - 1, int(len(latencies) * self.hedge_percentile / 100.0))
+        return latencies[index]
+
+    def _timed(self, fn, timeout):
+        started = time.monotonic()
+        result = fn(timeout)
+        with self._lock:
+            self._latencies.append(time.monotonic() - started)
+        return result
+
+    def _attempt(self, fn, timeout, deadline):
+        with self._lock:
+            hedge_delay = self._hedge_delay(sorted(self._latencies))
+        if hedge_delay is None or hedge_delay >= timeout:
+            return self._timed(fn, timeout)
+
+        pool = self._get_hedge_pool()
+        primary = pool.submit(self._timed, fn, timeout)
+        done, _ = wait([primary], timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        hedge_timeout = self._attempt_timeout(deadline)
+        if hedge_timeout is None or not self.breaker.allow():
+            return primary.result()
+        self._count("hedges")
+        hedge = pool.submit(self._timed, fn, min(timeout, hedge_timeout))
+
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _get_hedge_pool(self):
+        with self._lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=get_setting("POLICY_HEDGE_WORKERS", 8, int),
+                    thread_name_prefix=f"hedge-{self.name}",
+                )
+            return self._hedge_pool
+
+
+_policies = {}
+_policies_lock = threading.Lock()
+
+
+def get_policy(name, timeout):
+    """
+    Process-wide policy for one kind of call (e.g. "transcription", "chat").
+    Tuned with POLICY_MAX_ATTEMPTS, POLICY_BREAKER_FAILURES,
+    POLICY_BREAKER_RESET_SEC and POLICY_HEDGE_PERCENTILE (unset = no hedging);
+    a per-policy override such as TRANSCRIPTION_HEDGE_PERCENTILE wins.
+    """
+    policy = _policies.get(name)
+    if policy is None:
+        with _policies_lock:
+            policy = _policies.get(name)
+            if policy is None:
+                prefix = name.upper()
+
+                def setting(key, default, cast):
+                    return get_setting(f"{prefix}_{key}", get_setting(f"POLICY_{key}", default, cast), cast)
+
+                policy = CallPolicy(
+                    name,
+                    timeout,
+                    max_attempts=setting("MAX_ATTEMPTS", 3, int),
+                    hedge_percentile=setting("HEDGE_PERCENTILE", None, float),
+                    breaker=CircuitBreaker(
+                        failure_threshold=setting("BREAKER_FAILURES", 5, int),
+                        reset_timeout_sec=setting("BREAKER_RESET_SEC", 30.0, float),
+                    ),
+                )
+                _policies[name] = policy
+    return policy
+
+
+def get_policy_metrics():
+    """Retry, hedge and breaker metrics for every policy used so far."""
+    with _policies_lock:
+        policies = list(_policies.values())
+    return {policy.name: policy.metrics() for policy in policies}
@@ -1,52 +1,91 @@
 # crm_functions.py
-import pandas as pd
 import os
-from groq import Groq
+from numbers import Number
+
 from dotenv import load_dotenv
 
-from runtime_config import get_groq_api_key
+from crm_index import CategoryPriceIndex, PhoneIndex
+from call_policy import get_policy
+from groq_client import CHAT_TIMEOUT, get_groq_client
+from stage_metrics import span
 
 # -------------------- Initialization --------------------
 load_dotenv()
 
 # ✅ Global cache for CRM data
 _cached_df = None
+_phone_index = None
+_product_index = None
+
+RELATED_COLUMNS = ['Product Name', 'Price (INR)', 'Category']
 
 
 # -------------------- CSV Functions --------------------
 def _load_crm_data(csv_file="CRM_data.csv"):
-    """Load CRM data once and cache it in memory."""
-    global _cached_df
+    """Load CRM data once and cache it in memory, along with its phone and product indexes."""
+    global _cached_df, _phone_index, _product_index
     if _cached_df is None:
+        import pandas as pd  # deferred: pandas is only needed once CRM data is used
+
         try:
             _cached_df = pd.read_csv(csv_file)
             print(f"[CRM] Loaded {len(_cached_df)} records from {csv_file}")
         except Exception as e:
             print(f"[CRM] Error loading {csv_file}: {e}")
             _cached_df = pd.DataFrame()
+        phones = _cached_df['Phone'] if 'Phone' in _cached_df else []
+        _phone_index = PhoneIndex(phones)
+        _product_index = _build_product_index(_cached_df)
     return _cached_df
 
 
+def _build_product_index(df):
+    """Category/price index for related products, or None when the data cannot be indexed."""
+    import pandas as pd
+
+    if not set(RELATED_COLUMNS).issubset(df.columns):
+        return None
+    try:
+        # Keys normalized exactly as the scan below does, so both agree on every pandas version
+        category_codes, categories = pd.factorize(_lower_keys(df['Category']))
+        name_codes, _ = pd.factorize(_lower_keys(df['Product Name']))
+        return CategoryPriceIndex(category_codes, categories, df['Price (INR)'], name_codes)
+    except TypeError as e:
+        print(f"[CRM] Related products fall back to a scan: {e}")
+        return None
+
+
+def _lower_keys(column):
+    return column.astype(str).str.lower()
+
+
+def _related_records(df, rows):
+    return df.take(rows)[RELATED_COLUMNS].to_dict('records')
+
+
+def preload_crm_data(csv_file="CRM_data.csv"):
+    """Load the CRM data and build its phone index ahead of the first lookup."""
+    return len(_load_crm_data(csv_file))
+
+
 def get_client_data_from_csv(phone_number, csv_file="CRM_data.csv"):
     """
     Fetch client data from CSV based on phone number.
     """
     try:
         df = _load_crm_data(csv_file)
-        clean_phone = str(phone_number).replace(" ", "").replace("-", "").replace("+", "")
-        
-        for _, row in df.iterrows():
-            csv_phone = str(row['Phone']).replace(" ", "").replace("-", "").replace("+", "")
-            if clean_phone in csv_phone or csv_phone in clean_phone:
-                return {
-                    'Name': row['Name'],
-                    'Phone': row['Phone'],
-                    'Email Id': row['Email Id'],
-                    'Product Name': row['Product Name'],
-                    'Category': row['Category'],
-                    'Price (INR)': row['Price (INR)'],
-                    'Purchase Date': row['Purchase Date']
-                }
+        match = _phone_index.lookup(phone_number)
+        if match is not None:
+            _, row = next(df.iloc[match:match + 1].iterrows())
+            return {
+                'Name': row['Name'],
+                'Phone': row['Phone'],
+                'Email Id': row['Email Id'],
+                'Product Name': row['Product Name'],
+                'Category': row['Category'],
+                'Price (INR)': row['Price (INR)'],
+                'Purchase Date': row['Purchase Date']
+            }
         return None
 
     except Exception as e:
@@ -65,8 +104,8 @@ def summarize_client_data(client_data):
         str: AI-generated summary and recommendations
     """
     try:
-        # Initialize Groq client
-        client = Groq(api_key=get_groq_api_key())
+        # Shared, connection-pooled Groq client
+        client = get_groq_client()
 
         # Prepare the prompt
         prompt = f"""
@@ -91,22 +130,26 @@ def summarize_client_data(client_data):
         """
 
         # Generate response using Groq
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert sales assistant that analyzes customer data "
-                        "and provides actionable insights and product recommendations "
-                        "for sales representatives."
-                    ),
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
+        with span("crm_summary_request"):
+            response = get_policy("chat", CHAT_TIMEOUT).call(
+                lambda timeout: client.chat.completions.create(
+                    model="llama-3.1-8b-instant",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": (
+                                "You are an expert sales assistant that analyzes customer data "
+                                "and provides actionable insights and product recommendations "
+                                "for sales representatives."
+                            ),
+                        },
+                        {"role": "user", "content": prompt},
+                    ],
+                    temperature=0.7,
+                    max_tokens=1000,
+                    timeout=timeout,
+                )
+            )
 
         # Return the AI-generated text
         raw_output = response.choices[0].message.content or ""
@@ -116,21 +159,40 @@ def summarize_client_data(client_data):
         return f"Error generating AI summary: {str(e)}. Please check your Groq API key."
 
 
-def get_related_products(category, price_range, csv_file="CRM_data.csv"):
+def get_related_products(category, price_range, csv_file="CRM_data.csv", top_k=None, target_price=None):
     """
-    Get related products from the same category and price range.
+    Get related products from the same category and price range, in CRM order.
+
+    With ``top_k``, return at most that many distinct products (by name),
+    nearest to ``target_price`` (default: middle of the range) first.
     """
     try:
         df = _load_crm_data(csv_file)
         min_price, max_price = price_range
 
+        if _product_index is not None and isinstance(min_price, Number) and isinstance(max_price, Number):
+            key = str(category).lower()
+            if top_k is not None:
+                rows = _product_index.nearest_rows(key, min_price, max_price, top_k, target_price)
+            else:
+                rows = _product_index.range_rows(key, min_price, max_price)
+            return _related_records(df, rows)
+
         related = df[
-            (df['Category'].astype(str).str.lower() == str(category).lower()) &
+            (_lower_keys(df['Category']) == str(category).lower()) &
             (df['Price (INR)'] >= min_price) &
             (df['Price (INR)'] <= max_price)
         ]
 
-        return related[['Product Name', 'Price (INR)', 'Category']].to_dict('records')
+        related = related[RELATED_COLUMNS]
+        if top_k is not None:
+            target = (min_price + max_price) / 2 if target_price is None else target_price
+            distance = (related['Price (INR)'] - target).abs()
+            related = related.assign(distance=distance).sort_values(['distance', 'Price (INR)'], kind='stable')
+            related = related[~_lower_keys(related['Product Name']).duplicated()]
+            related = related.head(max(top_k, 0))[RELATED_COLUMNS]
+
+        return related.to_dict('records')
 
     except Exception as e:
         print(f"Error getting related products: {e}")
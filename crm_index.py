@@ -0,0 +1,326 @@
+# crm_index.py
+from itertools import islice
+
+import numpy as np
+
+# Digit strings of up to _KEY_WIDTH digits are encoded in base 11 (pad=0,
+# digits 1..10) so that integer order matches string order and a prefix is a
+# contiguous key range.
+_KEY_WIDTH = 16
+_BASE = 11
+_PLACES = [_BASE ** (_KEY_WIDTH - 1 - i) for i in range(_KEY_WIDTH)]
+# The key of the suffix starting at ``offset`` is key % _SUFFIX_MOD[offset] * _SUFFIX_SHIFT[offset]
+_SUFFIX_MOD = np.array([_BASE ** (_KEY_WIDTH - offset) for offset in range(_KEY_WIDTH)], dtype=np.int64)
+_SUFFIX_SHIFT = np.array([_BASE**offset for offset in range(_KEY_WIDTH)], dtype=np.int64)
+# Every _FENCE_STEP-th suffix key is kept; the rest are recomputed per lookup
+_FENCE_STEP = 64
+_BUILD_CHUNK = 1_000_000
+
+
+def normalize_phone(value):
+    return str(value).replace(" ", "").replace("-", "").replace("+", "")
+
+
+def _normalize_phones(values):
+    """normalize_phone for many values: one replace per character over the joined text."""
+    text = "\0".join(map(str, values))
+    if text.count("\0") != len(values) - 1:
+        return [normalize_phone(value) for value in values]
+    return text.replace(" ", "").replace("-", "").replace("+", "").split("\0")
+
+
+def _indexable(text):
+    return text.isdigit() and text.isascii() and len(text) <= _KEY_WIDTH
+
+
+def _encode(text):
+    key = 0
+    for position, char in enumerate(text):
+        key += (ord(char) - 47) * _PLACES[position]
+    return key
+
+
+class PhoneIndex:
+    """
+    Phone lookup that reproduces the original row-by-row rule
+    (query in phone or phone in query, first matching row wins).
+
+    Phones of up to 16 ASCII digits are held as numpy arrays only, about
+    20 bytes per row plus 4 bytes per distinct digit suffix (at most 16
+    per phone; a 12-digit phone adds about 10):
+
+    - ``row_keys``: each row's phone as one integer key (-1 if not indexed)
+    - ``exact_keys`` / ``exact_rows``: distinct keys, sorted, with the first row
+    - ``suffix_pointers``: ``row * 16 + offset`` for every distinct suffix,
+      sorted by suffix, keeping the first row per suffix. Keys are not
+      stored; a lookup binary-searches ``fence`` (every 64th key) and
+      recomputes one block of 64.
+
+    phone in query looks up every substring of the query in the exact keys;
+    query in phone is a key range in the suffix array. Other phones
+    (non-digit, longer, empty or missing) are kept as strings and scanned.
+    """
+
+    def __init__(self, phones):
+        phones = iter(phones)
+        self.overflow = {}
+        self.overflow_exact = {}
+        key_chunks, code_chunks, row_chunks = [], [], []
+        row_count = 0
+        # Normalized in chunks so only one chunk of Python strings is alive at a time
+        while True:
+            chunk = list(islice(phones, _BUILD_CHUNK))
+            if not chunk:
+                break
+            chunk = _normalize_phones(chunk)
+            # _indexable per phone, iterated in C
+            count = len(chunk)
+            indexed = (
+                np.fromiter(map(str.isdigit, chunk), dtype=bool, count=count)
+                & np.fromiter(map(str.isascii, chunk), dtype=bool, count=count)
+                & (np.fromiter(map(len, chunk), dtype=np.int64, count=count) <= _KEY_WIDTH)
+            )
+            if indexed.all():
+                digits = np.array(chunk, dtype=f"S{_KEY_WIDTH}")
+            else:
+                for position in np.flatnonzero(~indexed).tolist():
+                    phone = chunk[position]
+                    self.overflow[row_count + position] = phone
+                    self.overflow_exact.setdefault(phone, row_count + position)
+                digits = np.array([chunk[position] for position in np.flatnonzero(indexed).tolist()],
+                                  dtype=f"S{_KEY_WIDTH}")
+            codes = digits.view(np.uint8).reshape(-1, _KEY_WIDTH)
+            codes = np.where(codes > 0, codes - 47, 0).astype(np.uint8)
+            keys = np.zeros(len(codes), dtype=np.int64)
+            for position in range(_KEY_WIDTH):
+                keys = keys * _BASE + codes[:, position]
+            key_chunks.append(keys)
+            if indexed.all():
+                code_chunks.append(codes)
+            else:
+                # One row of codes per CRM row, so a flat position is row * 16 + offset
+                all_codes = np.zeros((count, _KEY_WIDTH), dtype=np.uint8)
+                all_codes[indexed] = codes
+                code_chunks.append(all_codes)
+            row_chunks.append(np.flatnonzero(indexed) + row_count)
+            row_count += count
+            del chunk, digits
+
+        self.size = row_count
+        keys = np.concatenate(key_chunks) if key_chunks else np.zeros(0, dtype=np.int64)
+        codes = np.concatenate(code_chunks) if code_chunks else np.zeros((0, _KEY_WIDTH), dtype=np.uint8)
+        rows = np.concatenate(row_chunks) if row_chunks else np.zeros(0, dtype=np.int64)
+        del key_chunks, code_chunks, row_chunks
+
+        self.row_keys = np.full(row_count, -1, dtype=np.int64)
+        self.row_keys[rows] = keys
+        # A phone can only equal a query substring of its own length
+        lengths = np.count_nonzero(codes, axis=1)
+        self.exact_lengths = np.unique(lengths[lengths > 0]).tolist()
+        del lengths
+        self.overflow_lengths = sorted({len(phone) for phone in self.overflow_exact if phone})
+        self._row_dtype = np.int32 if row_count * _KEY_WIDTH < 2**31 else np.int64
+        self.exact_keys, self.exact_rows = self._build_exact(keys, rows)
+        del keys, rows
+        self.suffix_pointers, self.fence = self._build_suffixes(codes)
+
+    def __len__(self):
+        return self.size
+
+    def _build_exact(self, keys, rows):
+        if not keys.size:
+            return keys, np.zeros(0, dtype=self._row_dtype)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        # Stable sort: the first row per key is the earliest
+        starts = np.flatnonzero(np.concatenate([[True], sorted_keys[1:] != sorted_keys[:-1]]))
+        return sorted_keys[starts], rows[order[starts]].astype(self._row_dtype)
+
+    def _build_suffixes(self, codes):
+        """
+        Suffix pointers sorted by suffix, built one leading digit at a time:
+        each digit's suffixes are a contiguous key range, so sorting them
+        separately gives the global order with a tenth of the working set.
+        """
+        codes = codes.reshape(-1)
+        pointer_chunks, fence_chunks = [], []
+        total = 0
+        for digit in range(1, _BASE):
+            # Flat positions in the (rows, 16) code matrix are the pointers
+            bucket_pointers = np.flatnonzero(codes == digit)
+            if not bucket_pointers.size:
+                continue
+            offsets = bucket_pointers % _KEY_WIDTH
+            bucket_keys = self.row_keys[bucket_pointers // _KEY_WIDTH] % _SUFFIX_MOD[offsets] * _SUFFIX_SHIFT[offsets]
+            del offsets
+            order = np.argsort(bucket_keys)
+            bucket_keys = bucket_keys[order]
+            bucket_pointers = bucket_pointers[order]
+            del order
+
+            # Only the earliest row per distinct suffix can ever win a lookup;
+            # the smallest pointer has the smallest row
+            starts = np.flatnonzero(np.concatenate([[True], bucket_keys[1:] != bucket_keys[:-1]]))
+            pointer_chunks.append(np.minimum.reduceat(bucket_pointers, starts).astype(self._row_dtype))
+            fence_chunks.append(bucket_keys[starts][(-total) % _FENCE_STEP :: _FENCE_STEP])
+            total += starts.size
+        if not pointer_chunks:
+            return np.zeros(0, dtype=self._row_dtype), np.zeros(0, dtype=np.int64)
+        return np.concatenate(pointer_chunks), np.concatenate(fence_chunks)
+
+    def _suffix_keys(self, pointers):
+        rows, offsets = np.divmod(pointers, _KEY_WIDTH)
+        return self.row_keys[rows] % _SUFFIX_MOD[offsets] * _SUFFIX_SHIFT[offsets]
+
+    def _suffix_position(self, key):
+        """First position in the suffix array whose key is >= ``key``."""
+        block = max(0, int(np.searchsorted(self.fence, key)) - 1)
+        start = block * _FENCE_STEP
+        keys = self._suffix_keys(self.suffix_pointers[start : start + _FENCE_STEP])
+        return start + int(np.searchsorted(keys, key))
+
+    def _first_containing(self, query):
+        """Earliest row whose phone contains the query."""
+        if not query:
+            return 0 if self.size else None
+
+        best = None
+        if _indexable(query) and self.suffix_pointers.size:
+            low = _encode(query)
+            start = self._suffix_position(low)
+            stop = self._suffix_position(low + _BASE ** (_KEY_WIDTH - len(query)))
+            if stop > start:
+                best = int(self.suffix_pointers[start:stop].min()) // _KEY_WIDTH
+
+        for row, phone in self.overflow.items():
+            if best is not None and row >= best:
+                break
+            if query in phone:
+                best = row
+                break
+        return best
+
+    def _first_contained(self, query):
+        """Earliest row whose phone is a substring of the query."""
+        best = self.overflow_exact.get("")
+        for length in self.overflow_lengths:
+            for start in range(len(query) - length + 1):
+                row = self.overflow_exact.get(query[start : start + length])
+                if row is not None and (best is None or row < best):
+                    best = row
+
+        parts = [
+            query[start : start + length]
+            for length in self.exact_lengths
+            for start in range(len(query) - length + 1)
+        ]
+        keys = [_encode(part) for part in parts if part.isdigit() and part.isascii()]
+        if keys:
+            keys = np.array(keys, dtype=np.int64)
+            positions = np.minimum(np.searchsorted(self.exact_keys, keys), self.exact_keys.size - 1)
+            found = self.exact_rows[positions[self.exact_keys[positions] == keys]]
+            if found.size and (best is None or int(found.min()) < best):
+                best = int(found.min())
+        return best
+
+    def lookup(self, phone_number):
+        """Return the matching row number, or None."""
+        query = normalize_phone(phone_number)
+        candidates = [
+            row
+            for row in (self._first_containing(query), self._first_contained(query))
+            if row is not None
+        ]
+        return min(candidates) if candidates else None
+
+
+class CategoryPriceIndex:
+    """
+    Rows grouped by category code and sorted by price within each category,
+    so a category + price-range query is two binary searches over one
+    contiguous block instead of a scan of every row.
+
+    Rows are compared on integer codes (e.g. ``pandas.factorize`` of
+    lower-cased names, -1 where missing): ``categories[code]`` is the key a
+    category code stands for. Rows without a category or a price never
+    match; rows without a name count as one name when deduplicating.
+    """
+
+    def __init__(self, category_codes, categories, prices, name_codes):
+        category_codes = np.asarray(category_codes)
+        self.categories = list(categories)
+        self.name_codes = np.asarray(name_codes, dtype=np.int32)
+        self.category_lookup = {category: code for code, category in enumerate(self.categories)}
+
+        prices = np.asarray(prices)
+        if not np.issubdtype(prices.dtype, np.number):
+            raise TypeError(f"prices must be numeric, got {prices.dtype}")
+        indexed = category_codes >= 0
+        if prices.dtype.kind == "f":
+            indexed &= ~np.isnan(prices)
+        indexed = np.flatnonzero(indexed)
+
+        # Stable sort: equal prices keep CRM order
+        order = np.lexsort((prices[indexed], category_codes[indexed]))
+        self.rows = indexed[order].astype(np.int64)
+        self.prices = prices[self.rows]
+        self.starts = np.searchsorted(category_codes[self.rows], np.arange(len(self.categories) + 1))
+
+    def __len__(self):
+        return self.rows.size
+
+    def _span(self, category, min_price, max_price):
+        """Positions [start, stop) of one category's rows priced within the range."""
+        code = self.category_lookup.get(category)
+        if code is None:
+            return 0, 0
+        first, last = self.starts[code], self.starts[code + 1]
+        prices = self.prices[first:last]
+        start = first + np.searchsorted(prices, min_price, side="left")
+        stop = first + np.searchsorted(prices, max_price, side="right")
+        return start, max(start, stop)
+
+    def range_rows(self, category, min_price, max_price):
+        """Rows in the category priced within [min_price, max_price], in CRM order."""
+        start, stop = self._span(category, min_price, max_price)
+        return np.sort(self.rows[start:stop])
+
+    def _closest_distinct(self, start, stop, target, k):
+        rows = self.rows[start:stop]
+        prices = self.prices[start:stop]
+        distances = np.abs(prices - target)
+        # Nearest first; ties go to the lower price, then the earlier row
+        order = np.lexsort((rows, prices, distances))
+        _, first = np.unique(self.name_codes[rows[order]], return_index=True)
+        picked = order[np.sort(first)[:k]]
+        return rows[picked], distances[picked]
+
+    def nearest_rows(self, category, min_price, max_price, k, target=None):
+        """
+        Up to ``k`` rows in the category and price range with distinct product
+        names, nearest to ``target`` (default: middle of the range) first.
+        """
+        start, stop = self._span(category, min_price, max_price)
+        if k <= 0 or stop <= start:
+            return np.zeros(0, dtype=np.int64)
+        if target is None:
+            target = (min_price + max_price) / 2
+
+        # The w nearest prices lie within w positions of the target; widen
+        # until k names are found, then take every row as close as the k-th
+        center = start + np.searchsorted(self.prices[start:stop], target)
+        width = k
+        while True:
+            low, high = max(start, center - width), min(stop, center + width)
+            rows, distances = self._closest_distinct(low, high, target, k)
+            if rows.size == k or (low == start and high == stop):
+                break
+            width *= 2
+        if rows.size == k:
+            # A little wider than the k-th distance so rounding cannot drop a tie
+            reach = distances[-1] + 1e-9 * (abs(target) + distances[-1])
+            prices = self.prices[start:stop]
+            low = start + np.searchsorted(prices, target - reach, side="left")
+            high = start + np.searchsorted(prices, target + reach, side="right")
+            rows, _ = self._closest_distinct(low, high, target, k)
+        return rows
@@ -0,0 +1,218 @@
+# groq_client.py
+import threading
+
+import httpx
+
+from call_policy import get_policy
+from runtime_config import get_groq_api_key, get_groq_base_url, get_setting
+
+CHAT_COMPLETIONS_PATH = "/openai/v1/chat/completions"
+MODELS_PATH = "/openai/v1/models"
+
+# Per-request timeouts (seconds) for each kind of remote call.
+TRANSCRIPTION_TIMEOUT = 30.0
+CHAT_TIMEOUT = 20.0
+SUMMARY_TIMEOUT = 60.0
+
+_lock = threading.Lock()
+_http_client = None
+_groq_clients = {}
+
+
+class ConnectionStats:
+    """
+    Thread-safe counters used to confirm that pooled connections are reused.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def record_tls_handshake(self):
+        with self._lock:
+            self.tls_handshakes += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": max(0, self.requests - self.new_connections),
+                "tls_handshakes": self.tls_handshakes,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+            self.tls_handshakes = 0
+
+
+stats = ConnectionStats()
+
+
+class _CountingTransport(httpx.HTTPTransport):
+    """
+    HTTP transport that reports new TCP connections and TLS handshakes
+    through httpcore trace events.
+    """
+
+    def handle_request(self, request):
+        stats.record_request()
+        previous_trace = request.extensions.get("trace")
+
+        def trace(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                stats.record_connection()
+            elif event_name == "connection.start_tls.complete":
+                stats.record_tls_handshake()
+            if previous_trace is not None:
+                previous_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        return super().handle_request(request)
+
+
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_http_client():
+    max_connections = get_setting("GROQ_POOL_MAX_CONNECTIONS", 20, int)
+    max_keepalive = get_setting("GROQ_POOL_MAX_KEEPALIVE", 20, int)
+    keepalive_expiry = get_setting("GROQ_POOL_KEEPALIVE_EXPIRY", 60.0, float)
+    connect_timeout = get_setting("GROQ_CONNECT_TIMEOUT", 5.0, float)
+    http2 = get_setting("GROQ_HTTP2", True, bool) and _http2_available()
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive,
+        keepalive_expiry=keepalive_expiry,
+    )
+    transport = _CountingTransport(http2=http2, limits=limits)
+    return httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(CHAT_TIMEOUT, connect=connect_timeout),
+        follow_redirects=True,
+    )
+
+
+def get_http_client():
+    """
+    Return the process-wide pooled HTTP client, creating it on first use.
+    """
+    global _http_client
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                _http_client = _build_http_client()
+    return _http_client
+
+
+def _require_api_key():
+    api_key = get_groq_api_key()
+    if not api_key:
+        raise ValueError("GROQ_API_KEY is not configured.")
+    return api_key
+
+
+def get_groq_client():
+    """
+    Return a Groq SDK client that shares the pooled HTTP client. The SDK's
+    own retries are off; callers go through a call_policy policy instead.
+    """
+    api_key = _require_api_key()
+    client = _groq_clients.get(api_key)
+    if client is None:
+        # Built before taking _lock: get_http_client takes it too
+        http_client = get_http_client()
+        with _lock:
+            client = _groq_clients.get(api_key)
+            if client is None:
+                from groq import Groq  # heavy import, deferred until the first SDK call or prewarm
+
+                client = Groq(
+                    api_key=api_key,
+                    base_url=get_groq_base_url(),
+                    http_client=http_client,
+                    max_retries=0,
+                )
+                _groq_clients[api_key] = client
+    return client
+
+
+def post_chat_completion(payload, timeout=CHAT_TIMEOUT, deadline=None, policy="chat"):
+    """
+    POST a chat-completion payload over the pooled client and return the JSON body.
+
+    Retries, hedging and the circuit breaker come from the named call policy;
+    ``timeout`` caps each attempt and ``deadline`` (a call_policy.Deadline)
+    bounds the whole call.
+    """
+    url = get_groq_base_url() + CHAT_COMPLETIONS_PATH
+    headers = {"Authorization": f"Bearer {_require_api_key()}"}
+
+    def attempt(attempt_timeout):
+        response = get_http_client().post(url, headers=headers, json=payload, timeout=attempt_timeout)
+        response.raise_for_status()
+        return response.json()
+
+    return get_policy(policy, timeout).call(attempt, deadline)
+
+
+def prewarm_connections(connections=2):
+    """
+    Open pooled connections (TCP, TLS and HTTP/2 setup) and build the SDK
+    client before the first real request needs them. ``connections``
+    concurrent GETs of the models list leave that many sockets in the pool.
+    Returns how many requests got a response.
+    """
+    get_groq_client()
+    url = get_groq_base_url() + MODELS_PATH
+    headers = {"Authorization": f"Bearer {_require_api_key()}"}
+    timeout = get_setting("GROQ_CONNECT_TIMEOUT", 5.0, float)
+    answered = []
+
+    def warm():
+        try:
+            get_http_client().get(url, headers=headers, timeout=timeout)
+            answered.append(True)
+        except Exception as error:
+            print(f"[Prewarm] Connection warm-up failed: {error}")
+
+    threads = [threading.Thread(target=warm, daemon=True) for _ in range(max(1, connections))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(answered)
+
+
+def get_connection_stats():
+    return stats.snapshot()
+
+
+def close():
+    """
+    Close pooled connections; the next call opens a fresh pool.
+    """
+    global _http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = None
+        _groq_clients.clear()
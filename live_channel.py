@@ -0,0 +1,275 @@
+# live_channel.py
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from runtime_config import get_setting
+
+SEGMENT = "segment"
+STATUS = "status"
+PARTIAL = "partial"
+
+TRANSCRIPT_FILE = "transcript_live.jsonl"
+STATUS_FILE = "status_live.json"
+PARTIAL_FILE = "partial_live.json"
+
+
+class LiveChannel:
+    """
+    In-process publish/subscribe channel for one call session.
+
+    Every transcript segment and status update gets a monotonic sequence
+    number; readers ask for the events after the last sequence they saw.
+    Only the latest status and the latest interim (partial) transcript are
+    kept, since each one replaces the previous.
+    """
+
+    def __init__(self, session_id, max_events=5000):
+        self.session_id = session_id
+        self._events = deque(maxlen=max_events)
+        self._status = None
+        self._partial = None
+        self._seq = 0
+        self._condition = threading.Condition()
+
+    @property
+    def last_seq(self):
+        with self._condition:
+            return self._seq
+
+    def clear(self):
+        with self._condition:
+            self._events.clear()
+            self._status = None
+            self._partial = None
+            self._condition.notify_all()
+
+    def publish(self, kind, data):
+        with self._condition:
+            self._seq += 1
+            event = {"seq": self._seq, "type": kind, "time": time.time(), "data": data}
+            if kind == STATUS:
+                self._status = event
+            elif kind == PARTIAL:
+                self._partial = event
+            else:
+                self._events.append(event)
+                if self._partial is not None and _replaces_partial(event, self._partial):
+                    self._partial = None
+            self._persist(event)
+            self._condition.notify_all()
+            return self._seq
+
+    def publish_segment(self, timestamp, text, suggestion, utterance_id=None):
+        return self.publish(
+            SEGMENT,
+            {"timestamp": timestamp, "text": text, "suggestion": suggestion, "utterance_id": utterance_id},
+        )
+
+    def publish_partial(self, utterance_id, text):
+        return self.publish(PARTIAL, {"utterance_id": utterance_id, "text": text})
+
+    def publish_status(self, sentiment, summary, suggestion):
+        return self.publish(STATUS, {"sentiment": sentiment, "summary": summary, "suggestion": suggestion})
+
+    def publish_sentiment(self, sentiment):
+        """Update only the sentiment, keeping the current summary and suggestion."""
+        with self._condition:
+            data = dict(self._status["data"]) if self._status else {}
+            data["sentiment"] = sentiment
+            return self.publish(STATUS, data)
+
+    def _persist(self, event):
+        pass
+
+    def events_since(self, seq=0):
+        """
+        Transcript segments with a sequence number above ``seq``, plus the latest
+        status and partial transcript if they changed since then, in sequence order.
+        """
+        with self._condition:
+            events = [event for event in self._events if event["seq"] > seq]
+            for latest in (self._status, self._partial):
+                if latest is not None and latest["seq"] > seq:
+                    events.append(latest)
+        return sorted(events, key=lambda event: event["seq"])
+
+    def latest_status(self):
+        with self._condition:
+            return dict(self._status["data"]) if self._status else {}
+
+    def wait_for_update(self, seq, timeout=None):
+        """Block until something newer than ``seq`` is published."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._seq > seq, timeout=timeout)
+
+
+class FileLiveChannel(LiveChannel):
+    """
+    File-backed channel for deployments that need the live state on disk.
+
+    Segments are appended as JSON lines and read back by tailing from the
+    last byte offset; the status file is replaced atomically.
+
+    The sequence number is read back from the files, so a channel opened on
+    an existing directory (after a restart, or in another process tailing
+    it) continues the sequence instead of restarting at 0, and ``last_seq``
+    reflects events published by other processes.
+    """
+
+    def __init__(self, session_id, directory=".", max_events=5000):
+        super().__init__(session_id, max_events=max_events)
+        self.directory = os.path.join(directory, session_id)
+        os.makedirs(self.directory, exist_ok=True)
+        self.transcript_path = os.path.join(self.directory, TRANSCRIPT_FILE)
+        self.status_path = os.path.join(self.directory, STATUS_FILE)
+        self.partial_path = os.path.join(self.directory, PARTIAL_FILE)
+        self._tail_lock = threading.Lock()
+        self._tail_offset = 0
+        self._tail_events = deque(maxlen=max_events)
+        self._seq = self._disk_seq()
+
+    @property
+    def last_seq(self):
+        with self._condition:
+            seq = self._seq
+        return max(seq, self._disk_seq())
+
+    def publish(self, kind, data):
+        with self._condition:
+            # Another process may have published to the same directory
+            self._seq = max(self._seq, self._disk_seq())
+            return super().publish(kind, data)
+
+    def _disk_seq(self):
+        """Highest sequence number in the transcript, status and partial files."""
+        seqs = [_read_json(path).get("seq", 0) for path in (self.status_path, self.partial_path)]
+        last_line = _last_line(self.transcript_path)
+        if last_line:
+            try:
+                seqs.append(json.loads(last_line).get("seq", 0))
+            except (json.JSONDecodeError, AttributeError):
+                pass
+        return max(seqs)
+
+    def clear(self):
+        super().clear()
+        with self._tail_lock:
+            for path in (self.transcript_path, self.status_path, self.partial_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._tail_offset = 0
+            self._tail_events.clear()
+
+    def _persist(self, event):
+        if event["type"] == STATUS:
+            _atomic_write_json(self.status_path, event)
+        elif event["type"] == PARTIAL:
+            _atomic_write_json(self.partial_path, event)
+        else:
+            with open(self.transcript_path, "a", encoding="utf-8") as file_handle:
+                file_handle.write(json.dumps(event) + "\n")
+
+    def _tail(self):
+        if not os.path.exists(self.transcript_path):
+            return
+        if os.path.getsize(self.transcript_path) < self._tail_offset:
+            # File was truncated or replaced; start over
+            self._tail_offset = 0
+            self._tail_events.clear()
+
+        with open(self.transcript_path, "rb") as file_handle:
+            file_handle.seek(self._tail_offset)
+            for line in file_handle:
+                if not line.endswith(b"\n"):
+                    break  # writer is mid-line; pick it up next time
+                self._tail_offset += len(line)
+                try:
+                    self._tail_events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+    def events_since(self, seq=0):
+        with self._tail_lock:
+            self._tail()
+            events = [event for event in self._tail_events if event["seq"] > seq]
+        for latest in (_read_json(self.status_path), _read_json(self.partial_path)):
+            if latest and latest.get("seq", 0) > seq:
+                events.append(latest)
+        return sorted(events, key=lambda event: event["seq"])
+
+    def latest_status(self):
+        status = _read_json(self.status_path)
+        return dict(status.get("data", {})) if status else {}
+
+
+def _replaces_partial(segment, partial):
+    utterance_id = segment["data"].get("utterance_id")
+    return utterance_id is None or utterance_id >= partial["data"]["utterance_id"]
+
+
+def _last_line(path, block=4096):
+    """Last complete line of ``path`` (bytes), or None; reads from the end."""
+    try:
+        with open(path, "rb") as file_handle:
+            size = file_handle.seek(0, os.SEEK_END)
+            while True:
+                start = max(0, size - block)
+                file_handle.seek(start)
+                data = file_handle.read(size - start)
+                # Ignore a line the writer has not finished
+                end = data.rfind(b"\n")
+                if end < 0:
+                    if start == 0:
+                        return None
+                else:
+                    begin = data.rfind(b"\n", 0, end) + 1
+                    if begin > 0 or start == 0:
+                        return data[begin:end]
+                block *= 2
+    except OSError:
+        return None
+
+
+def _atomic_write_json(path, data):
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file_handle:
+        json.dump(data, file_handle)
+    os.replace(temp_path, path)
+
+
+def _read_json(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as file_handle:
+            return json.load(file_handle)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+_channels = {}
+_channels_lock = threading.Lock()
+
+
+def get_channel(session_id="default"):
+    """
+    Return the channel for a session, creating it on first use. The backend
+    is chosen with LIVE_CHANNEL_BACKEND ("memory" or "file").
+    """
+    with _channels_lock:
+        channel = _channels.get(session_id)
+        if channel is None:
+            if get_setting("LIVE_CHANNEL_BACKEND", "memory").lower() == "file":
+                channel = FileLiveChannel(session_id, get_setting("LIVE_CHANNEL_DIR", "live_sessions"))
+            else:
+                channel = LiveChannel(session_id)
+            _channels[session_id] = channel
+        return channel
+
+
+def drop_channel(session_id):
+    with _channels_lock:
+        _channels.pop(session_id, None)
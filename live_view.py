@@ -0,0 +1,164 @@
+# live_view.py
+import streamlit as st
+
+from runtime_config import get_setting
+
+SENTIMENT_EMOJI = {"positive": "🙂", "neutral": "😐", "negative": "🙁"}
+SENTIMENT_CLASS = {
+    "positive": "sentiment-positive",
+    "neutral": "sentiment-neutral",
+    "negative": "sentiment-negative",
+}
+
+
+def poll_live(channel):
+    """
+    Fetch only the events published since the last one this session saw.
+    Returns False without reading the channel when nothing new was published.
+    """
+    if channel.last_seq <= st.session_state.live_seq:
+        return False
+    for event in channel.events_since(st.session_state.live_seq):
+        if event["type"] == "segment":
+            st.session_state.live_segments.append(event["data"])
+            # Each segment is formatted once, when it arrives
+            st.session_state.live_rendered.append(format_segment(event["data"]))
+            partial = st.session_state.live_partial
+            utterance_id = event["data"].get("utterance_id")
+            if partial and (utterance_id is None or utterance_id >= partial["utterance_id"]):
+                st.session_state.live_partial = None
+        elif event["type"] == "partial":
+            st.session_state.live_partial = event["data"]
+        elif event["type"] == "status":
+            st.session_state.live_status = event["data"]
+        st.session_state.live_seq = max(st.session_state.live_seq, event["seq"])
+    return True
+
+
+def format_segment(segment):
+    return (
+        f"[{segment['timestamp']}] {segment['text']}\n"
+        f"→Recommendation: {segment['suggestion']}\n"
+        + "=" * 50
+    )
+
+
+def read_live():
+    """The whole live transcript as text, e.g. as a fallback post-call summary."""
+    lines = list(st.session_state.live_rendered)
+    if st.session_state.live_partial:
+        lines.append(f"<em>… {st.session_state.live_partial['text']}</em>")
+    if lines:
+        return "\n".join(lines)
+    return "Waiting for speech..."
+
+
+def transcript_window(window):
+    """
+    (start, end, total) of the utterances to show: the latest ``window`` while
+    following the call, or an older page once the agent paged back.
+    """
+    total = len(st.session_state.live_rendered)
+    end = st.session_state.get("live_page_end")
+    end = total if end is None else min(end, total)
+    return max(0, end - window), end, total
+
+
+def _page_older(start, window):
+    st.session_state.live_page_end = max(window, start)
+
+
+def _page_newer(end, window, total):
+    st.session_state.live_page_end = None if end + window >= total else end + window
+
+
+def _cached_markup(name, key, build):
+    """
+    Markup built at most once per published event: a fragment run with
+    nothing new re-emits what the last event produced. Streamlit removes a
+    fragment's elements that a run does not draw again, so the run cannot
+    simply skip them.
+    """
+    key = (st.session_state.live_seq,) + tuple(key)
+    cache = st.session_state.setdefault("live_markup", {})
+    cached = cache.get(name)
+    if cached is None or cached[0] != key:
+        cached = (key, build())
+        cache[name] = cached
+    return cached[1]
+
+
+def sentiment_markup(status):
+    sentiment_label = status.get("sentiment", "Neutral")
+    sentiment_key = sentiment_label.lower()
+    emoji = SENTIMENT_EMOJI.get(sentiment_key, "😐")
+    sent_class = SENTIMENT_CLASS.get(sentiment_key, "sentiment-neutral")
+    summary_text = status.get("summary", "")
+    return (
+        f"<div class='big-box {sent_class}'><h4>Sentiment {emoji}</h4><p style='margin:0'>{sentiment_label}</p></div>",
+        f"<div class='big-box'><h4>Customer Summary</h4><p style='margin:0'>{summary_text}</p></div>",
+    )
+
+
+def render_sentiment(status):
+    for markup in _cached_markup("sentiment", (), lambda: sentiment_markup(status)):
+        st.markdown(markup, unsafe_allow_html=True)
+
+
+def transcript_markup(window):
+    """The transcript box for the current page, and the page's (start, end, total)."""
+    start, end, total = transcript_window(window)
+    lines = st.session_state.live_rendered[start:end]
+    if end == total and st.session_state.live_partial:
+        lines = lines + [f"<em>… {st.session_state.live_partial['text']}</em>"]
+    text = "\n".join(lines) if lines else "Waiting for speech..."
+    return f"<div class='big-box transcript-box'>{text}</div>", (start, end, total)
+
+
+def render_transcript(listening, window=None):
+    """
+    Render at most ``window`` utterances (LIVE_WINDOW_SEGMENTS, default 20),
+    so each refresh costs the same however long the call has run. Older
+    utterances are reached by paging.
+    """
+    if not listening:
+        st.info("No live transcription (start a call to see it).")
+        return
+
+    window = window or get_setting("LIVE_WINDOW_SEGMENTS", 20, int)
+    key = (st.session_state.get("live_page_end"), window)
+    markup, (start, end, total) = _cached_markup("transcript", key, lambda: transcript_markup(window))
+    following = end == total
+    st.markdown(markup, unsafe_allow_html=True)
+
+    if total > window:
+        older, position, newer = st.columns([1, 3, 1])
+        older.button("◀ Older", key="live_older", disabled=start == 0,
+                     on_click=_page_older, args=(start, window))
+        position.caption(f"Utterances {start + 1}–{end} of {total}" + ("" if following else " (paused)"))
+        newer.button("Newer ▶", key="live_newer", disabled=following,
+                     on_click=_page_newer, args=(end, window, total))
+
+
+def render_suggestion(status):
+    suggestion_text = status.get("suggestion", "Waiting for customer input...")
+    markup = _cached_markup(
+        "suggestion", (),
+        lambda: f"<div class='big-box suggestion-box'><p style='margin:0'><strong>{suggestion_text}</strong></p></div>",
+    )
+    st.markdown(markup, unsafe_allow_html=True)
+
+
+def sentiment_panel(channel):
+    """Body of the sentiment/summary fragment."""
+    poll_live(channel)
+    render_sentiment(st.session_state.live_status)
+
+
+def transcript_panel(channel):
+    """Body of the transcript/suggestion fragment."""
+    poll_live(channel)
+    st.subheader("Live Transcript")
+    render_transcript(st.session_state.listening)
+    st.subheader("AI Suggestions for Customer")
+    render_suggestion(st.session_state.live_status)
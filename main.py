@@ -2,44 +2,75 @@ import json
 import os
 import queue
 import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime
 
 import numpy as np
 
-from audio import SilenceDetector
-from sentiment import analyze_customer_utterance, analyze_post_call_summary
-from sheet import extract_customer_name, get_sheet, save_post_call_summary
+from audio import create_vad
+from audio_ring import AudioRingBuffer, UtteranceBuffer
+from call_policy import Deadline
+from live_channel import get_channel
+from rolling_summary import RollingSummarizer
+from sentiment import (
+    analyze_customer_utterance,
+    analyze_post_call_summary,
+    classify_sentiment,
+    get_local_sentiment_threshold,
+)
+from sheet import extract_customer_name, queue_post_call_summary
+from stage_metrics import StageMetrics, record, session_scope, span
 from whisper_model import load_whisper_model, transcribe_audio
+from worker_pools import get_analysis_pool, get_summary_pool, get_transcription_pool
 
 
-LIVE_FILE = "transcript_live.txt"
-STATUS_FILE = "status_live.json"
-STOP_FILE = "stop_signal.txt"
 POST_SUMMARY_FILE = "post_summary.json"
 
 
-def write_live(text):
-    with open(LIVE_FILE, "a", encoding="utf-8") as file_handle:
-        file_handle.write(text + "\n")
+class SalesCallPipeline:
+    """
+    Live call pipeline split into three stages:
 
+    capture/VAD (one thread) -> transcription (worker pool) -> analysis (worker pool),
+    with a single publisher thread that writes results in utterance order.
 
-def clear_live():
-    for file_name in [LIVE_FILE, STATUS_FILE, STOP_FILE]:
-        if os.path.exists(file_name):
-            os.remove(file_name)
+    The worker pools default to the process-wide ones in worker_pools, so
+    concurrent calls share a bounded number of threads. Live events go to the
+    session's channel and the post-call summary to ``output_dir``.
 
+    With ``streaming=True`` the last ``partial_window_sec`` of an utterance that
+    is still in progress is transcribed every ``partial_interval_sec`` and
+    published as interim text, which the final transcript later replaces.
 
-def update_status(sentiment, summary, suggestion):
-    status = {
-        "sentiment": sentiment,
-        "summary": summary,
-        "suggestion": suggestion,
-    }
-    with open(STATUS_FILE, "w", encoding="utf-8") as file_handle:
-        json.dump(status, file_handle)
+    Sentiment is scored locally as soon as a transcript arrives and published
+    straight away when the local classifier is confident; the LLM analysis
+    fills in summary and suggestion (and sentiment otherwise) afterwards.
 
+    The post-call summary is built while the call runs: every
+    ``summary_update_every`` utterances are folded into a rolling structured
+    summary, so stopping the call only folds in the last few.
+
+    Each utterance has ``utterance_budget_sec`` from end of speech to get its
+    transcript and suggestion, of which transcription may use at most
+    ``transcription_budget_sec``; retries stop when the budget is spent.
+
+    ``vad`` picks the speech/silence detector: "energy" (RMS against the
+    recent level), "spectral" (voice-band ratio, flatness and zero-crossing
+    rate, which ignores steady noise and clicks) or a VoiceActivityDetector.
+
+    Every stage is timed into ``metrics`` (this session) and the process-wide
+    histograms in stage_metrics, including the remote calls made on its behalf.
+
+    Between utterances only the last ``pre_roll_sec`` of audio is kept, so
+    silence before speech is not uploaded. An utterance that reaches
+    ``max_utterance_sec`` is cut at the quietest point of its last
+    ``cut_search_sec`` and continues as a new utterance. The ring and the
+    utterance buffer together stay under ``max_audio_memory_mb``; a
+    ``max_utterance_sec`` that would not fit is lowered. ``None`` disables
+    each of these limits.
+    """
 
-class SalesCallPipeline:
     def __init__(
         self,
         model_name="whisper-large-v3-turbo",
@@ -48,24 +79,96 @@ class SalesCallPipeline:
         target_silence_sec=1.2,
         buffer_blocks=20,
         multiplier=1.5,
+        session_id="default",
+        output_dir=".",
+        transcription_pool=None,
+        analysis_pool=None,
+        streaming=False,
+        partial_interval_sec=1.0,
+        partial_window_sec=8.0,
+        ring_buffer_sec=10.0,
+        summary_update_every=20,
+        summary_pool=None,
+        utterance_budget_sec=8.0,
+        transcription_budget_sec=5.0,
+        pre_roll_sec=0.3,
+        max_utterance_sec=30.0,
+        cut_search_sec=2.0,
+        max_audio_memory_mb=16.0,
+        vad="energy",
     ):
+        self.session_id = session_id
+        self.output_dir = output_dir
+        self.post_summary_file = os.path.join(output_dir, POST_SUMMARY_FILE)
+        self.channel = get_channel(session_id)
         self.model_name = model_name
         self.sample_rate = sample_rate
         self.block_duration = block_duration
         self.frames_per_block = int(sample_rate * block_duration)
-        self.silence_detector = SilenceDetector(
+        self.silence_detector = create_vad(
+            vad,
             block_duration=block_duration,
             target_silence_sec=target_silence_sec,
             buffer_blocks=buffer_blocks,
             multiplier=multiplier,
+            sample_rate=sample_rate,
         )
-        self.audio_queue = queue.Queue()
-        self.audio_buffer = []
+        self.streaming = streaming
+        self.partial_interval_sec = partial_interval_sec
+        self.utterance_budget_sec = utterance_budget_sec
+        self.transcription_budget_sec = transcription_budget_sec
+        self.partial_blocks = max(1, int(round(partial_interval_sec / block_duration)))
+        self.partial_window_blocks = max(1, int(round(partial_window_sec / block_duration)))
+        # Audio arrives through a preallocated SPSC ring; the open utterance is
+        # collected in one contiguous buffer instead of a list of blocks. Both
+        # are allocated by start() and freed when the call ends, so an idle
+        # session holds no audio memory.
+        self.audio_queue = AudioRingBuffer(int(sample_rate * ring_buffer_sec), allocate=False)
+        self.pre_roll_samples = None if pre_roll_sec is None else int(pre_roll_sec * sample_rate)
+        self.max_utterance_samples = None if max_utterance_sec is None else int(max_utterance_sec * sample_rate)
+        self.cut_search_samples = int(cut_search_sec * sample_rate)
+        buffer_limit = None
+        if max_audio_memory_mb is not None:
+            # float32 samples; one extra block because the length check runs after an append
+            budget = int(max_audio_memory_mb * 1024 * 1024) // 4 - self.audio_queue.capacity - self.frames_per_block
+            budget = max(self.frames_per_block * 2, budget)
+            if self.max_utterance_samples is None or self.max_utterance_samples > budget:
+                print(
+                    f"[Capture] Max utterance limited to {budget / sample_rate:.1f}s "
+                    f"by the {max_audio_memory_mb} MB audio memory ceiling"
+                )
+                self.max_utterance_samples = budget
+            buffer_limit = self.max_utterance_samples + self.frames_per_block
+        self.audio_buffer = UtteranceBuffer(sample_rate * 30, max_samples=buffer_limit, allocate=False)
+        self.trimmed_samples = 0
+        self.forced_cuts = 0
+        self._block = np.zeros(self.frames_per_block, dtype=np.float32)
         self.call_transcript = []
+        self.suggestion_latencies = []
+        self.transcript_latencies = []
+        self.text_latencies = []
+        self.metrics = StageMetrics()
+        self.partial_requests = 0
+        self.local_sentiment_threshold = get_local_sentiment_threshold()
         self.stop_event = threading.Event()
         self.finalized_event = threading.Event()
         self._model = None
         self._thread = None
+        self._publisher_thread = None
+        self._publish_queue = queue.Queue()
+        self._transcription_pool = transcription_pool
+        self._analysis_pool = analysis_pool
+        self._summary_pool = summary_pool
+        self.summary_update_every = summary_update_every
+        self.summarizer = None
+        self._utterance_id = 0
+        self._open_utterance = None
+        self._utterance_timings = {}
+        self._timing_lock = threading.Lock()
+        self._partial_in_flight = None
+        self._blocks_since_partial = 0
+        self._sentiment_lock = threading.Lock()
+        self._sentiment_utterance = 0
         self._lock = threading.Lock()
 
     def _ensure_model(self):
@@ -81,12 +184,38 @@ class SalesCallPipeline:
             if self.is_running():
                 return
 
-            clear_live()
+            self.channel.clear()
+            self.audio_queue.allocate()
+            # Drop anything a producer wrote while the previous call was being released
+            self.audio_queue.clear()
+            self.audio_buffer.allocate()
             self.audio_buffer.clear()
             self.call_transcript.clear()
+            self.suggestion_latencies.clear()
+            self.transcript_latencies.clear()
+            self.text_latencies.clear()
+            self.metrics.reset()
+            # Onset, hangover and noise-floor state belong to the previous call
+            self.silence_detector.reset()
+            self.trimmed_samples = 0
+            self.forced_cuts = 0
+            self.audio_buffer.dropped_samples = 0
+            self.partial_requests = 0
+            self._open_utterance = None
+            self._utterance_timings.clear()
+            self._sentiment_utterance = 0
             self.stop_event.clear()
             self.finalized_event.clear()
 
+            if self._transcription_pool is None:
+                self._transcription_pool = get_transcription_pool()
+            if self._analysis_pool is None:
+                self._analysis_pool = get_analysis_pool()
+            if self._summary_pool is None:
+                self._summary_pool = get_summary_pool()
+            self.summarizer = RollingSummarizer(self._summary_pool, self.summary_update_every)
+            self._publisher_thread = threading.Thread(target=self._publisher_loop, daemon=True)
+            self._publisher_thread.start()
             self._thread = threading.Thread(target=self._transcriber_loop, daemon=True)
             self._thread.start()
 
@@ -98,39 +227,258 @@ class SalesCallPipeline:
 
     def enqueue_audio(self, audio_block):
         if not self.stop_event.is_set():
-            self.audio_queue.put(audio_block)
+            self.audio_queue.write(audio_block)
+
+    # ------------------- Stage 1: capture / VAD -------------------
+    def _begin_utterance(self):
+        self._utterance_id += 1
+        self._open_utterance = self._utterance_id
+        self._blocks_since_partial = 0
+        with self._timing_lock:
+            self._utterance_timings[self._utterance_id] = {
+                "onset": time.perf_counter(),
+                "first_text": None,
+            }
+        return self._utterance_id
+
+    def _submit_utterance(self, audio_data=None):
+        """
+        Hand the buffered utterance (or ``audio_data``) to the transcription
+        pool without blocking.
+        """
+        if audio_data is None:
+            if not self.audio_buffer:
+                return
+            with span("buffer_take", self.metrics):
+                audio_data = self.audio_buffer.take()
 
-    def _process_audio_buffer(self):
-        if not self.audio_buffer:
-            return
+        utterance_id = self._open_utterance or self._begin_utterance()
+        self._open_utterance = None
 
-        audio_data = np.concatenate(self.audio_buffer).flatten().astype(np.float32)
         if not np.any(audio_data):
-            self.audio_buffer = []
+            self._discard_timing(utterance_id)
+            return
+
+        ended_at = time.perf_counter()
+        deadline = Deadline(self.utterance_budget_sec)
+        result = Future()
+        transcription = self._transcription_pool.submit(
+            self._transcribe_stage, audio_data, deadline.cap(self.transcription_budget_sec), ended_at
+        )
+        transcription.add_done_callback(
+            lambda done: self._on_transcribed(done, result, utterance_id, deadline, ended_at)
+        )
+        self._publish_queue.put((utterance_id, ended_at, result))
+
+    def _cut_utterance(self):
+        """
+        End an utterance that reached the maximum length at the quietest block
+        of its last ``cut_search_sec``; the rest stays buffered and opens the
+        next utterance.
+        """
+        audio = self.audio_buffer.view()
+        block = self.frames_per_block
+        frames = min(audio.size, self.cut_search_samples) // block
+        cut = audio.size
+        if frames:
+            recent = audio[audio.size - frames * block :].reshape(frames, block)
+            quietest = int(np.argmin(np.einsum("ij,ij->i", recent, recent)))
+            cut = audio.size - (frames - quietest) * block + block // 2
+        self.forced_cuts += 1
+        with span("buffer_take", self.metrics):
+            head = self.audio_buffer.split(cut)
+        self._submit_utterance(head)
+        self._begin_utterance()
+
+    def capture_stats(self):
+        """Pre-roll trimming, forced cuts and audio memory for this call."""
+        return {
+            "trimmed_sec": round(self.trimmed_samples / self.sample_rate, 3),
+            "forced_cuts": self.forced_cuts,
+            "dropped_at_ceiling_sec": round(self.audio_buffer.dropped_samples / self.sample_rate, 3),
+            "audio_memory_bytes": self.audio_queue.nbytes + self.audio_buffer.nbytes,
+            "max_utterance_sec": (
+                None if self.max_utterance_samples is None else self.max_utterance_samples / self.sample_rate
+            ),
+        }
+
+    def _maybe_submit_partial(self):
+        """
+        In streaming mode, transcribe the recent window of the open utterance at
+        a fixed cadence. At most one partial request is in flight per call.
+        """
+        self._blocks_since_partial += 1
+        if self._blocks_since_partial < self.partial_blocks:
+            return
+        if self._partial_in_flight is not None and not self._partial_in_flight.done():
             return
 
-        model = self._ensure_model()
-        texts = transcribe_audio(model, audio_data)
+        self._blocks_since_partial = 0
+        utterance_id = self._open_utterance
+        window = self.audio_buffer.tail(self.partial_window_blocks * self.frames_per_block)
+        audio_data = window.copy()
+        self.partial_requests += 1
+        # A partial is stale once the next one is due, so it gets a short budget
+        deadline = Deadline(max(1.0, 2 * self.partial_interval_sec))
+        self._partial_in_flight = self._transcription_pool.submit(
+            self._transcribe_stage, audio_data, deadline, time.perf_counter(), "partial_transcription"
+        )
+        self._partial_in_flight.add_done_callback(
+            lambda done: self._on_partial(done, utterance_id)
+        )
+
+    def _discard_timing(self, utterance_id):
+        with self._timing_lock:
+            self._utterance_timings.pop(utterance_id, None)
+
+    def _flush_buffer(self):
+        if self.audio_buffer:
+            self._submit_utterance()
+
+    # ------------------- Stage 2: transcription -------------------
+    def _transcribe_stage(self, audio_data, deadline=None, submitted_at=None, stage="transcription"):
+        if submitted_at is not None:
+            record(f"{stage}_queue", time.perf_counter() - submitted_at, self.metrics)
+        with session_scope(self.metrics), span(stage):
+            model = self._ensure_model()
+            texts = transcribe_audio(model, audio_data, sample_rate=self.sample_rate, deadline=deadline)
         full_transcript = " ".join([text.strip() for text in texts if text.strip()])
-        full_transcript = " ".join(full_transcript.split())
+        return " ".join(full_transcript.split())
+
+    def _analyze_stage(self, full_transcript, local, deadline, submitted_at):
+        record("analysis_queue", time.perf_counter() - submitted_at, self.metrics)
+        with session_scope(self.metrics), span("analysis"):
+            return analyze_customer_utterance(full_transcript, local=local, deadline=deadline)
+
+    def _on_partial(self, transcription, utterance_id):
+        try:
+            partial_text = transcription.result()
+        except Exception as error:
+            print(f"Partial transcription error: {error}")
+            return
+        if not partial_text:
+            return
+
+        with self._timing_lock:
+            timing = self._utterance_timings.get(utterance_id)
+            if timing is None:
+                return  # final transcript already published
+            if timing["first_text"] is None:
+                timing["first_text"] = time.perf_counter()
+            self.channel.publish_partial(utterance_id, partial_text)
+
+    def _on_transcribed(self, transcription, result, utterance_id, deadline=None, ended_at=None):
+        # The publisher waits on ``result``: every path out of here must resolve it
+        try:
+            self._start_analysis(transcription, result, utterance_id, deadline, ended_at)
+        except Exception as error:
+            if not result.done():
+                result.set_exception(error)
+
+    def _start_analysis(self, transcription, result, utterance_id, deadline, ended_at):
+        try:
+            full_transcript = transcription.result()
+        except Exception as error:
+            result.set_exception(error)
+            return
 
         if not full_transcript:
-            self.audio_buffer = []
+            result.set_result(None)
             return
+        if ended_at is not None:
+            latency = time.perf_counter() - ended_at
+            self.transcript_latencies.append(latency)
+            record("eos_to_transcript", latency, self.metrics)
+
+        with span("local_sentiment", self.metrics):
+            local = classify_sentiment(full_transcript, self.local_sentiment_threshold)
+        if local["confident"]:
+            try:
+                self._publish_sentiment(utterance_id, local["sentiment"])
+            except Exception as error:
+                # The early label is optional; the analysis still publishes one
+                print(f"Could not publish local sentiment: {error}")
+
+        analysis = self._analysis_pool.submit(
+            self._analyze_stage, full_transcript, local, deadline, time.perf_counter()
+        )
+        analysis.add_done_callback(
+            lambda done: self._on_analyzed(done, full_transcript, result)
+        )
+
+    def _publish_sentiment(self, utterance_id, sentiment):
+        """Publish a sentiment unless a later utterance's label is already showing."""
+        with self._sentiment_lock:
+            if utterance_id >= self._sentiment_utterance:
+                self._sentiment_utterance = utterance_id
+                self.channel.publish_sentiment(sentiment)
+
+    # ------------------- Stage 3: analysis / publish -------------------
+    def _on_analyzed(self, analysis, full_transcript, result):
+        try:
+            result.set_result((full_transcript, analysis.result()))
+        except Exception as error:
+            result.set_exception(error)
+
+    def _publisher_loop(self):
+        """
+        Publish finished utterances strictly in the order they were spoken.
+        """
+        while True:
+            item = self._publish_queue.get()
+            if item is None:
+                return
 
+            utterance_id, ended_at, result = item
+            try:
+                outcome = result.result()
+            except Exception as error:
+                print(f"Utterance processing error: {error}")
+                self._discard_timing(utterance_id)
+                continue
+
+            if outcome is None:
+                self._discard_timing(utterance_id)
+                continue
+            try:
+                with span("publish", self.metrics):
+                    self._publish(utterance_id, ended_at, *outcome)
+            except Exception as error:
+                # Keep publishing later utterances; the channel may fail on file I/O
+                print(f"Publish error: {error}")
+                self._discard_timing(utterance_id)
+
+    def _publish(self, utterance_id, ended_at, full_transcript, analysis):
         timestamp = datetime.now().isoformat()
-        analysis = analyze_customer_utterance(full_transcript)
 
         sentiment = analysis["sentiment"]
         summary = analysis["summary"]
         suggestion = analysis["suggestion"]
 
         self.call_transcript.append(full_transcript)
-
-        write_live(f"[{timestamp}] {full_transcript}")
-        write_live(f"→Recommendation: {suggestion}")
-        write_live("=" * 50)
-        update_status(sentiment, summary, suggestion)
+        self.summarizer.add(full_transcript)
+
+        with self._timing_lock:
+            self.channel.publish_segment(timestamp, full_transcript, suggestion, utterance_id)
+            published_at = time.perf_counter()
+            timing = self._utterance_timings.pop(utterance_id, None)
+            if timing is not None:
+                self.text_latencies.append(
+                    {
+                        "utterance_id": utterance_id,
+                        "time_to_first_text": (timing["first_text"] or published_at) - timing["onset"],
+                        "time_to_final_text": published_at - timing["onset"],
+                    }
+                )
+        with self._sentiment_lock:
+            if utterance_id >= self._sentiment_utterance:
+                self._sentiment_utterance = utterance_id
+            else:
+                sentiment = self.channel.latest_status().get("sentiment", sentiment)
+            self.channel.publish_status(sentiment, summary, suggestion)
+        latency = time.perf_counter() - ended_at
+        self.suggestion_latencies.append(latency)
+        record("eos_to_suggestion", latency, self.metrics)
 
         print("\n" + "=" * 70)
         print(f"Timestamp        : {timestamp}")
@@ -142,18 +490,23 @@ class SalesCallPipeline:
         print(f"Recommendation   : {suggestion}")
         print("=" * 70 + "\n")
 
-        self.audio_buffer = []
-
-    def _flush_buffer(self):
-        if self.audio_buffer:
-            self._process_audio_buffer()
+    def _drain_stages(self):
+        """
+        Wait for this call's in-flight utterances to be published. The pools
+        may be shared with other calls, so they stay up.
+        """
+        self._publish_queue.put(None)
+        if self._publisher_thread is not None:
+            self._publisher_thread.join()
+        self._publisher_thread = None
 
     def _save_post_call_summary(self):
         if not self.call_transcript:
             return
 
         final_text = " ".join(self.call_transcript)
-        final_analysis = analyze_post_call_summary(final_text)
+        with session_scope(self.metrics), span("post_call_summary"):
+            final_analysis = self.summarizer.finalize() or analyze_post_call_summary(final_text)
 
         overall_sentiment = final_analysis.get("sentiment", "neutral")
         overall_summary = final_analysis.get("summary", "No summary available")
@@ -164,34 +517,35 @@ class SalesCallPipeline:
             "summary": overall_summary,
             "structured": final_analysis,
         }
-        with open(POST_SUMMARY_FILE, "w", encoding="utf-8") as file_handle:
-            json.dump(post_summary_data, file_handle, indent=2)
+        with span("post_summary_write", self.metrics):
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(self.post_summary_file, "w", encoding="utf-8") as file_handle:
+                json.dump(post_summary_data, file_handle, indent=2)
 
-        print(f"Post-call summary saved to {POST_SUMMARY_FILE}")
+        print(f"Post-call summary saved to {self.post_summary_file}")
 
         try:
-            sheet = get_sheet()
             customer_name = extract_customer_name(final_text)
-            save_post_call_summary(
-                sheet,
-                customer_name,
-                final_text,
-                overall_sentiment,
-                overall_summary,
-            )
-            print("Post-call summary saved to Google Sheet")
+            with span("sheet_enqueue", self.metrics):
+                queue_post_call_summary(
+                    customer_name,
+                    final_text,
+                    overall_sentiment,
+                    overall_summary,
+                )
+            print("Post-call summary queued for Google Sheet")
         except Exception as error:
-            print(f"Could not save to Google Sheet: {error}")
+            print(f"Could not queue Google Sheet row: {error}")
 
     def _cleanup(self):
-        self.audio_buffer.clear()
+        self.audio_buffer.release()
         self.call_transcript.clear()
-        with self.audio_queue.mutex:
-            self.audio_queue.queue.clear()
+        self.audio_queue.release()
 
     def _finalize(self):
         try:
             self._flush_buffer()
+            self._drain_stages()
             self._save_post_call_summary()
         finally:
             self._cleanup()
@@ -206,34 +560,51 @@ class SalesCallPipeline:
             self._ensure_model()
 
             while not self.stop_event.is_set() or not self.audio_queue.empty():
-                try:
-                    block = self.audio_queue.get(timeout=0.5)
-                except queue.Empty:
-                    continue
-
-                if block is None:
+                count = self.audio_queue.read_block(self._block, timeout=0.5)
+                if count == 0 and self.stop_event.is_set():
+                    count = self.audio_queue.read_into(self._block)
+                if count == 0:
                     continue
 
+                block = self._block[:count]
                 self.audio_buffer.append(block)
 
-                if self.silence_detector.is_silent(block):
+                vad_started = time.perf_counter()
+                silent = self.silence_detector.is_silent(block)
+                record("vad", time.perf_counter() - vad_started, self.metrics)
+                if silent:
                     if is_speaking:
                         silence_blocks += 1
+                    elif self.pre_roll_samples is not None:
+                        self.trimmed_samples += self.audio_buffer.keep_last(self.pre_roll_samples)
                 else:
                     if not is_speaking:
                         print("Speech detected, recording...")
                         is_speaking = True
+                        self._begin_utterance()
                     silence_blocks = 0
 
                 if is_speaking and silence_blocks >= self.silence_detector.silence_blocks_required:
-                    self._process_audio_buffer()
+                    self._submit_utterance()
                     silence_blocks = 0
                     is_speaking = False
                     print("Listening for your voice...")
+                elif (
+                    is_speaking
+                    and self.max_utterance_samples is not None
+                    and len(self.audio_buffer) >= self.max_utterance_samples
+                ):
+                    self._cut_utterance()
+                elif is_speaking and self.streaming:
+                    self._maybe_submit_partial()
 
         except Exception as error:
             print(f"Transcription loop error: {error}")
         finally:
+            if not is_speaking and self.pre_roll_samples is not None:
+                # Only pre-roll silence is left; it is not worth an upload
+                self.trimmed_samples += len(self.audio_buffer)
+                self.audio_buffer.clear()
             self._finalize()
 
 
@@ -0,0 +1,99 @@
+# prewarm.py
+import threading
+import time
+
+from runtime_config import get_setting
+
+# Once-per-process tasks that succeeded, and those running right now
+_warmed = set()
+_warming = set()
+_warmed_lock = threading.Lock()
+
+
+def _warm_connections():
+    from groq_client import prewarm_connections
+
+    prewarm_connections(get_setting("PREWARM_CONNECTIONS", 2, int))
+
+
+def _warm_crm():
+    from crm_functions import preload_crm_data
+
+    preload_crm_data()
+
+
+def _warm_analysis_cache():
+    from analysis_cache import get_analysis_cache
+    from sentiment import UTTERANCE_MODEL, UTTERANCE_PROMPT_VERSION
+
+    get_analysis_cache(f"{UTTERANCE_MODEL}/v{UTTERANCE_PROMPT_VERSION}")
+
+
+def _warm_sheets():
+    from sheet import get_sheet, get_sheet_writer
+
+    get_sheet_writer()
+    get_sheet()
+
+
+# (name, task, once per process). Connections are re-warmed on every call
+# because idle keep-alive sockets expire between calls.
+TASKS = (
+    ("connections", _warm_connections, False),
+    ("crm", _warm_crm, True),
+    ("analysis_cache", _warm_analysis_cache, True),
+    ("sheets", _warm_sheets, True),
+)
+
+
+def prewarm(tasks=None):
+    """
+    Do the set-up the first utterance of a call would otherwise wait for:
+    open provider connections, build the SDK client, load the CRM index,
+    open the analysis cache and authorize Google Sheets. Tasks run
+    concurrently; returns ``{name: seconds}`` or ``{name: "error: ..."}``.
+    A once-per-process task that failed is tried again on the next call,
+    and one already running in another call is not started twice.
+    """
+    results = {}
+
+    def run(name, task, once):
+        started = time.perf_counter()
+        try:
+            task()
+            results[name] = round(time.perf_counter() - started, 3)
+            if once:
+                with _warmed_lock:
+                    _warmed.add(name)
+        except Exception as error:
+            results[name] = f"error: {error}"
+            print(f"[Prewarm] {name} skipped: {error}")
+        finally:
+            if once:
+                with _warmed_lock:
+                    _warming.discard(name)
+
+    threads = []
+    for name, task, once in TASKS:
+        if tasks is not None and name not in tasks:
+            continue
+        if once:
+            with _warmed_lock:
+                if name in _warmed or name in _warming:
+                    continue
+                _warming.add(name)
+        thread = threading.Thread(target=run, args=(name, task, once), daemon=True, name=f"prewarm-{name}")
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def start_prewarm(tasks=None):
+    """Run ``prewarm`` in the background unless PREWARM is off; returns the thread or None."""
+    if not get_setting("PREWARM", True, bool):
+        return None
+    thread = threading.Thread(target=prewarm, args=(tasks,), daemon=True, name="prewarm")
+    thread.start()
+    return thread
@@ -0,0 +1,157 @@
+# resampler.py
+from functools import lru_cache
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+# Rate pairs whose filters are designed at import so the first frame pays nothing.
+COMMON_RATE_PAIRS = ((48000, 16000), (44100, 16000))
+
+STOPBAND_ATTENUATION_DB = 80.0
+
+
+@lru_cache(maxsize=16)
+def design_polyphase_filter(source_rate, target_rate):
+    """
+    Kaiser-windowed sinc low-pass for rational resampling, split into phases.
+
+    Returns (up, down, taps) where ``taps[p]`` holds the phase-``p`` filter in
+    reverse order, ready to be dotted with an ascending window of input samples.
+    """
+    divisor = gcd(source_rate, target_rate)
+    up, down = target_rate // divisor, source_rate // divisor
+
+    # Pass band up to 0.4 * the lower rate, stop band from its Nyquist frequency
+    low_rate = min(source_rate, target_rate)
+    transition_hz = 0.1 * low_rate
+    cutoff_hz = 0.45 * low_rate
+    beta = 0.1102 * (STOPBAND_ATTENUATION_DB - 8.7)
+    taps_per_phase = int(np.ceil(
+        (STOPBAND_ATTENUATION_DB - 8.0) / (2.285 * 2 * np.pi * transition_hz / source_rate)
+    ))
+    length = taps_per_phase * up
+
+    upsampled_rate = source_rate * up
+    positions = np.arange(length) - (length - 1) / 2.0
+    cutoff = cutoff_hz / upsampled_rate
+    prototype = 2 * cutoff * np.sinc(2 * cutoff * positions) * np.kaiser(length, beta)
+    prototype *= up / prototype.sum()
+
+    phases = prototype.reshape(taps_per_phase, up).T
+    return up, down, np.ascontiguousarray(phases[:, ::-1], dtype=np.float32)
+
+
+for _source_rate, _target_rate in COMMON_RATE_PAIRS:
+    design_polyphase_filter(_source_rate, _target_rate)
+
+
+class PolyphaseResampler:
+    """
+    Streaming rational resampler. Filter history and phase carry over from one
+    frame to the next, so frame boundaries are seamless; each call returns a
+    view into a reused output buffer (valid until the next call).
+
+    Once the buffers have grown to the frame size, a frame allocates no
+    sample data: outputs are computed either per phase, from a strided view
+    of the input, or per period of ``up`` outputs, from windows gathered into
+    a preallocated matrix, whichever takes fewer steps.
+    """
+
+    def __init__(self, source_rate, target_rate):
+        self.source_rate = int(source_rate)
+        self.target_rate = int(target_rate)
+        self.up, self.down, self.taps = design_polyphase_filter(self.source_rate, self.target_rate)
+        self.taps_per_phase = self.taps.shape[1]
+
+        # Output m = cycle * up + p reads the input window ending at
+        # cycle * down + offsets[p] through the filter phase (p * down) % up
+        period = np.arange(self.up)
+        self._period_offsets = (period * self.down) // self.up
+        self._period_taps = np.ascontiguousarray(self.taps[(period * self.down) % self.up])
+        self._period_windows = self._period_offsets[:, None] + np.arange(self.taps_per_phase)
+        self._index = np.empty_like(self._period_windows)
+        self._rows = np.empty(self._period_windows.shape, dtype=np.float32)
+
+        self._history = self.taps_per_phase - 1
+        self._work = np.zeros(self._history + 1024, dtype=np.float32)
+        self._out = np.zeros(1024, dtype=np.float32)
+        self._inputs_seen = 0
+        self._outputs_made = 0
+
+    @property
+    def delay_samples(self):
+        """Filter group delay in output samples."""
+        return (self.taps_per_phase * self.up - 1) / (2.0 * self.down)
+
+    def reset(self):
+        self._work[:] = 0.0
+        self._inputs_seen = 0
+        self._outputs_made = 0
+
+    def process(self, frame):
+        frame = np.asarray(frame, dtype=np.float32).reshape(-1)
+        count = frame.size
+        if count == 0:
+            return self._out[:0]
+
+        needed = self._history + count
+        if needed > self._work.size:
+            grown = np.zeros(needed, dtype=np.float32)
+            grown[: self._history] = self._work[: self._history]
+            self._work = grown
+        self._work[self._history : needed] = frame
+
+        first_input = self._inputs_seen
+        self._inputs_seen += count
+        # Every output whose newest input sample has now arrived
+        first_output = self._outputs_made
+        last_output = -(-self._inputs_seen * self.up // self.down)
+        self._outputs_made = last_output
+
+        size = last_output - first_output
+        if self._out.size < size:
+            self._out = np.zeros(size, dtype=np.float32)
+        result = self._out[:size]
+        if size:
+            # Window of output m starts at work index newest(m) - first_input
+            if self.up * self.up <= size:
+                self._by_phase(first_output, last_output, first_input, result)
+            else:
+                self._by_period(first_output, last_output, first_input, result)
+
+        # Keep the last taps_per_phase - 1 inputs for the next frame
+        self._work[: self._history] = self._work[needed - self._history : needed]
+        return result
+
+    def _by_phase(self, first_output, last_output, first_input, result):
+        """One strided pass per filter phase; used when there are few phases."""
+        itemsize = self._work.itemsize
+        for position in range(self.up):
+            cycle = -(-(first_output - position) // self.up)
+            output = cycle * self.up + position
+            if output >= last_output:
+                continue
+            outputs = -(-(last_output - output) // self.up)
+            start = cycle * self.down + self._period_offsets[position] - first_input
+            windows = as_strided(
+                self._work[start:],
+                shape=(outputs, self.taps_per_phase),
+                strides=(self.down * itemsize, itemsize),
+                writeable=False,
+            )
+            np.einsum("ij,j->i", windows, self._period_taps[position], out=result[output - first_output :: self.up])
+
+    def _by_period(self, first_output, last_output, first_input, result):
+        """One gathered pass per ``up`` outputs; used when there are many phases."""
+        output = first_output
+        while output < last_output:
+            cycle, position = divmod(output, self.up)
+            end = min(self.up, position + last_output - output)
+            index = self._index[: end - position]
+            np.add(self._period_windows[position:end], cycle * self.down - first_input, out=index)
+            rows = self._rows[: end - position]
+            np.take(self._work, index, out=rows, mode="clip")
+            done = output - first_output
+            np.einsum("ij,ij->i", rows, self._period_taps[position:end], out=result[done : done + end - position])
+            output += end - position
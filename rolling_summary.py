@@ -0,0 +1,91 @@
+# rolling_summary.py
+import threading
+
+from sentiment import analyze_post_call_summary, fold_call_summary
+
+
+class RollingSummarizer:
+    """
+    Keeps a structured post-call summary up to date while the call runs.
+
+    Every ``update_every`` utterances the unsummarized ones are folded into
+    the current summary on ``pool``, one update at a time, so ``finalize``
+    only has to fold in whatever arrived since the last update. A failed
+    update leaves its utterances pending; they are retried when the next
+    utterance arrives.
+    """
+
+    def __init__(self, pool, update_every=20):
+        self.pool = pool
+        self.update_every = max(1, int(update_every))
+        self.summary = None
+        self.updates = 0
+        self.failed_updates = 0
+        self._utterances = []
+        self._folded = 0
+        self._in_flight = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        with self._lock:
+            return len(self._utterances) - self._folded
+
+    def add(self, text):
+        with self._lock:
+            self._utterances.append(text)
+            self._maybe_schedule()
+
+    def finalize(self):
+        """
+        Wait for a running update, fold in the remaining utterances and return
+        the summary for the whole call (None if nothing was said).
+        """
+        with self._lock:
+            self._closed = True
+            in_flight = self._in_flight
+        if in_flight is not None:
+            in_flight.result()
+
+        with self._lock:
+            summary, start, end = self.summary, self._folded, len(self._utterances)
+        if start == end:
+            return summary
+        if summary is None:
+            # Short call: one request over the whole transcript, as before
+            self.summary = analyze_post_call_summary(" ".join(self._utterances))
+            return self.summary
+
+        try:
+            self.summary = fold_call_summary(summary, " ".join(self._utterances[start:end]))
+            self._folded = end
+        except Exception as e:
+            print(f"[Summary] Final update failed, using the summary up to utterance {start}: {e}")
+        return self.summary
+
+    def _maybe_schedule(self):
+        if self._closed or self._in_flight is not None:
+            return
+        if len(self._utterances) - self._folded < self.update_every:
+            return
+        start, end = self._folded, len(self._utterances)
+        chunk = " ".join(self._utterances[start:end])
+        self._in_flight = self.pool.submit(self._update, self.summary, chunk, end)
+
+    def _update(self, summary, chunk, end):
+        try:
+            folded = fold_call_summary(summary, chunk)
+        except Exception as e:
+            print(f"[Summary] Rolling update failed, will retry with the next chunk: {e}")
+            folded = None
+
+        with self._lock:
+            self._in_flight = None
+            if folded is None:
+                self.failed_updates += 1
+                return
+            self.summary = folded
+            self._folded = end
+            self.updates += 1
+            self._maybe_schedule()
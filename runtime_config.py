@@ -1,8 +1,18 @@
 import json
 import os
+import threading
+import time
 
+# Secrets are copied at most this often instead of on every lookup; edits to
+# secrets.toml are picked up within this interval (or at once via reload_config).
+SECRETS_TTL_SEC = 30.0
 
-def _get_streamlit_secrets():
+_secrets = None
+_secrets_loaded_at = 0.0
+_secrets_lock = threading.Lock()
+
+
+def _load_streamlit_secrets():
     try:
         import streamlit as st
         try:
@@ -13,6 +23,25 @@ def _get_streamlit_secrets():
         return {}
 
 
+def _get_streamlit_secrets():
+    global _secrets, _secrets_loaded_at
+    secrets = _secrets
+    if secrets is not None and time.monotonic() - _secrets_loaded_at < SECRETS_TTL_SEC:
+        return secrets
+    with _secrets_lock:
+        if _secrets is None or time.monotonic() - _secrets_loaded_at >= SECRETS_TTL_SEC:
+            _secrets = _load_streamlit_secrets()
+            _secrets_loaded_at = time.monotonic()
+        return _secrets
+
+
+def reload_config():
+    """Forget the memoized secrets so the next lookup reads them again."""
+    global _secrets
+    with _secrets_lock:
+        _secrets = None
+
+
 def get_groq_api_key(default=None):
     secrets = _get_streamlit_secrets()
     for key in ("GROQ_API_KEY", "groq_api_key"):
@@ -43,3 +72,25 @@ def get_service_account_credentials(default=None):
         return json.loads(env_value)
 
     return default
+
+
+def get_setting(name, default=None, cast=str):
+    secrets = _get_streamlit_secrets()
+    value = secrets.get(name)
+    if value in (None, ""):
+        value = os.getenv(name)
+    if value in (None, ""):
+        return default
+
+    if cast is bool:
+        if isinstance(value, bool):
+            return value
+        return str(value).strip().lower() in ("1", "true", "yes", "on")
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def get_groq_base_url(default="https://api.groq.com"):
+    return get_setting("GROQ_BASE_URL", default).rstrip("/")
@@ -1,22 +1,257 @@
 #sentiment.py
-import os
-import requests
 import json
+import threading
+import time
 from dotenv import load_dotenv
 
-from runtime_config import get_groq_api_key
+from analysis_batcher import MicroBatcher
+from analysis_cache import get_analysis_cache, normalize_utterance
+from groq_client import CHAT_TIMEOUT, SUMMARY_TIMEOUT, post_chat_completion
+from runtime_config import get_setting
+from stage_metrics import span
 
 load_dotenv()
 
+UTTERANCE_MODEL = "llama-3.1-8b-instant"
+# Bump when the prompt changes so cached analyses from the old one are not reused
+UTTERANCE_PROMPT_VERSION = 1
 
-def _get_groq_api_key():
-    api_key = get_groq_api_key()
-    if not api_key:
-        raise ValueError("GROQ_API_KEY is not configured.")
-    return api_key
+FALLBACK_ANALYSIS = {
+    "sentiment": "neutral",
+    "intent": "unknown",
+    "summary": "No summary provided",
+    "suggestion": "Listen carefully and respond appropriately."
+}
 
 
-def analyze_customer_utterance(text):
+# Local lexicon scorer: word -> weight, applied before any LLM round trip
+POSITIVE_WORDS = {
+    "good": 1.0, "great": 1.5, "perfect": 1.5, "excellent": 1.5, "awesome": 1.5, "amazing": 1.5,
+    "fantastic": 1.5, "wonderful": 1.5, "love": 1.5, "like": 0.75, "nice": 1.0, "happy": 1.0,
+    "glad": 1.0, "excited": 1.5, "interested": 1.0, "helpful": 1.0, "thanks": 0.75, "thank": 0.75,
+    "appreciate": 1.0, "impressed": 1.5, "yes": 0.5, "sure": 0.5, "definitely": 1.0,
+    "absolutely": 1.0, "agree": 1.0, "fair": 0.75, "reasonable": 1.0, "affordable": 1.0,
+    "convenient": 1.0, "easy": 0.75, "works": 0.5, "ready": 0.5, "recommend": 1.0, "deal": 0.5,
+}
+NEGATIVE_WORDS = {
+    "bad": 1.0, "terrible": 1.5, "awful": 1.5, "horrible": 1.5, "hate": 1.5, "dislike": 1.0,
+    "expensive": 1.5, "pricey": 1.0, "costly": 1.0, "overpriced": 1.5, "disappointed": 1.5,
+    "disappointing": 1.5, "frustrated": 1.5, "frustrating": 1.5, "annoyed": 1.5, "annoying": 1.5,
+    "angry": 1.5, "upset": 1.5, "unhappy": 1.5, "worried": 1.0, "concerned": 1.0, "concern": 0.75,
+    "problem": 1.0, "problems": 1.0, "issue": 0.75, "issues": 0.75, "complaint": 1.5,
+    "cancel": 1.5, "refund": 1.5, "broken": 1.5, "poor": 1.0, "slow": 0.75, "difficult": 1.0,
+    "confusing": 1.0, "confused": 0.75, "waste": 1.5, "unfortunately": 1.0, "wrong": 1.0,
+}
+NEGATIONS = frozenset({
+    "not", "no", "never", "dont", "doesnt", "didnt", "isnt", "wasnt", "arent", "cant", "cannot",
+    "wont", "wouldnt", "shouldnt", "nothing", "hardly", "neither", "nor",
+})
+# What follows "but" outweighs what came before it
+CONTRASTS = frozenset({"but", "however", "although", "though"})
+INTENSIFIERS = {"very": 1.5, "really": 1.5, "so": 1.3, "too": 1.3, "extremely": 2.0, "super": 1.5, "totally": 1.5}
+NEGATION_SCOPE = 3
+# Confidence when no sentiment words are present at all
+NO_EVIDENCE_CONFIDENCE = 0.5
+
+
+def get_local_sentiment_threshold():
+    return get_setting("LOCAL_SENTIMENT_THRESHOLD", 0.6, float)
+
+
+def classify_sentiment(text, threshold=None):
+    """
+    CPU-only lexicon sentiment with negation and intensifier handling.
+
+    Returns ``{"sentiment", "confidence", "confident"}``; ``confident`` is
+    ``confidence >= threshold`` (LOCAL_SENTIMENT_THRESHOLD, default 0.6).
+    """
+    if threshold is None:
+        threshold = get_local_sentiment_threshold()
+
+    positive = negative = 0.0
+    negated = 0
+    boost = 1.0
+    for word in normalize_utterance(text).split():
+        if word in NEGATIONS:
+            negated = NEGATION_SCOPE
+            continue
+        if word in CONTRASTS:
+            positive, negative = 0.5 * positive, 0.5 * negative
+            negated = 0
+            continue
+        if word in INTENSIFIERS:
+            boost = INTENSIFIERS[word]
+            continue
+
+        weight = POSITIVE_WORDS.get(word, 0.0) - NEGATIVE_WORDS.get(word, 0.0)
+        if weight:
+            weight *= boost
+            if negated:
+                weight = -0.8 * weight
+            if weight > 0:
+                positive += weight
+            else:
+                negative -= weight
+        boost = 1.0
+        negated = max(0, negated - 1)
+
+    evidence = positive + negative
+    if evidence == 0:
+        label, confidence = "neutral", NO_EVIDENCE_CONFIDENCE
+    else:
+        label = "positive" if positive > negative else "negative" if negative > positive else "neutral"
+        # Agreement between the two sides, scaled up as evidence accumulates
+        confidence = abs(positive - negative) / evidence * (1.0 - 0.4 ** evidence)
+    return {"sentiment": label, "confidence": round(confidence, 3), "confident": confidence >= threshold}
+
+
+def analyze_customer_utterance(text, use_cache=True, local=None, deadline=None):
+    """
+    Sentiment, intent, summary and suggestion for one customer utterance.
+
+    The LLM supplies summary, intent and suggestion; its sentiment is used
+    only when the local classifier (``local``, computed here if not given)
+    is not confident. Repeated short utterances are answered from the
+    analysis cache; pass ``use_cache=False`` when the result depends on
+    conversation context. ``deadline`` (a call_policy.Deadline) bounds the
+    LLM call, retries included.
+    """
+    if local is None:
+        local = classify_sentiment(text)
+
+    analysis = dict(_analyze_with_llm(text, use_cache, deadline))
+    if local["confident"]:
+        analysis["sentiment"] = local["sentiment"]
+        analysis["sentiment_source"] = "local"
+    else:
+        analysis["sentiment_source"] = "llm"
+    return analysis
+
+
+def _analyze_with_llm(text, use_cache, deadline=None):
+    cache = get_analysis_cache(f"{UTTERANCE_MODEL}/v{UTTERANCE_PROMPT_VERSION}")
+    if cache is not None:
+        if not use_cache:
+            cache.note_bypass()
+        else:
+            cached = cache.get(text)
+            if cached is not None:
+                return cached
+
+    started = time.perf_counter()
+    try:
+        batcher = get_analysis_batcher()
+        if batcher is not None:
+            analysis = batcher.submit(text, deadline=deadline).result(timeout=deadline.remaining() if deadline else None)
+        else:
+            analysis = _request_utterance_analysis(text, deadline)
+    except Exception as e:
+        print(f"Error analyzing customer utterance: {e}")
+        return FALLBACK_ANALYSIS
+
+    if cache is not None and use_cache:
+        cache.put(text, analysis, time.perf_counter() - started)
+    return analysis
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_analysis_batcher():
+    """
+    Process-wide micro-batcher for utterance analysis, or None unless
+    ANALYSIS_BATCHING is on. ANALYSIS_BATCH_SIZE and ANALYSIS_BATCH_WAIT_MS
+    bound how many utterances are sent together and how long the first waits.
+    """
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                if not get_setting("ANALYSIS_BATCHING", False, bool):
+                    return None
+                _batcher = MicroBatcher(
+                    _request_batch_analysis,
+                    _request_utterance_analysis,
+                    max_batch=get_setting("ANALYSIS_BATCH_SIZE", 8, int),
+                    max_wait_sec=get_setting("ANALYSIS_BATCH_WAIT_MS", 100, float) / 1000.0,
+                )
+    return _batcher
+
+
+def get_batcher_stats():
+    """Stats of the analysis micro-batcher, or None if batching is off or unused."""
+    batcher = _batcher
+    return None if batcher is None else batcher.stats()
+
+
+def _request_batch_analysis(texts, deadline=None):
+    """
+    Analyze several utterances (possibly from different calls) in one request.
+    Returns one analysis per text, None where the reply had no usable entry.
+    ``deadline`` is the earliest of the utterances' deadlines.
+    """
+    utterances = [{"id": str(index), "text": text} for index, text in enumerate(texts, start=1)]
+    prompt = f"""
+    You are an AI sales assistant. Each item below is something a customer just said, on separate calls.
+    Analyze every item independently.
+
+    Utterances (JSON):
+    {json.dumps(utterances)}
+
+    For each utterance:
+    1. Detect sentiment (positive, neutral, negative)
+    2. Detect the main intent of the customer
+    3. Summarize in 1-2 sentences what the customer wants
+    4. Suggest a practical, real-time action the salesperson should say next to the customer
+
+    Respond ONLY with a JSON array containing one object per utterance, in this format:
+    [
+        {{
+            "id": "<utterance id>",
+            "sentiment": "<positive/neutral/negative>",
+            "intent": "<main intent>",
+            "summary": "<1-2 sentence summary of customer need>",
+            "suggestion": "<short, clear action for salesperson>"
+        }}
+    ]
+    """
+
+    payload = {
+        "model": UTTERANCE_MODEL,
+        "messages": [
+            {"role": "system", "content": "You are an AI sales assistant providing actionable advice."},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.7
+    }
+
+    with span("analysis_batch_request"):
+        result = post_chat_completion(payload, timeout=CHAT_TIMEOUT, deadline=deadline)
+    raw_output = result["choices"][0]["message"]["content"].strip()
+    if raw_output.startswith("```"):
+        raw_output = raw_output.strip("`")
+        if raw_output.startswith("json"):
+            raw_output = raw_output[len("json"):]
+        raw_output = raw_output.strip()
+    parsed = json.loads(raw_output)
+    if isinstance(parsed, dict):
+        parsed = parsed.get("results", parsed.get("utterances"))
+    if not isinstance(parsed, list):
+        raise ValueError("batch reply is not a JSON array")
+
+    by_id = {str(item.get("id")): item for item in parsed if isinstance(item, dict)}
+    analyses = []
+    for utterance in utterances:
+        item = by_id.get(utterance["id"])
+        if item is None:
+            analyses.append(None)
+            continue
+        analyses.append({key: item.get(key, default) for key, default in FALLBACK_ANALYSIS.items()})
+    return analyses
+
+
+def _request_utterance_analysis(text, deadline=None):
     prompt = f"""
     You are an AI sales assistant. A customer just said: "{text}"
     
@@ -36,7 +271,7 @@ def analyze_customer_utterance(text):
     """
 
     payload = {
-        "model": "llama-3.1-8b-instant",
+        "model": UTTERANCE_MODEL,
         "messages": [
             {"role": "system", "content": "You are an AI sales assistant providing actionable advice."},
             {"role": "user", "content": prompt}
@@ -44,32 +279,45 @@ def analyze_customer_utterance(text):
         "temperature": 0.7
     }
 
-    try:
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {_get_groq_api_key()}",
-            "Content-Type": "application/json"
-        }
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        raw_output = result["choices"][0]["message"]["content"].strip()
-        parsed = json.loads(raw_output)
-        return {
-            "sentiment": parsed.get("sentiment", "neutral"),
-            "intent": parsed.get("intent", "unknown"),
-            "summary": parsed.get("summary", "No summary provided"),
-            "suggestion": parsed.get("suggestion", "Listen carefully and respond appropriately.")
-        }
+    with span("analysis_request"):
+        result = post_chat_completion(payload, timeout=CHAT_TIMEOUT, deadline=deadline)
+    raw_output = result["choices"][0]["message"]["content"].strip()
+    parsed = json.loads(raw_output)
+    return {
+        key: parsed.get(key, default) for key, default in FALLBACK_ANALYSIS.items()
+    }
 
-    except Exception as e:
-        print(f"Error analyzing customer utterance: {e}")
-        return {
-            "sentiment": "neutral",
-            "intent": "unknown",
-            "summary": "No summary provided",
-            "suggestion": "Listen carefully and respond appropriately."
-        }
+
+POST_CALL_DEFAULTS = {
+    "sentiment": "neutral",
+    "summary": "No summary available",
+    "customer_intent": "unknown",
+    "key_topics": [],
+    "objections": [],
+    "resolutions": [],
+    "next_steps": [],
+    "recommended_follow_up": "",
+    "win_risk": "medium",
+    "call_score": 7
+}
+# List fields of a rolling summary are capped so the state stays compact
+MAX_SUMMARY_LIST_ITEMS = 8
+
+POST_CALL_FORMAT = """
+    Respond ONLY in this EXACT JSON object with these keys:
+    {
+      "sentiment": "positive|neutral|negative",
+      "summary": "2-3 sentences on customer need and outcome",
+      "customer_intent": "short phrase of what customer wants",
+      "key_topics": ["topic1", "topic2", "topic3"],
+      "objections": ["if any, else empty"],
+      "resolutions": ["how objections were handled, else empty"],
+      "next_steps": ["clear next actions with owner/time if present"],
+      "recommended_follow_up": "what salesperson should do next",
+      "win_risk": "low|medium|high",
+      "call_score": 1-10
+    }
+    """
 
 
 def analyze_post_call_summary(transcript_text):
@@ -91,22 +339,58 @@ def analyze_post_call_summary(transcript_text):
     ---BEGIN TRANSCRIPT---
     {transcript_text}
     ---END TRANSCRIPT---
+    {POST_CALL_FORMAT}"""
 
-    Respond ONLY in this EXACT JSON object with these keys:
-    {{
-      "sentiment": "positive|neutral|negative",
-      "summary": "2-3 sentences on customer need and outcome",
-      "customer_intent": "short phrase of what customer wants",
-      "key_topics": ["topic1", "topic2", "topic3"],
-      "objections": ["if any, else empty"],
-      "resolutions": ["how objections were handled, else empty"],
-      "next_steps": ["clear next actions with owner/time if present"],
-      "recommended_follow_up": "what salesperson should do next",
-      "win_risk": "low|medium|high",
-      "call_score": 1-10
-    }}
+    try:
+        return _request_call_summary(prompt)
+    except Exception as e:
+        print(f"Error generating post-call summary: {e}")
+        return dict(POST_CALL_DEFAULTS)
+
+
+def fold_call_summary(summary, transcript_chunk):
     """
+    Update a structured call summary with the next part of the transcript.
+
+    ``summary`` covers everything said before ``transcript_chunk`` (None for
+    the first chunk). Raises on failure so the caller can retry the chunk.
+    """
+    if summary is None:
+        intro = "Analyze the opening of the call transcript below"
+        previous = ""
+    else:
+        intro = (
+            "Below is the structured summary of the call so far, followed by what was said next. "
+            "Return the updated summary for the WHOLE call so far"
+        )
+        previous = f"""
+    Summary so far:
+    {json.dumps(summary)}
+"""
+
+    prompt = f"""
+    You are an expert sales call summarizer. {intro} (customer and salesperson) and produce a concise, executive-ready summary for a CRM note.
 
+    Important rules:
+    - Focus on the CUSTOMER's needs, intents, objections, and decisions.
+    - Do NOT invent details not present in the transcript.
+    - Keep each field short and skimmable; merge duplicates and keep at most {MAX_SUMMARY_LIST_ITEMS} items per list.
+    - sentiment, win_risk and call_score describe the call as a whole, not just the latest part.
+    {previous}
+    Transcript:
+    ---BEGIN TRANSCRIPT---
+    {transcript_chunk}
+    ---END TRANSCRIPT---
+    {POST_CALL_FORMAT}"""
+
+    folded = _request_call_summary(prompt)
+    for key, default in POST_CALL_DEFAULTS.items():
+        if isinstance(default, list) and isinstance(folded[key], list):
+            folded[key] = folded[key][:MAX_SUMMARY_LIST_ITEMS]
+    return folded
+
+
+def _request_call_summary(prompt):
     payload = {
         "model": "llama-3.1-8b-instant",
         "messages": [
@@ -116,56 +400,24 @@ def analyze_post_call_summary(transcript_text):
         "temperature": 0.4
     }
 
+    with span("summary_request"):
+        result = post_chat_completion(payload, timeout=SUMMARY_TIMEOUT, policy="summary")
+    raw_output = result["choices"][0]["message"]["content"].strip()
+
     try:
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {_get_groq_api_key()}",
-            "Content-Type": "application/json"
-        }
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        raw_output = result["choices"][0]["message"]["content"].strip()
-
-        try:
-            parsed = json.loads(raw_output)
-        except json.JSONDecodeError:
-            if "```" in raw_output:
-                cleaned = raw_output.strip('`')
-                start = cleaned.find('{')
-                end = cleaned.rfind('}')
-                if start != -1 and end != -1 and end > start:
-                    parsed = json.loads(cleaned[start:end+1])
-                else:
-                    raise
+        parsed = json.loads(raw_output)
+    except json.JSONDecodeError:
+        if "```" in raw_output:
+            cleaned = raw_output.strip('`')
+            start = cleaned.find('{')
+            end = cleaned.rfind('}')
+            if start != -1 and end != -1 and end > start:
+                parsed = json.loads(cleaned[start:end+1])
             else:
                 raise
+        else:
+            raise
 
-        # Backward compatible defaults
-        return {
-            "sentiment": parsed.get("sentiment", "neutral"),
-            "summary": parsed.get("summary", "No summary provided"),
-            "customer_intent": parsed.get("customer_intent", "unknown"),
-            "key_topics": parsed.get("key_topics", []),
-            "objections": parsed.get("objections", []),
-            "resolutions": parsed.get("resolutions", []),
-            "next_steps": parsed.get("next_steps", []),
-            "recommended_follow_up": parsed.get("recommended_follow_up", ""),
-            "win_risk": parsed.get("win_risk", "medium"),
-            "call_score": parsed.get("call_score", 7)
-        }
-
-    except Exception as e:
-        print(f"Error generating post-call summary: {e}")
-        return {
-            "sentiment": "neutral",
-            "summary": "No summary available",
-            "customer_intent": "unknown",
-            "key_topics": [],
-            "objections": [],
-            "resolutions": [],
-            "next_steps": [],
-            "recommended_follow_up": "",
-            "win_risk": "medium",
-            "call_score": 7
-        }
+    # Backward compatible defaults
+    defaults = dict(POST_CALL_DEFAULTS, summary="No summary provided")
+    return {key: parsed.get(key, default) for key, default in defaults.items()}
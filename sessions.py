@@ -0,0 +1,123 @@
+# sessions.py
+import os
+import threading
+import time
+import uuid
+
+from live_channel import drop_channel
+from main import SalesCallPipeline
+from runtime_config import get_setting
+
+
+class SessionRegistry:
+    """
+    Keeps one SalesCallPipeline per call so concurrent agents on the same
+    server never share live state or output files.
+
+    Sessions without a running call are evicted once idle for
+    ``idle_ttl_sec``, and the least recently used one makes room when
+    ``max_sessions`` is reached; only running calls count against the limit.
+    """
+
+    def __init__(self, output_root=None, max_sessions=None, idle_ttl_sec=None):
+        self.output_root = output_root or get_setting("SESSION_OUTPUT_DIR", "sessions")
+        self.max_sessions = max_sessions or get_setting("MAX_SESSIONS", 200, int)
+        self.idle_ttl_sec = idle_ttl_sec or get_setting("SESSION_IDLE_TTL_SEC", 1800.0, float)
+        self._sessions = {}
+        self._last_used = {}
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def create(self, session_id=None, **pipeline_kwargs):
+        session_id = session_id or uuid.uuid4().hex
+        with self._lock:
+            if session_id in self._sessions:
+                self._last_used[session_id] = time.monotonic()
+                return self._sessions[session_id]
+            evicted = self._evict_idle_locked()
+            if len(self._sessions) >= self.max_sessions:
+                least_recent = self._least_recent_idle_locked()
+                if least_recent is None:
+                    raise RuntimeError(f"Session limit reached ({self.max_sessions} running calls).")
+                self._remove_locked(least_recent)
+                self.evicted += 1
+                evicted.append(least_recent)
+            pipeline = SalesCallPipeline(
+                session_id=session_id,
+                output_dir=os.path.join(self.output_root, session_id),
+                **pipeline_kwargs,
+            )
+            self._sessions[session_id] = pipeline
+            self._last_used[session_id] = time.monotonic()
+        for evicted_id in evicted:
+            drop_channel(evicted_id)
+        return pipeline
+
+    def get(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def touch(self, session_id):
+        """Mark a session as used; returns False if it is no longer registered."""
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._last_used[session_id] = time.monotonic()
+            return True
+
+    def close(self, session_id, wait_for_finalize=True, timeout=30):
+        with self._lock:
+            pipeline = self._remove_locked(session_id)
+        if pipeline is None:
+            return
+        if pipeline.is_running():
+            pipeline.stop(wait_for_finalize=wait_for_finalize, timeout=timeout)
+        drop_channel(session_id)
+
+    def _remove_locked(self, session_id):
+        self._last_used.pop(session_id, None)
+        return self._sessions.pop(session_id, None)
+
+    def _evict_idle_locked(self):
+        cutoff = time.monotonic() - self.idle_ttl_sec
+        expired = [
+            session_id
+            for session_id, used in self._last_used.items()
+            if used < cutoff and not self._sessions[session_id].is_running()
+        ]
+        for session_id in expired:
+            self._remove_locked(session_id)
+        self.evicted += len(expired)
+        return expired
+
+    def _least_recent_idle_locked(self):
+        idle = [session_id for session_id, pipeline in self._sessions.items() if not pipeline.is_running()]
+        if not idle:
+            return None
+        return min(idle, key=self._last_used.__getitem__)
+
+    def session_ids(self):
+        with self._lock:
+            return list(self._sessions)
+
+    def stage_metrics(self):
+        """Per-session stage timing histograms, keyed by session id."""
+        with self._lock:
+            return {session_id: pipeline.metrics for session_id, pipeline in self._sessions.items()}
+
+    def capture_stats(self):
+        """Per-session audio capture stats, keyed by session id."""
+        with self._lock:
+            pipelines = dict(self._sessions)
+        return {session_id: pipeline.capture_stats() for session_id, pipeline in pipelines.items()}
+
+    def running_count(self):
+        with self._lock:
+            return sum(1 for pipeline in self._sessions.values() if pipeline.is_running())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+registry = SessionRegistry()
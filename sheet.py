@@ -1,18 +1,39 @@
 # sheet.py
+from collections import deque
 from datetime import datetime
+from itertools import islice
+import json
 import os
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+import threading
+import time
 import re
 
-from runtime_config import get_service_account_credentials
+try:
+    import fcntl
+except ImportError:  # Windows: the spool is not locked against other processes
+    fcntl = None
+
+from runtime_config import get_service_account_credentials, get_setting
 
 HEADERS = ["Timestamp", "Customer Name", "Full Transcript", "Overall Sentiment", "Overall Customer Summary"]
 
-def get_sheet(sheet_name="Speech_Analysis", creds_file="credentials.json"):
-    """
-    Connect to Google Sheet and ensure headers exist.
-    """
+# Google Sheets rejects a cell over 50,000 characters
+MAX_CELL_CHARS = 50000
+TRUNCATION_MARK = " [truncated]"
+
+# Delivered rows are cut from the front of the spool once they take this much
+SPOOL_COMPACT_BYTES = 1 << 20
+
+_client = None
+_sheets = {}
+_sheet_lock = threading.Lock()
+
+
+def _authorize(creds_file):
+    # gspread/oauth2client are only needed once a row is written, not at import time
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
     scope = [
         "https://spreadsheets.google.com/feeds",
         "https://www.googleapis.com/auth/drive"
@@ -27,27 +48,393 @@ def get_sheet(sheet_name="Speech_Analysis", creds_file="credentials.json"):
             )
         service_account = dict(service_account)
         creds = ServiceAccountCredentials.from_json_keyfile_dict(service_account, scope)
-    client = gspread.authorize(creds)
-    sheet = client.open(sheet_name).sheet1
-    ensure_headers(sheet)
-    return sheet
+    return gspread.authorize(creds)
+
+
+def get_sheet(sheet_name="Speech_Analysis", creds_file="credentials.json"):
+    """
+    Connect to Google Sheet and ensure headers exist.
+
+    The authorized client and each opened worksheet are kept for the life of
+    the process; headers are checked once per worksheet.
+    """
+    global _client
+    with _sheet_lock:
+        sheet = _sheets.get(sheet_name)
+        if sheet is None:
+            if _client is None:
+                _client = _authorize(creds_file)
+            sheet = _client.open(sheet_name).sheet1
+            ensure_headers(sheet)
+            _sheets[sheet_name] = sheet
+        return sheet
+
+
+def reset_sheet_cache():
+    """Drop the cached client and worksheets, e.g. after credentials change."""
+    global _client
+    with _sheet_lock:
+        _client = None
+        _sheets.clear()
+
 
 def ensure_headers(sheet):
     """
-    Ensure the sheet has proper headers.
+    Ensure the sheet has proper headers. Only row 1 is read.
     """
-    all_values = sheet.get_all_values()
-    if not all_values or all_values[0] != HEADERS:
+    if sheet.row_values(1) != HEADERS:
         sheet.insert_row(HEADERS, 1, value_input_option='RAW')
 
+
+def build_summary_row(customer_name, transcript, sentiment, summary):
+    timestamp = datetime.now().isoformat()
+    return [timestamp, customer_name, transcript, sentiment, summary]
+
+
 def save_post_call_summary(sheet, customer_name, transcript, sentiment, summary):
     """
     Append the post-call summary row to Google Sheet.
     """
-    timestamp = datetime.now().isoformat()
-    row = [timestamp, customer_name, transcript, sentiment, summary]
+    row = build_summary_row(customer_name, transcript, sentiment, summary)
     sheet.append_row(row, value_input_option='RAW')
 
+
+def fit_cell(value):
+    """Truncate a string cell to what Google Sheets accepts."""
+    if isinstance(value, str) and len(value) > MAX_CELL_CHARS:
+        return value[: MAX_CELL_CHARS - len(TRUNCATION_MARK)] + TRUNCATION_MARK
+    return value
+
+
+def is_transient_error(error):
+    """
+    True for errors worth retrying: quota (429), timeouts (408), server
+    errors (5xx) and transport failures. Any other API error means the
+    request itself was rejected and would fail again.
+    """
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        status = getattr(error, "code", None)
+    if isinstance(status, int) and status > 0:
+        return status in (408, 429) or status >= 500
+    # No HTTP status: socket, DNS, TLS and requests errors are all OSErrors
+    return isinstance(error, OSError)
+
+
+class SheetWriter:
+    """
+    Background writer that appends rows to a worksheet in batches.
+
+    Rows are first appended to a local JSON-lines spool (fsynced), then sent
+    with ``append_rows``. Pending rows are kept in memory, loaded from the
+    spool once at startup; a small ``<spool>.offset`` file records how many
+    bytes at the front of the spool have been delivered, and the spool is
+    truncated when it drains or compacted once SPOOL_COMPACT_BYTES of it are
+    delivered. Rows left in the spool by a crash or by transient errors
+    (quota, server, transport) are sent on the next attempt, retried with
+    exponential backoff. Delivery is at-least-once: a crash between a
+    successful append and the offset update re-sends that batch.
+
+    A batch the API rejects outright is re-sent one row at a time, and a row
+    rejected on its own is moved to ``dead_letter_path`` so it cannot hold
+    back the rows after it.
+
+    A spool belongs to one process and is locked while the writer is open.
+    If ``spool_path`` is locked by another process, the writer takes the
+    first free ``<name>.<n>.jsonl`` next to it instead, so several server
+    processes can share one SHEET_SPOOL_PATH, and a dead process's rows are
+    delivered by the next writer that takes its spool.
+    """
+
+    def __init__(
+        self,
+        get_worksheet=get_sheet,
+        spool_path="sheet_spool.jsonl",
+        batch_size=50,
+        flush_interval_sec=2.0,
+        max_backoff_sec=300.0,
+        dead_letter_path=None,
+    ):
+        self.get_worksheet = get_worksheet
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_sec = float(flush_interval_sec)
+        self.max_backoff_sec = float(max_backoff_sec)
+        self._spool_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._idle = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._isolate_rows = 0
+        # (row, spool line length in bytes) for every row not yet delivered
+        self._pending = deque()
+        self._committed_bytes = 0
+        self._spool_bytes = 0
+
+        self.rows_queued = 0
+        self.rows_written = 0
+        self.rows_rejected = 0
+        self.batches_written = 0
+        self.failures = 0
+
+        directory = os.path.dirname(os.path.abspath(spool_path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file, self.spool_path = self._lock_spool(spool_path)
+        self.offset_path = f"{self.spool_path}.offset"
+        self.dead_letter_path = dead_letter_path or f"{os.path.splitext(self.spool_path)[0]}.rejected.jsonl"
+        self._recover_spool()
+
+    # ------------------- Producer side -------------------
+    def enqueue(self, row):
+        """Durably record ``row`` and return without waiting for the API."""
+        row = [fit_cell(value) for value in row]
+        line = (json.dumps(row) + "\n").encode("utf-8")
+        with self._spool_lock:
+            with open(self.spool_path, "ab") as file_handle:
+                file_handle.write(line)
+                file_handle.flush()
+                os.fsync(file_handle.fileno())
+            self._pending.append((row, len(line)))
+            self._spool_bytes += len(line)
+            self.rows_queued += 1
+        self.start()
+        self._wakeup.set()
+
+    def pending(self):
+        with self._spool_lock:
+            return len(self._pending)
+
+    def flush(self, timeout=None):
+        """Wait until every spooled row has been written; returns True if so."""
+        self.start()
+        self._wakeup.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self.pending():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._spool_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stop.clear()
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+        return self
+
+    def close(self, timeout=10.0):
+        """Try to deliver what is spooled, then stop; undelivered rows stay on disk."""
+        self.flush(timeout)
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def stats(self):
+        return {
+            "rows_queued": self.rows_queued,
+            "rows_written": self.rows_written,
+            "rows_rejected": self.rows_rejected,
+            "batches_written": self.batches_written,
+            "failures": self.failures,
+            "pending": self.pending(),
+        }
+
+    # ------------------- Writer thread -------------------
+    def _run(self):
+        backoff = min(1.0, self.max_backoff_sec)
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            with self._spool_lock:
+                size = 1 if self._isolate_rows else self.batch_size
+                batch = [row for row, _ in islice(self._pending, size)]
+
+            if not batch:
+                self._wakeup.wait(self.flush_interval_sec)
+                continue
+
+            try:
+                # Authorization and opening the sheet are retried whatever the error
+                worksheet = self.get_worksheet()
+            except Exception as e:
+                self._retry_later(backoff, f"Opening the worksheet failed: {e}")
+                backoff = min(backoff * 2, self.max_backoff_sec)
+                continue
+
+            try:
+                worksheet.append_rows(batch, value_input_option='RAW')
+            except Exception as e:
+                if is_transient_error(e):
+                    self._retry_later(backoff, f"Append of {len(batch)} rows failed: {e}")
+                    backoff = min(backoff * 2, self.max_backoff_sec)
+                elif len(batch) > 1:
+                    # Find the rejected row(s) by sending the batch one row at a time
+                    self.failures += 1
+                    self._isolate_rows = len(batch)
+                    print(f"[Sheets] Append of {len(batch)} rows rejected, retrying row by row: {e}")
+                else:
+                    self.failures += 1
+                    self._reject(batch[0], e)
+                continue
+
+            backoff = min(1.0, self.max_backoff_sec)
+            self._drop_spooled(len(batch))
+            self._isolate_rows = max(0, self._isolate_rows - len(batch))
+            self.rows_written += len(batch)
+            self.batches_written += 1
+
+    def _retry_later(self, backoff, message):
+        self.failures += 1
+        print(f"[Sheets] {message}; retrying in {backoff:.1f}s")
+        self._stop.wait(backoff)
+
+    def _reject(self, row, error):
+        """Move a row the API will never accept from the spool to the dead-letter file."""
+        line = json.dumps({"row": row, "error": str(error), "rejected_at": datetime.now().isoformat()}) + "\n"
+        with self._spool_lock:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as file_handle:
+                file_handle.write(line)
+                file_handle.flush()
+                os.fsync(file_handle.fileno())
+        self._drop_spooled(1)
+        self._isolate_rows = max(0, self._isolate_rows - 1)
+        self.rows_rejected += 1
+        print(f"[Sheets] Row rejected, moved to {self.dead_letter_path}: {error}")
+
+    # ------------------- Spool file -------------------
+    def _lock_spool(self, spool_path):
+        """Lock ``spool_path``, or the first free suffixed path if another process holds it."""
+        if fcntl is None:
+            return None, spool_path
+        base, extension = os.path.splitext(spool_path)
+        for attempt in range(64):
+            path = spool_path if attempt == 0 else f"{base}.{attempt}{extension}"
+            lock_file = open(f"{path}.lock", "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+            if attempt:
+                print(f"[Sheets] Spool {spool_path} is in use by another process; using {path}")
+            return lock_file, path
+        raise RuntimeError(f"No free sheet spool next to {spool_path}")
+
+    def _recover_spool(self):
+        """
+        Load the undelivered rows, dropping a torn or corrupt line left by a
+        crash, and compact the spool so it holds only those rows.
+        """
+        if not os.path.exists(self.spool_path):
+            self._write_offset(0)
+            return
+        with open(self.spool_path, "rb") as file_handle:
+            data = file_handle.read()
+        offset = self._read_offset()
+        if offset > len(data):
+            # The spool was truncated or compacted after the offset was written
+            offset = 0
+        lines = data[offset:].splitlines(keepends=True)
+        valid = [line for line in lines if line.endswith(b"\n") and _is_row(line)]
+        if len(valid) != len(lines):
+            print(f"[Sheets] Dropped {len(lines) - len(valid)} unreadable spool line(s)")
+        if offset or len(valid) != len(lines):
+            self._rewrite_spool(valid)
+        self._pending.extend((json.loads(line), len(line)) for line in valid)
+        self._spool_bytes = sum(len(line) for line in valid)
+
+    def _drop_spooled(self, count):
+        """Mark the first ``count`` pending rows delivered (or dead-lettered)."""
+        with self._spool_lock:
+            for _ in range(count):
+                _, size = self._pending.popleft()
+                self._committed_bytes += size
+            if not self._pending:
+                with open(self.spool_path, "wb") as file_handle:
+                    os.fsync(file_handle.fileno())
+                self._committed_bytes = self._spool_bytes = 0
+                self._write_offset(0)
+            elif self._committed_bytes >= SPOOL_COMPACT_BYTES and 2 * self._committed_bytes >= self._spool_bytes:
+                with open(self.spool_path, "rb") as file_handle:
+                    file_handle.seek(self._committed_bytes)
+                    remaining = file_handle.read()
+                self._rewrite_spool([remaining])
+                self._spool_bytes -= self._committed_bytes
+                self._committed_bytes = 0
+            else:
+                self._write_offset(self._committed_bytes)
+            drained = not self._pending
+        if drained:
+            with self._idle:
+                self._idle.notify_all()
+
+    def _rewrite_spool(self, chunks):
+        temp_path = f"{self.spool_path}.tmp"
+        with open(temp_path, "wb") as file_handle:
+            file_handle.writelines(chunks)
+            file_handle.flush()
+            os.fsync(file_handle.fileno())
+        # Reset the offset first: a crash in between re-sends rows instead of skipping them
+        self._write_offset(0)
+        os.replace(temp_path, self.spool_path)
+
+    def _read_offset(self):
+        try:
+            with open(self.offset_path, "r", encoding="utf-8") as file_handle:
+                return max(0, int(file_handle.read().strip() or 0))
+        except (OSError, ValueError):
+            return 0
+
+    def _write_offset(self, offset):
+        temp_path = f"{self.offset_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file_handle:
+            file_handle.write(str(offset))
+            file_handle.flush()
+            os.fsync(file_handle.fileno())
+        os.replace(temp_path, self.offset_path)
+
+
+def _is_row(line):
+    try:
+        return isinstance(json.loads(line), list)
+    except ValueError:
+        return False
+
+
+_writer = None
+
+
+def get_sheet_writer():
+    """
+    Process-wide background writer for post-call rows. Configured with
+    SHEET_SPOOL_PATH, SHEET_BATCH_SIZE and SHEET_FLUSH_INTERVAL_SEC. A
+    process that finds the spool locked by another uses a suffixed one.
+    """
+    global _writer
+    with _sheet_lock:
+        if _writer is None:
+            _writer = SheetWriter(
+                spool_path=get_setting("SHEET_SPOOL_PATH", "sheet_spool.jsonl"),
+                batch_size=get_setting("SHEET_BATCH_SIZE", 50, int),
+                flush_interval_sec=get_setting("SHEET_FLUSH_INTERVAL_SEC", 2.0, float),
+            ).start()
+        return _writer
+
+
+def queue_post_call_summary(customer_name, transcript, sentiment, summary):
+    """
+    Queue the post-call summary row for the background writer.
+    """
+    get_sheet_writer().enqueue(build_summary_row(customer_name, transcript, sentiment, summary))
+
+
 def extract_customer_name(transcript):
     """
     Extract customer name from transcript using common patterns.
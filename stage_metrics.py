@@ -0,0 +1,256 @@
+# stage_metrics.py
+import bisect
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from runtime_config import get_setting
+
+# Geometric bucket bounds from 0.1 ms to ~50 s (x1.25 per bucket), so
+# interpolated percentiles are within about 12% of the true value.
+BUCKETS = tuple(0.0001 * 1.25 ** index for index in range(60))
+
+METRIC_NAME = "sales_call_stage_seconds"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; ``observe`` is a bisect and a few adds under a lock."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q):
+        with self._lock:
+            counts = list(self.counts)
+            count = self.count
+            maximum = self.max
+        if count == 0:
+            return None
+        target = q * count
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count and cumulative + bucket_count >= target:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else maximum
+                value = lower + (upper - lower) * (target - cumulative) / bucket_count
+                return min(value, maximum)
+            cumulative += bucket_count
+        return maximum
+
+    def snapshot(self):
+        with self._lock:
+            count = self.count
+            total = self.sum
+            maximum = self.max
+        return {
+            "count": count,
+            "sum_sec": round(total, 6),
+            "mean_ms": round(total / count * 1000, 3) if count else None,
+            "p50_ms": _ms(self.quantile(0.50)),
+            "p95_ms": _ms(self.quantile(0.95)),
+            "p99_ms": _ms(self.quantile(0.99)),
+            "max_ms": _ms(maximum) if count else None,
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+class StageMetrics:
+    """One histogram per named stage."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, Histogram())
+        histogram.observe(seconds)
+
+    def histograms(self):
+        with self._lock:
+            return dict(self._histograms)
+
+    def snapshot(self):
+        return {stage: histogram.snapshot() for stage, histogram in sorted(self.histograms().items())}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+_process_metrics = StageMetrics()
+_session_metrics = contextvars.ContextVar("session_metrics", default=None)
+
+
+def get_process_metrics():
+    return _process_metrics
+
+
+def record(stage, seconds, session=None):
+    """Add one timing to the process-wide histograms and to the session's, if any."""
+    _process_metrics.observe(stage, seconds)
+    session = session or _session_metrics.get()
+    if session is not None:
+        session.observe(stage, seconds)
+
+
+class span:
+    """Time the enclosed block as ``stage``, whether or not it raises."""
+
+    __slots__ = ("stage", "session", "started")
+
+    def __init__(self, stage, session=None):
+        self.stage = stage
+        self.session = session
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.stage, time.perf_counter() - self.started, self.session)
+        return False
+
+
+@contextmanager
+def session_scope(metrics):
+    """
+    Attribute spans recorded in this thread to ``metrics`` (a session's
+    StageMetrics) as well, e.g. timings taken deep inside whisper_model.
+    """
+    token = _session_metrics.set(metrics)
+    try:
+        yield
+    finally:
+        _session_metrics.reset(token)
+
+
+def snapshot(sessions=None, capture=None):
+    """
+    JSON-ready p50/p95/p99 per stage, process-wide and for each
+    ``{session_id: StageMetrics}`` in ``sessions``, with the counters of the
+    components those stages run through (see ``component_stats``) and the
+    ``{session_id: capture_stats}`` in ``capture``.
+    """
+    return {
+        "process": _process_metrics.snapshot(),
+        "sessions": {session_id: metrics.snapshot() for session_id, metrics in (sessions or {}).items()},
+        "capture": capture or {},
+        **component_stats(),
+    }
+
+
+def component_stats():
+    """
+    Retry/hedge/breaker metrics per call policy, HTTP connection reuse, the
+    analysis caches by namespace, and the batcher (None until first used).
+    Imported here rather than at module level because those modules record
+    into this one.
+    """
+    from analysis_cache import get_cache_stats
+    from call_policy import get_policy_metrics
+    from groq_client import get_connection_stats
+    from sentiment import get_batcher_stats
+
+    return {
+        "policies": get_policy_metrics(),
+        "connections": get_connection_stats(),
+        "analysis_cache": get_cache_stats(),
+        "analysis_batcher": get_batcher_stats(),
+    }
+
+
+def render_prometheus(metrics=None):
+    """Process-wide histograms in the Prometheus text exposition format."""
+    metrics = metrics or _process_metrics
+    lines = [
+        f"# HELP {METRIC_NAME} Time spent in each sales call pipeline stage.",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    for stage, histogram in sorted(metrics.histograms().items()):
+        with histogram._lock:
+            counts = list(histogram.counts)
+            count = histogram.count
+            total = histogram.sum
+        cumulative = 0
+        for bound, bucket_count in zip(histogram.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="{bound:.6g}"}} {cumulative}')
+        lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+        lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {total:.6f}')
+        lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, sessions=None, capture=None):
+    """
+    Serve ``/metrics`` (Prometheus text, process-wide) and ``/metrics.json``
+    (snapshot including sessions) on ``port``, default METRICS_PORT; unset
+    means off. ``sessions`` is a callable returning ``{session_id: StageMetrics}``
+    and ``capture`` one returning ``{session_id: capture_stats}``.
+    Started at most once per process.
+    """
+    global _server
+    port = port if port is not None else get_setting("METRICS_PORT", None, int)
+    if not port:
+        return None
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/metrics":
+                body = render_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4"
+            elif path == "/metrics.json":
+                body = json.dumps(
+                    snapshot(sessions() if sessions else None, capture() if capture else None)
+                ).encode("utf-8")
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+            except OSError as error:
+                print(f"[Metrics] Could not listen on port {port}: {error}")
+                return None
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+            print(f"[Metrics] Serving /metrics and /metrics.json on port {port}")
+        return _server
@@ -0,0 +1,81 @@
+"""
+MicroBatcher: items are sent together, fallbacks for a failed batch run
+concurrently with each item's own deadline, and a closed batcher refuses
+new items instead of returning futures that never resolve.
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_batcher import MicroBatcher  # noqa: E402
+from call_policy import Deadline  # noqa: E402
+
+
+class FakeRequests:
+    def __init__(self, fail_batch=False, single_sec=0.0):
+        self.fail_batch = fail_batch
+        self.single_sec = single_sec
+        self.batches = []
+        self.singles = []
+        self._lock = threading.Lock()
+
+    def batch(self, items, deadline=None):
+        with self._lock:
+            self.batches.append((list(items), deadline))
+        if self.fail_batch:
+            raise ValueError("unparseable reply")
+        # The reply leaves out the last item
+        return [item.upper() for item in items[:-1]] + [None]
+
+    def one(self, item, deadline=None):
+        with self._lock:
+            self.singles.append((item, deadline))
+        time.sleep(self.single_sec)
+        return item.upper()
+
+
+def test_batch_answers_and_missing_entries_retried_singly():
+    requests = FakeRequests()
+    batcher = MicroBatcher(requests.batch, requests.one, max_batch=4, max_wait_sec=1.0)
+    try:
+        futures = [batcher.submit(item) for item in ["a", "b", "c", "d"]]
+        assert [future.result(timeout=5) for future in futures] == ["A", "B", "C", "D"]
+    finally:
+        batcher.close()
+    assert [items for items, _ in requests.batches] == [["a", "b", "c", "d"]]
+    assert [item for item, _ in requests.singles] == ["d"]
+
+
+def test_batch_gets_earliest_deadline_and_fallbacks_run_concurrently():
+    requests = FakeRequests(fail_batch=True, single_sec=0.3)
+    batcher = MicroBatcher(requests.batch, requests.one, max_batch=8, max_wait_sec=1.0, max_in_flight=8)
+    deadlines = [Deadline(10 + index) for index in range(8)]
+    try:
+        futures = [batcher.submit(f"item-{index}", deadline) for index, deadline in enumerate(deadlines)]
+        started = time.monotonic()
+        results = [future.result(timeout=5) for future in futures]
+        elapsed = time.monotonic() - started
+    finally:
+        batcher.close()
+    assert results == [f"ITEM-{index}" for index in range(8)]
+    assert requests.batches[0][1] is deadlines[0]
+    assert {item: deadline for item, deadline in requests.singles} == {
+        f"item-{index}": deadline for index, deadline in enumerate(deadlines)
+    }
+    # Eight sequential fallbacks would take 2.4 s
+    assert elapsed < 1.5
+
+
+def test_close_answers_pending_items_then_refuses_new_ones():
+    requests = FakeRequests(fail_batch=True)
+    batcher = MicroBatcher(requests.batch, requests.one, max_batch=8, max_wait_sec=5.0)
+    futures = [batcher.submit(item) for item in ["a", "b"]]
+    batcher.close()
+    assert [future.result(timeout=0) for future in futures] == ["A", "B"]
+    with pytest.raises(RuntimeError):
+        batcher.submit("c")
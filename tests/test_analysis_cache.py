@@ -0,0 +1,42 @@
+"""
+AnalysisCache: utterances too long to cache are counted apart from lookups
+the caller skipped, and each namespace gets its own process-wide cache.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analysis_cache  # noqa: E402
+from analysis_cache import AnalysisCache  # noqa: E402
+
+ANALYSIS = {"sentiment": "neutral", "intent": "pricing", "summary": "", "suggestion": ""}
+
+
+def test_uncacheable_counted_apart_from_bypass():
+    cache = AnalysisCache(max_words=3)
+    cache.put("Um, okay... go on!", ANALYSIS)
+    assert cache.get("okay go on") == ANALYSIS
+    assert cache.get("what does the premium plan cost") is None
+    assert cache.get("...") is None
+    cache.note_bypass()
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 0)
+    assert stats["uncacheable"] == 2
+    assert stats["bypassed"] == 1
+    assert stats["hit_rate"] == 1.0
+
+
+def test_one_cache_per_namespace(monkeypatch):
+    monkeypatch.setattr(analysis_cache, "_caches", {})
+    monkeypatch.delenv("ANALYSIS_CACHE_PATH", raising=False)
+    monkeypatch.setenv("ANALYSIS_CACHE_SIZE", "10")
+    old = analysis_cache.get_analysis_cache("model/v1")
+    new = analysis_cache.get_analysis_cache("model/v2")
+    assert old is analysis_cache.get_analysis_cache("model/v1")
+    assert new is not old and new.namespace == "model/v2"
+
+    old.put("go on", ANALYSIS)
+    assert new.get("go on") is None
+    assert set(analysis_cache.get_cache_stats()) == {"model/v1", "model/v2"}
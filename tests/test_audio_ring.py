@@ -0,0 +1,43 @@
+"""
+AudioRingBuffer: overload drops are counted, writes with no call attached
+(before allocate() or after release()) are ignored rather than counted.
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_ring import AudioRingBuffer  # noqa: E402
+
+
+def test_overflow_counts_dropped_samples():
+    ring = AudioRingBuffer(100)
+    assert ring.write(np.ones(150, dtype=np.float32)) == 100
+    assert ring.dropped_samples == 50
+    assert ring.overflow_events == 1
+
+
+def test_writes_without_storage_are_not_drops():
+    ring = AudioRingBuffer(100, allocate=False)
+    assert ring.write(np.ones(80, dtype=np.float32)) == 0
+    ring.allocate()
+    ring.write(np.ones(60, dtype=np.float32))
+    ring.release()
+    assert ring.write(np.ones(80, dtype=np.float32)) == 0
+    assert ring.stats()["dropped_samples"] == 0
+    assert ring.overflow_events == 0
+    assert ring.empty()
+
+
+def test_clear_after_allocate_discards_stale_audio():
+    ring = AudioRingBuffer(100)
+    ring.write(np.ones(40, dtype=np.float32))
+    ring.release()
+    ring.allocate()
+    ring.clear()
+    assert ring.empty()
+    out = np.empty(10, dtype=np.float32)
+    ring.write(np.full(10, 2.0, dtype=np.float32))
+    assert ring.read_into(out) == 10 and (out == 2.0).all()
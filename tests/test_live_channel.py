@@ -0,0 +1,44 @@
+"""
+FileLiveChannel: a channel opened on an existing directory (a restart, or
+another process tailing it) continues the sequence numbers on disk.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from live_channel import TRANSCRIPT_FILE, FileLiveChannel, _last_line  # noqa: E402
+
+
+def publish_call(channel, segments):
+    for index in range(segments):
+        channel.publish_segment(f"10:00:{index:02d}", f"utterance {index}", "Ask about budget", index + 1)
+    channel.publish_status("Positive", "Wants a quote", "Offer the team tier")
+
+
+def test_reopened_channel_continues_sequence(tmp_path):
+    first = FileLiveChannel("call", str(tmp_path))
+    publish_call(first, 5)
+    assert first.last_seq == 6
+
+    reopened = FileLiveChannel("call", str(tmp_path))
+    assert reopened.last_seq == 6
+    assert reopened.publish_segment("10:01:00", "one more", "Close", 6) == 7
+    assert [event["seq"] for event in reopened.events_since(0)] == list(range(1, 8))
+
+
+def test_reader_in_another_process_sees_new_events(tmp_path):
+    writer = FileLiveChannel("call", str(tmp_path))
+    reader = FileLiveChannel("call", str(tmp_path))
+    assert reader.last_seq == 0
+    publish_call(writer, 3)
+    assert reader.last_seq == 4
+    assert [event["seq"] for event in reader.events_since(2)] == [3, 4]
+
+
+def test_last_line_skips_unfinished_line_and_long_lines(tmp_path):
+    path = str(tmp_path / TRANSCRIPT_FILE)
+    assert _last_line(path) is None
+    with open(path, "wb") as file_handle:
+        file_handle.write(b"first\n" + b"x" * 10000 + b"\n" + b'{"seq": 9')
+    assert _last_line(path, block=64) == b"x" * 10000
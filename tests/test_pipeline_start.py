@@ -0,0 +1,45 @@
+"""
+SalesCallPipeline.start: a new call starts from a clean voice activity
+detector, not from the speech/hangover state the previous call ended in.
+"""
+import contextlib
+import io
+import os
+import sys
+from concurrent.futures import Future
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio import SpectralVAD  # noqa: E402
+from main import SalesCallPipeline  # noqa: E402
+
+
+class SilentPool:
+    """Stands in for the transcription pool; every utterance transcribes to nothing."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result("")
+        return future
+
+
+def test_start_resets_the_voice_activity_detector(tmp_path):
+    vad = SpectralVAD()
+    pipeline = SalesCallPipeline(output_dir=str(tmp_path), transcription_pool=SilentPool(), vad=vad)
+    # As a call that was hung up mid-sentence leaves it
+    vad._speaking = True
+    vad._speech_run = 7
+    vad._hold = 10
+    vad._recent_rms[:] = 0.5
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline.start()
+        try:
+            assert not vad._speaking
+            assert vad._speech_run == 0
+            assert vad._hold == 0
+            assert np.isinf(vad._recent_rms).all()
+        finally:
+            pipeline.stop(wait_for_finalize=True, timeout=10)
@@ -0,0 +1,51 @@
+"""
+prewarm: a once-per-process task is retried after it fails, and is not
+started again while another call is still running it.
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import prewarm  # noqa: E402
+
+
+def use_tasks(monkeypatch, *tasks):
+    monkeypatch.setattr(prewarm, "TASKS", tasks)
+    monkeypatch.setattr(prewarm, "_warmed", set())
+    monkeypatch.setattr(prewarm, "_warming", set())
+
+
+def test_failed_once_task_retried_until_it_succeeds(monkeypatch):
+    attempts = []
+
+    def load_crm():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionResetError("reset by peer")
+
+    use_tasks(monkeypatch, ("crm", load_crm, True))
+    assert prewarm.prewarm()["crm"].startswith("error")
+    assert isinstance(prewarm.prewarm()["crm"], float)
+    assert prewarm.prewarm() == {}
+    assert len(attempts) == 2
+
+
+def test_once_task_not_run_twice_concurrently(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    attempts = []
+
+    def authorize_sheets():
+        attempts.append(1)
+        started.set()
+        release.wait(5)
+
+    use_tasks(monkeypatch, ("sheets", authorize_sheets, True))
+    first = threading.Thread(target=prewarm.prewarm)
+    first.start()
+    assert started.wait(5)
+    assert prewarm.prewarm() == {}
+    release.set()
+    first.join()
+    assert len(attempts) == 1
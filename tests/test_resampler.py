@@ -0,0 +1,56 @@
+"""
+PolyphaseResampler: streaming output matches one-shot resampling whatever
+the frame sizes, and a steady stream of frames allocates no sample data.
+"""
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resampler import PolyphaseResampler  # noqa: E402
+
+TARGET_RATE = 16000
+
+
+def stream(resampler, signal, frame_sizes):
+    chunks, offset, index = [], 0, 0
+    while offset < signal.size:
+        size = frame_sizes[index % len(frame_sizes)]
+        chunks.append(np.array(resampler.process(signal[offset : offset + size]), copy=True))
+        offset += size
+        index += 1
+    return np.concatenate(chunks)
+
+
+@pytest.mark.parametrize("source_rate", [48000, 44100, 32000, 22050, 8000])
+def test_streaming_matches_one_shot(source_rate):
+    signal = np.random.default_rng(0).standard_normal(source_rate).astype(np.float32)
+    whole = np.array(PolyphaseResampler(source_rate, TARGET_RATE).process(signal))
+    streamed = stream(PolyphaseResampler(source_rate, TARGET_RATE), signal, [960, 882, 441, 1, 0, 3000, 7])
+    assert whole.size == streamed.size == -(-signal.size * TARGET_RATE // source_rate)
+    np.testing.assert_array_equal(streamed, whole)
+
+
+@pytest.mark.parametrize("source_rate", [48000, 44100])
+def test_frames_allocate_no_sample_data(source_rate):
+    resampler = PolyphaseResampler(source_rate, TARGET_RATE)
+    frame = np.random.default_rng(1).standard_normal(source_rate // 50).astype(np.float32)
+    for _ in range(5):
+        resampler.process(frame)
+
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(50):
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            resampler.process(frame)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    # A few array views; gathering the windows would take outputs x taps x 4 bytes (~190 KB)
+    assert max(peaks) < 8192
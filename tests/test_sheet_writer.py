@@ -0,0 +1,248 @@
+"""
+SheetWriter against an in-memory fake of the gspread worksheet: cached
+authorization, the row-1 header check, ordering through quota errors,
+replay of the spool after a restart without re-sending delivered rows,
+dead-lettering of rows the API rejects, and one spool per process.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sheet  # noqa: E402
+
+
+class FakeAPIError(Exception):
+    """Shaped like gspread.exceptions.APIError: the HTTP response is on ``response``."""
+
+    def __init__(self, status, message):
+        super().__init__(f"[{status}]: {message}")
+        self.response = SimpleNamespace(status_code=status)
+
+
+class FakeWorksheet:
+    """The subset of gspread.Worksheet the app uses."""
+
+    def __init__(self, rows=None, fail_every=0, fail_status=429, reject=None):
+        self.rows = [list(row) for row in rows or []]
+        self.fail_every = fail_every
+        self.fail_status = fail_status
+        self.reject = reject
+        self.requests = 0
+        self.cells_read = 0
+        self.append_calls = 0
+        self._lock = threading.Lock()
+
+    def _request(self, cells_read=0):
+        with self._lock:
+            self.requests += 1
+            self.cells_read += cells_read
+            failing = self.fail_every and self.requests % self.fail_every == 0
+        if failing:
+            raise FakeAPIError(self.fail_status, "Quota exceeded for quota metric 'Write requests'")
+
+    def row_values(self, row):
+        values = self.rows[row - 1] if len(self.rows) >= row else []
+        self._request(len(values))
+        return list(values)
+
+    def insert_row(self, values, index=1, value_input_option=None):
+        self._request()
+        self.rows.insert(index - 1, list(values))
+
+    def append_rows(self, values, value_input_option=None):
+        self._request()
+        if self.reject and any(self.reject(row) for row in values):
+            raise FakeAPIError(400, "Your input contains more than the maximum of 50000 characters in a single cell.")
+        with self._lock:
+            self.append_calls += 1
+            self.rows.extend(list(row) for row in values)
+
+
+class FakeClient:
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+
+    def open(self, name):
+        return SimpleNamespace(sheet1=self.worksheet)
+
+
+def rows(count, prefix):
+    return [[f"{prefix}-{index}", "Customer", "transcript", "neutral", "summary"] for index in range(count)]
+
+
+def crash(writer):
+    """Stop the writer thread without delivering, and release the spool as a dead process would."""
+    writer._stop.set()
+    writer._wakeup.set()
+    writer._thread.join()
+    writer._lock_file.close()
+
+
+@pytest.fixture
+def spool_path(tmp_path):
+    return str(tmp_path / "spool.jsonl")
+
+
+def test_client_authorized_once_and_header_check_reads_row_one(monkeypatch):
+    worksheet = FakeWorksheet([sheet.HEADERS] + rows(1000, "old"))
+    authorizations = []
+    monkeypatch.setattr(sheet, "_authorize", lambda creds_file: authorizations.append(creds_file) or FakeClient(worksheet))
+    sheet.reset_sheet_cache()
+    try:
+        for _ in range(5):
+            sheet.get_sheet()
+    finally:
+        sheet.reset_sheet_cache()
+    assert len(authorizations) == 1
+    assert worksheet.cells_read == len(sheet.HEADERS)
+
+
+def test_rows_written_in_order_through_quota_errors(spool_path):
+    worksheet = FakeWorksheet([sheet.HEADERS], fail_every=3)
+    writer = sheet.SheetWriter(lambda: worksheet, spool_path, batch_size=7, max_backoff_sec=0.01)
+    expected = rows(100, "new")
+    for row in expected:
+        writer.enqueue(row)
+    try:
+        assert writer.flush(timeout=30)
+    finally:
+        writer.close()
+    assert worksheet.rows[1:] == expected
+    assert writer.failures > 0
+    assert writer.rows_rejected == 0
+
+
+def test_spool_replayed_in_order_after_restart(spool_path):
+    down = FakeWorksheet(fail_every=1, fail_status=503)
+    first = sheet.SheetWriter(lambda: down, spool_path, max_backoff_sec=60)
+    before = rows(10, "before")
+    for row in before:
+        first.enqueue(row)
+    crash(first)
+    with open(spool_path, "a", encoding="utf-8") as file_handle:
+        file_handle.write('["torn')
+
+    worksheet = FakeWorksheet([sheet.HEADERS])
+    second = sheet.SheetWriter(lambda: worksheet, spool_path, batch_size=4)
+    after = rows(5, "after")
+    for row in after:
+        second.enqueue(row)
+    try:
+        assert second.flush(timeout=10)
+    finally:
+        second.close()
+    assert worksheet.rows[1:] == before + after
+    assert second.pending() == 0
+
+
+def test_rejected_row_is_dead_lettered_without_blocking_later_rows(spool_path):
+    worksheet = FakeWorksheet([sheet.HEADERS], reject=lambda row: row[0] == "call-2")
+    queued = rows(6, "call") + rows(3, "later")
+    # Spooled before the writer starts, so the first attempt is one batch holding the bad row
+    with open(spool_path, "w", encoding="utf-8") as file_handle:
+        file_handle.writelines(json.dumps(row) + "\n" for row in queued)
+    writer = sheet.SheetWriter(lambda: worksheet, spool_path, batch_size=50, max_backoff_sec=0.01)
+    try:
+        assert writer.flush(timeout=10)
+    finally:
+        writer.close()
+    assert worksheet.rows[1:] == queued[:2] + queued[3:]
+    assert writer.rows_rejected == 1
+    with open(writer.dead_letter_path, "r", encoding="utf-8") as file_handle:
+        rejected = [json.loads(line) for line in file_handle]
+    assert [entry["row"] for entry in rejected] == [queued[2]]
+    assert "50000" in rejected[0]["error"]
+
+
+def test_oversized_cells_truncated_before_spooling(spool_path):
+    worksheet = FakeWorksheet([sheet.HEADERS], reject=lambda row: any(len(cell) > sheet.MAX_CELL_CHARS for cell in row))
+    writer = sheet.SheetWriter(lambda: worksheet, spool_path)
+    writer.enqueue(["now", "Customer", "x" * 80000, "neutral", "summary"])
+    try:
+        assert writer.flush(timeout=10)
+    finally:
+        writer.close()
+    transcript = worksheet.rows[1][2]
+    assert len(transcript) == sheet.MAX_CELL_CHARS
+    assert transcript.endswith(sheet.TRUNCATION_MARK)
+
+
+@pytest.mark.skipif(sheet.fcntl is None, reason="spool locking needs fcntl")
+def test_second_writer_takes_a_suffixed_spool(spool_path):
+    first_sheet = FakeWorksheet([sheet.HEADERS])
+    second_sheet = FakeWorksheet([sheet.HEADERS])
+    first = sheet.SheetWriter(lambda: first_sheet, spool_path)
+    second = sheet.SheetWriter(lambda: second_sheet, spool_path)
+    try:
+        assert first.spool_path == spool_path
+        assert second.spool_path == spool_path.replace(".jsonl", ".1.jsonl")
+        first.enqueue(rows(1, "first")[0])
+        second.enqueue(rows(1, "second")[0])
+        assert first.flush(timeout=10) and second.flush(timeout=10)
+    finally:
+        first.close()
+        second.close()
+    assert first_sheet.rows[1:] == rows(1, "first")
+    assert second_sheet.rows[1:] == rows(1, "second")
+
+
+def test_delivered_rows_not_resent_and_spool_compacted(spool_path, monkeypatch):
+    monkeypatch.setattr(sheet, "SPOOL_COMPACT_BYTES", 1000)
+    down = FakeWorksheet(fail_every=1, fail_status=503)
+    first = sheet.SheetWriter(lambda: down, spool_path, max_backoff_sec=60)
+    queued = rows(40, "call")
+    for row in queued:
+        first.enqueue(row)
+    crash(first)
+
+    # Delivers all but the last batch, then the API goes down again
+    worksheet = FakeWorksheet([sheet.HEADERS])
+    second = sheet.SheetWriter(lambda: worksheet, spool_path, batch_size=4, max_backoff_sec=60)
+    original_append = worksheet.append_rows
+
+    def append_until_last_batch(values, value_input_option=None):
+        if len(worksheet.rows) - 1 >= len(queued) - 4:
+            raise FakeAPIError(503, "unavailable")
+        original_append(values, value_input_option)
+
+    worksheet.append_rows = append_until_last_batch
+    second.start()
+    deadline = time.monotonic() + 10
+    while second.pending() > 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert second.pending() == 4
+    crash(second)
+    # Compacted on the way: the spool no longer holds most of the delivered rows
+    assert os.path.getsize(spool_path) < 1000 + 4 * len(json.dumps(queued[0])) + 4
+
+    worksheet.append_rows = original_append
+    third = sheet.SheetWriter(lambda: worksheet, spool_path)
+    assert third.pending() == 4
+    try:
+        assert third.flush(timeout=10)
+    finally:
+        third.close()
+    assert worksheet.rows[1:] == queued
+    assert os.path.getsize(spool_path) == 0
+
+
+@pytest.mark.parametrize(
+    "error, transient",
+    [
+        (FakeAPIError(429, "quota"), True),
+        (FakeAPIError(503, "unavailable"), True),
+        (FakeAPIError(400, "bad request"), False),
+        (FakeAPIError(403, "forbidden"), False),
+        (ConnectionResetError("reset"), True),
+        (ValueError("not JSON serializable"), False),
+    ],
+)
+def test_is_transient_error(error, transient):
+    assert sheet.is_transient_error(error) is transient
@@ -1,43 +1,88 @@
-import threading
-
 import av
 import numpy as np
 from streamlit_webrtc import AudioProcessorBase
 
-
-def _to_float_mono(audio_frame: av.AudioFrame) -> np.ndarray:
-    audio = audio_frame.to_ndarray()
-    original_dtype = audio.dtype
-
-    if audio.ndim == 2:
-        audio = np.mean(audio, axis=0)
+from resampler import PolyphaseResampler
+
+
+# Sample formats converted straight from the frame's planes: dtype and the
+# scale that maps full-scale samples to [-1, 1].
+PLANE_FORMATS = {
+    "s16": (np.int16, 1.0 / np.iinfo(np.int16).max),
+    "s16p": (np.int16, 1.0 / np.iinfo(np.int16).max),
+    "s32": (np.int32, 1.0 / np.iinfo(np.int32).max),
+    "s32p": (np.int32, 1.0 / np.iinfo(np.int32).max),
+    "flt": (np.float32, 1.0),
+    "fltp": (np.float32, 1.0),
+}
+
+
+def _conversion_buffer_size(audio_frame: av.AudioFrame) -> int:
+    """Float32 samples ``_to_float_mono`` needs: the mono output plus room to widen integer channels."""
+    return audio_frame.samples * (len(audio_frame.layout.channels) + 1)
+
+
+def _to_float_mono(audio_frame: av.AudioFrame, out=None) -> np.ndarray:
+    """
+    Downmix and scale a frame to mono float32 in [-1, 1].
+
+    Interleaved and planar s16/s32/float frames are read straight from the
+    frame's planes and converted inside ``out`` (at least
+    ``_conversion_buffer_size(frame)`` long), so no intermediate arrays are
+    allocated. Returns a view of ``out``; other formats go through
+    ``to_ndarray``.
+    """
+    samples = audio_frame.samples
+    if out is None or out.size < _conversion_buffer_size(audio_frame):
+        out = np.empty(_conversion_buffer_size(audio_frame), dtype=np.float32)
+    mono = out[:samples]
+
+    plane_format = PLANE_FORMATS.get(audio_frame.format.name)
+    if plane_format is None:
+        return _ndarray_to_float_mono(audio_frame, mono)
+
+    dtype, scale = plane_format
+    channels = len(audio_frame.layout.channels)
+    if audio_frame.format.is_planar:
+        planes = [np.frombuffer(plane, dtype=dtype, count=samples) for plane in audio_frame.planes[:channels]]
     else:
-        audio = audio.reshape(-1)
-
-    audio = audio.astype(np.float32, copy=False)
-
-    if np.issubdtype(original_dtype, np.integer):
-        max_value = np.iinfo(original_dtype).max
-        if max_value:
-            audio = audio / float(max_value)
-
-    return audio.astype(np.float32, copy=False)
-
-
-def _resample_audio(audio: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
-    if audio.size == 0 or source_rate <= 0 or source_rate == target_rate:
-        return audio.astype(np.float32, copy=False)
-
-    target_length = max(1, int(round(audio.size * target_rate / source_rate)))
-    if target_length == audio.size:
-        return audio.astype(np.float32, copy=False)
-
-    source_positions = np.arange(audio.size, dtype=np.float32)
-    target_positions = np.linspace(0.0, audio.size - 1, num=target_length, dtype=np.float32)
-    return np.interp(target_positions, source_positions, audio).astype(np.float32, copy=False)
+        interleaved = np.frombuffer(audio_frame.planes[0], dtype=dtype, count=samples * channels)
+        planes = [interleaved[channel::channels] for channel in range(channels)]
+
+    # Casting copies are unbuffered; mixed-dtype ufuncs would allocate, so
+    # integer channels after the first are widened into the scratch tail first
+    np.copyto(mono, planes[0], casting="unsafe")
+    scratch = out[samples : 2 * samples]
+    for plane in planes[1:]:
+        if plane.dtype != np.float32:
+            np.copyto(scratch, plane, casting="unsafe")
+            plane = scratch
+        np.add(mono, plane, out=mono)
+
+    scale /= channels
+    if scale != 1.0:
+        mono *= np.float32(scale)
+    return mono
+
+
+def _ndarray_to_float_mono(audio_frame, mono):
+    audio = audio_frame.to_ndarray()
+    channels = len(audio_frame.layout.channels)
+    if not audio_frame.format.is_planar:
+        # Packed frames come back as (1, samples * channels), interleaved
+        audio = audio.reshape(-1, channels).T
+    np.mean(audio, axis=0, dtype=np.float32, out=mono)
+    if np.issubdtype(audio.dtype, np.integer):
+        mono /= np.float32(np.iinfo(audio.dtype).max)
+    return mono
 
 
 class SalesCallAudioProcessor(AudioProcessorBase):
+    """
+    Converts WebRTC frames to 16 kHz mono float32 and writes them straight into
+    the pipeline's AudioRingBuffer; the pipeline reads fixed-size blocks.
+    """
+
     def __init__(
         self,
         audio_queue,
@@ -49,31 +94,33 @@ class SalesCallAudioProcessor(AudioProcessorBase):
         self.stop_event = stop_event
         self.target_sample_rate = target_sample_rate
         self.block_size = int(target_sample_rate * block_duration)
-        self._buffer = np.zeros(0, dtype=np.float32)
-        self._lock = threading.Lock()
+        self._resampler = None
+        # Reused for every frame's conversion; the resampler and ring copy out of it
+        self._convert_buffer = np.empty(0, dtype=np.float32)
+
+    def _resample(self, audio, source_rate):
+        if source_rate <= 0 or source_rate == self.target_sample_rate:
+            return audio
+        # One resampler per stream so filter state carries across frames
+        if self._resampler is None or self._resampler.source_rate != source_rate:
+            self._resampler = PolyphaseResampler(source_rate, self.target_sample_rate)
+        return self._resampler.process(audio)
 
     def _enqueue_audio(self, frame: av.AudioFrame):
+        # The browser keeps sending frames after End Call; they belong to no call
+        if self.stop_event.is_set() or not self.audio_queue.allocated:
+            return
         source_rate = int(getattr(frame, "sample_rate", self.target_sample_rate) or self.target_sample_rate)
-        audio = _to_float_mono(frame)
-        audio = _resample_audio(audio, source_rate, self.target_sample_rate)
+        needed = _conversion_buffer_size(frame)
+        if self._convert_buffer.size < needed:
+            self._convert_buffer = np.empty(needed, dtype=np.float32)
+        audio = _to_float_mono(frame, out=self._convert_buffer)
+        audio = self._resample(audio, source_rate)
 
         if audio.size == 0:
             return
 
-        with self._lock:
-            if self._buffer.size:
-                audio = np.concatenate([self._buffer, audio])
-            if self.block_size <= 0:
-                self.audio_queue.put(audio.astype(np.float32, copy=False))
-                self._buffer = np.zeros(0, dtype=np.float32)
-                return
-
-            while audio.size >= self.block_size:
-                block = audio[: self.block_size].astype(np.float32, copy=False)
-                self.audio_queue.put(block.copy())
-                audio = audio[self.block_size :]
-
-            self._buffer = audio.astype(np.float32, copy=False)
+        self.audio_queue.write(audio)
 
     def recv(self, frame: av.AudioFrame) -> av.AudioFrame:
         self._enqueue_audio(frame)
@@ -85,10 +132,6 @@ class SalesCallAudioProcessor(AudioProcessorBase):
         return frames
 
     def on_ended(self):
-        with self._lock:
-            if self._buffer.size:
-                self.audio_queue.put(self._buffer.copy())
-                self._buffer = np.zeros(0, dtype=np.float32)
         self.stop_event.set()
         self.audio_queue.put(None)
 
@@ -1,21 +1,12 @@
-
 # whisper_model.py
-import os
-import tempfile
-import numpy as np
-import soundfile as sf
-from groq import Groq
 from dotenv import load_dotenv
 
-from runtime_config import get_groq_api_key
+from audio_encoding import encode_audio
+from call_policy import get_policy
+from groq_client import TRANSCRIPTION_TIMEOUT, get_groq_client
+from stage_metrics import span
 load_dotenv()
 
-def _get_client():
-    api_key = get_groq_api_key()
-    if not api_key:
-        raise ValueError("GROQ_API_KEY is not configured.")
-    return Groq(api_key=api_key)
-
 def load_whisper_model(model_size="whisper-large-v3-turbo", **kwargs):
     """
     Placeholder for compatibility with existing main.py structure.
@@ -24,22 +15,23 @@ def load_whisper_model(model_size="whisper-large-v3-turbo", **kwargs):
     return model_size  # Return model name as a dummy handle
 
 
-def transcribe_audio(model, audio_data, **kwargs):
-    import tempfile, os, soundfile as sf
-
-    # Save numpy audio to a temp WAV file
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_wav:
-        sf.write(tmp_wav.name, audio_data, 16000)
-        tmp_wav_path = tmp_wav.name
-
+def transcribe_audio(model, audio_data, sample_rate=16000, upload_format=None, deadline=None, **kwargs):
     try:
-        client = _get_client()
-        with open(tmp_wav_path, "rb") as audio_file:
-            transcription = client.audio.transcriptions.create(
-                file=(tmp_wav_path, audio_file.read()),
-                model=model,
-                temperature=0,
-                response_format="verbose_json",
+        # Encode in memory (FLAC / 16-bit PCM by default) instead of a temp WAV file
+        with span("encode"):
+            file_name, payload = encode_audio(audio_data, sample_rate, upload_format)
+
+        client = get_groq_client()
+        with span("transcription_request"):
+            transcription = get_policy("transcription", TRANSCRIPTION_TIMEOUT).call(
+                lambda timeout: client.audio.transcriptions.create(
+                    file=(file_name, payload),
+                    model=model,
+                    temperature=0,
+                    response_format="verbose_json",
+                    timeout=timeout,
+                ),
+                deadline,
             )
 
         # ✅ Fix: access as an object, not dict
@@ -49,7 +41,3 @@ def transcribe_audio(model, audio_data, **kwargs):
     except Exception as e:
         print(f"[Groq Transcription Error]: {e}")
         return []
-
-    finally:
-        if os.path.exists(tmp_wav_path):
-            os.remove(tmp_wav_path)
@@ -0,0 +1,43 @@
+# worker_pools.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from runtime_config import get_setting
+
+_lock = threading.Lock()
+_pools = {}
+
+
+def _get_pool(name, setting, default_workers):
+    pool = _pools.get(name)
+    if pool is None:
+        with _lock:
+            pool = _pools.get(name)
+            if pool is None:
+                workers = get_setting(setting, default_workers, int)
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+                _pools[name] = pool
+    return pool
+
+
+def get_transcription_pool():
+    """Process-wide bounded pool shared by every call's transcription stage."""
+    return _get_pool("transcribe", "TRANSCRIPTION_WORKERS", 8)
+
+
+def get_analysis_pool():
+    """Process-wide bounded pool shared by every call's analysis stage."""
+    return _get_pool("analyze", "ANALYSIS_WORKERS", 8)
+
+
+def get_summary_pool():
+    """Process-wide pool for rolling call-summary updates, kept apart from live analysis."""
+    return _get_pool("summary", "SUMMARY_WORKERS", 2)
+
+
+def shutdown(wait=True):
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait)